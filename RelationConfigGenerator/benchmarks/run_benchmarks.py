@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import math
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import DEFAULT_SHAPE, generate_synthetic_project
+from processing.complete_paths import complete_paths
+from processing.create_state_dictionary import create_state_dictionary
+from processing.create_next_states_dictionary import create_next_states_dictionary
+from processing.process_include_configuration import process_include_configuration
+from utils.file_utils import find_all_cs_files
+from utils.class_utils import build_class_index, find_classes_implementing_interface, find_all_child_classes
+from utils.source_scanner import scan_files
+from utils import stats
+
+STAGES = ["scan", "complete_paths", "create_state_dictionary", "create_next_states_dictionary", "process_transitions", "write"]
+
+PRESETS = {
+    "small": {"files": 200, "entities": 8, "path_depth": 3, "fan_out": 2},
+    "medium": {"files": 2000, "entities": 20, "path_depth": 4, "fan_out": 3},
+    "large": {"files": 10000, "entities": 40, "path_depth": 5, "fan_out": 3}
+}
+
+def run_pipeline(project_dir, output_dir):
+    """
+    Run the generator pipeline on a project the way includy.py does in --all mode.
+
+    The stages are timed with the stage timings of utils.stats, which process_include_configuration records for
+    its own stages as well.
+
+    Args:
+        project_dir (str): The project to generate configurations for.
+        output_dir (str): The directory to write the configurations to.
+
+    Returns:
+        dict: A dictionary mapping stage names to seconds.
+    """
+    stats.reset()
+
+    with stats.stage("scan"):
+        cs_files = find_all_cs_files(project_dir)
+        file_facts = scan_files(cs_files)
+        class_index = build_class_index(file_facts)
+        classes = {}
+        for root in find_classes_implementing_interface(class_index, 'IQueryObject'):
+            classes.update(find_all_child_classes(class_index, root))
+        results = []
+        for file_path in dict.fromkeys(classes.values()):
+            for entity_type, paths, collections in file_facts[file_path]["include_directives"]:
+                results.append({"Entity": entity_type, "paths": paths, "collections": collections})
+
+    for entity_data in results:
+        with stats.stage("complete_paths"):
+            completed_paths = complete_paths(entity_data)
+        with stats.stage("create_state_dictionary"):
+            state_dictionary = create_state_dictionary(completed_paths, 'InitialState')
+        with stats.stage("create_next_states_dictionary"):
+            next_states_dictionary = create_next_states_dictionary(state_dictionary, 'InitialState')
+        process_include_configuration(next_states_dictionary, output_dir, 'RelationsConfig')
+
+    return {stage: stats.stages.get(stage, (0.0, 0.0))[0] for stage in STAGES}
+
+def benchmark(shape, repeat, work_dir):
+    """
+    Benchmark the generator on one synthetic project.
+
+    Each stage reports the best wall time of all repetitions. Peak memory is measured in a separate traced run,
+    so tracing does not distort the timings.
+
+    Args:
+        shape (dict): The shape of the synthetic project, see generate_synthetic_project.
+        repeat (int): The number of timed runs.
+        work_dir (str): A scratch directory for the project and its output.
+
+    Returns:
+        dict: The shape, the per-stage seconds, the total seconds and the peak memory in bytes.
+    """
+    project_dir = os.path.join(work_dir, "project")
+    output_dir = os.path.join(work_dir, "output")
+    shutil.rmtree(project_dir, ignore_errors=True)
+    shape = generate_synthetic_project(project_dir, shape)
+
+    best = None
+    for _ in range(repeat):
+        shutil.rmtree(output_dir, ignore_errors=True)
+        timings = run_pipeline(project_dir, output_dir)
+        best = timings if best is None else {stage: min(best[stage], timings[stage]) for stage in STAGES}
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    tracemalloc.start()
+    run_pipeline(project_dir, output_dir)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"shape": shape, "stages": best, "total": sum(best.values()), "peak_memory": peak_memory}
+
+def scaling_exponents(results, parameter):
+    """
+    Estimate how each stage scales with a swept parameter.
+
+    The exponent is the least-squares slope of log(time) over log(parameter), so 1.0 means linear and
+    2.0 quadratic growth.
+
+    Args:
+        results (list): The benchmark results of the sweep.
+        parameter (str): The swept shape parameter.
+
+    Returns:
+        dict: A dictionary mapping stage names and 'total' to exponents, None where the times are too small.
+    """
+    exponents = {}
+    for stage in STAGES + ["total"]:
+        points = []
+        for result in results:
+            seconds = result["total"] if stage == "total" else result["stages"][stage]
+            if result["shape"][parameter] > 0 and seconds > 1e-6:
+                points.append((math.log(result["shape"][parameter]), math.log(seconds)))
+        if len(points) < 2:
+            exponents[stage] = None
+            continue
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        variance = sum((x - mean_x) ** 2 for x, _ in points)
+        exponents[stage] = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance if variance else None
+    return exponents
+
+def print_report(results, parameter, exponents):
+    """
+    Print benchmark results as a table.
+
+    Args:
+        results (list): The benchmark results.
+        parameter (str): The swept shape parameter, or None.
+        exponents (dict): The scaling exponents, or None.
+
+    Returns:
+        None
+    """
+    header = ["files", "entities", "paths"] + ([parameter] if parameter and parameter not in ("files", "entities") else [])
+    columns = header + STAGES + ["total", "peak MiB"]
+    widths = [max(len(column), 10) for column in columns]
+    print(" ".join(f"{column:>{width}}" for column, width in zip(columns, widths)))
+    for result in results:
+        shape = result["shape"]
+        row = [shape["files"], shape["entities"], shape["include_paths"]] + [shape[column] for column in header[3:]]
+        row += [f"{result['stages'][stage] * 1000:.1f}ms" for stage in STAGES]
+        row += [f"{result['total'] * 1000:.1f}ms", f"{result['peak_memory'] / 2 ** 20:.1f}"]
+        print(" ".join(f"{value:>{width}}" for value, width in zip(row, widths)))
+    if exponents:
+        print(f"\nScaling exponent over {parameter} (1.0 = linear):")
+        for stage, exponent in exponents.items():
+            print(f"  {stage:<30} {'n/a' if exponent is None else f'{exponent:.2f}'}")
+
+def parse_args():
+    """
+    Parse command-line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the RelationConfigGenerator on synthetic C# projects.")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='Base shape of the synthetic project. Default: %(default)s')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', help=f"Override a shape parameter ({', '.join(DEFAULT_SHAPE)}).")
+    parser.add_argument('--sweep', metavar='KEY=V1,V2,...', help='Benchmark a series of values of one shape parameter and report scaling exponents.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs per project. Default: %(default)s')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    parser.add_argument('--work-dir', help='Scratch directory for the generated projects. Default: a temporary directory.')
+    return parser.parse_args()
+
+def parse_assignment(assignment):
+    """
+    Parse a KEY=VALUE shape assignment.
+
+    Args:
+        assignment (str): The assignment to parse.
+
+    Returns:
+        tuple: The shape key and the value string.
+    """
+    key, _, value = assignment.partition('=')
+    if key not in DEFAULT_SHAPE or not value:
+        raise SystemExit(f"Invalid shape parameter '{assignment}', expected one of {', '.join(DEFAULT_SHAPE)}.")
+    return key, value
+
+def main():
+    args = parse_args()
+
+    shape = dict(PRESETS[args.preset])
+    for assignment in args.set:
+        key, value = parse_assignment(assignment)
+        shape[key] = int(value)
+
+    parameter = None
+    shapes = [shape]
+    if args.sweep:
+        parameter, values = parse_assignment(args.sweep)
+        shapes = [dict(shape, **{parameter: int(value)}) for value in values.split(',')]
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='includy-bench-')
+    try:
+        results = [benchmark(s, args.repeat, work_dir) for s in shapes]
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    exponents = scaling_exponents(results, parameter) if parameter and len(results) > 1 else None
+    if args.json:
+        print(json.dumps({"results": results, "sweep": parameter, "scaling": exponents}, indent=2))
+    else:
+        print_report(results, parameter, exponents)
+
+if __name__ == "__main__":
+    main()
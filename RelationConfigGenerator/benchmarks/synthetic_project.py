@@ -0,0 +1,184 @@
+import os
+
+# Default shape of a synthetic project, modeled on SpendWise.DAL
+DEFAULT_SHAPE = {
+    "files": 200,
+    "hierarchy_depth": 1,
+    "entities": 8,
+    "path_depth": 3,
+    "fan_out": 2,
+    "filler_lines": 200
+}
+
+def navigation_name(level, index):
+    """
+    Name the navigation property at a given level of the include tree.
+
+    Every name has a distinct pair of capital letters, so the generated state names never collide.
+
+    Args:
+        level (int): The depth of the navigation in the include tree, starting at 0.
+        index (int): The position of the navigation among its siblings.
+
+    Returns:
+        str: The navigation property name.
+    """
+    return f"Nav{chr(ord('A') + level)}{chr(ord('A') + index)}"
+
+def is_collection_level(level):
+    """
+    Decide whether the navigations at a level are collections.
+
+    Collections and references alternate, like TransactionGroupUsers.GroupUser.Group.GroupUsers.User.
+
+    Args:
+        level (int): The depth of the navigation in the include tree.
+
+    Returns:
+        bool: True for collection navigations.
+    """
+    return level % 2 == 0
+
+def include_paths(path_depth, fan_out):
+    """
+    Enumerate the include paths of a complete include tree.
+
+    Args:
+        path_depth (int): The number of navigations in the longest path.
+        fan_out (int): The number of navigations below every node.
+
+    Returns:
+        list: A list of paths, each a list of navigation names, parents before children.
+    """
+    paths = []
+    level_paths = [[]]
+    for level in range(path_depth):
+        level_paths = [parent + [navigation_name(level, index)] for parent in level_paths for index in range(fan_out)]
+        paths.extend(level_paths)
+    return paths
+
+def navigation_properties(level, fan_out):
+    """
+    Render the navigation properties that lead to the nodes at a level of the include tree.
+
+    Args:
+        level (int): The depth of the navigations.
+        fan_out (int): The number of navigations below every node.
+
+    Returns:
+        str: The property declarations, collections or references depending on the level.
+    """
+    node = f"Level{level}NodeEntity"
+    declared_type = f"ICollection<{node}>" if is_collection_level(level) else node
+    return "".join(f"        public required {declared_type} {navigation_name(level, index)} {{ get; init; }}\n" for index in range(fan_out))
+
+def include_directive(segments):
+    """
+    Render one include directive lambda for a path.
+
+    Args:
+        segments (list): The navigation names of the path.
+
+    Returns:
+        str: A lambda such as 'entity => entity.NavAA.Select(x0 => x0.NavBA)'.
+    """
+    text = "entity => entity"
+    closing = ""
+    for level, segment in enumerate(segments):
+        text += f".{segment}"
+        if is_collection_level(level) and level < len(segments) - 1:
+            text += f".Select(x{level} => x{level}"
+            closing += ")"
+    return text + closing
+
+def write_source(project_dir, relative_path, content):
+    """
+    Write one source file of the synthetic project.
+
+    Args:
+        project_dir (str): The root directory of the synthetic project.
+        relative_path (str): The path of the file relative to the project.
+        content (str): The content of the file.
+
+    Returns:
+        None
+    """
+    file_path = os.path.join(project_dir, relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+def generate_synthetic_project(project_dir, shape=None):
+    """
+    Generate a SpendWise-shaped C# project for benchmarking the generator.
+
+    The project contains an IQueryObject interface, a QueryObject base class, a chain of intermediate base
+    query objects, one entity and query object per entity with a complete include tree in its IncludeDirectives,
+    a node entity per level of the include tree declaring the navigations, and filler source files until the
+    requested file count is reached.
+
+    Args:
+        project_dir (str): The directory to create the project in.
+        shape (dict, optional): Overrides for the keys of DEFAULT_SHAPE.
+
+    Returns:
+        dict: The complete shape the project was generated with, including the number of include paths per entity.
+    """
+    shape = dict(DEFAULT_SHAPE, **(shape or {}))
+    dal = "Synthetic.DAL"
+    files_written = 0
+
+    write_source(project_dir, f"{dal}/QueryObjects/Interfaces/IQueryObject.cs",
+                 "namespace Synthetic.DAL.QueryObjects.Interfaces\n{\n"
+                 "    public interface IQueryObject<TEntity> where TEntity : class\n    {\n"
+                 "        List<string> Includes { get; }\n    }\n}\n")
+    write_source(project_dir, f"{dal}/QueryObjects/QueryObject.cs",
+                 "namespace Synthetic.DAL.QueryObjects\n{\n"
+                 "    public abstract class QueryObject<TEntity> : IQueryObject<TEntity> where TEntity : class\n    {\n"
+                 "        public virtual List<string> Includes => new List<string>();\n\n"
+                 "        public virtual ICollection<Func<TEntity, object>> IncludeDirectives => new List<Func<TEntity, object>>();\n"
+                 "    }\n}\n")
+    files_written += 2
+
+    base_class = "QueryObject<TEntity>"
+    for level in range(1, shape["hierarchy_depth"] + 1):
+        write_source(project_dir, f"{dal}/QueryObjects/Level{level}QueryObject.cs",
+                     "namespace Synthetic.DAL.QueryObjects\n{\n"
+                     f"    public abstract class Level{level}QueryObject<TEntity, TReturn> : {base_class}\n"
+                     "    where TEntity : class\n    {\n    }\n}\n")
+        base_class = f"Level{level}QueryObject<TEntity, TReturn>"
+        files_written += 1
+
+    for level in range(shape["path_depth"]):
+        properties = navigation_properties(level + 1, shape["fan_out"]) if level + 1 < shape["path_depth"] else ""
+        write_source(project_dir, f"{dal}/Entities/Level{level}NodeEntity.cs",
+                     "namespace Synthetic.DAL.Entities\n{\n"
+                     f"    public record Level{level}NodeEntity\n    {{\n"
+                     f"        public required Guid Id {{ get; init; }}\n{properties}    }}\n}}\n")
+        files_written += 1
+
+    paths = include_paths(shape["path_depth"], shape["fan_out"])
+    directives = ",\n".join(f"            {include_directive(segments)}" for segments in paths)
+    for entity in range(shape["entities"]):
+        entity_name = f"Entity{entity}Entity"
+        query_object = f"Entity{entity}QueryObject"
+        base = base_class.replace("TEntity", entity_name).replace("TReturn", query_object)
+        write_source(project_dir, f"{dal}/Entities/{entity_name}.cs",
+                     "namespace Synthetic.DAL.Entities\n{\n"
+                     f"    public record {entity_name}\n    {{\n"
+                     "        public required Guid Id { get; init; }\n"
+                     f"{navigation_properties(0, shape['fan_out']) if shape['path_depth'] else ''}    }}\n}}\n")
+        write_source(project_dir, f"{dal}/QueryObjects/{query_object}.cs",
+                     "namespace Synthetic.DAL.QueryObjects\n{\n"
+                     f"    public class {query_object} : {base}\n    {{\n"
+                     f"        public override ICollection<Func<{entity_name}, object>> IncludeDirectives {{ get; }} = new List<Func<{entity_name}, object>>\n"
+                     f"        {{\n{directives}\n        }};\n    }}\n}}\n")
+        files_written += 2
+
+    filler_body = "".join(f"        public int Method{line}(int value) => value + {line};\n" for line in range(shape["filler_lines"]))
+    for filler in range(max(0, shape["files"] - files_written)):
+        write_source(project_dir, f"Synthetic.BLL/Services/Group{filler // 100}/Service{filler}.cs",
+                     "namespace Synthetic.BLL.Services\n{\n"
+                     f"    public class Service{filler} : IService{filler}\n    {{\n{filler_body}    }}\n}}\n")
+
+    return dict(shape, include_paths=len(paths))
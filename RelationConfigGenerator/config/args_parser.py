@@ -1,16 +1,62 @@
 import argparse
 
-def parse_args():
+def build_parser():
     """
-    Parse command-line arguments.
+    Build the parser of the command-line arguments.
 
     Returns:
-        argparse.Namespace: Parsed command-line arguments.
+        argparse.ArgumentParser: The parser, without the checks that span several arguments, see parse_args.
     """
     parser = argparse.ArgumentParser(description="Find IncludeDirectives in a project and process configuration files.")
     parser.add_argument('--project', required=True, help="The project directory to search in.")
-    parser.add_argument('--classname', help="The specific class to search for IncludeDirectives if multiple classes implement the interface.")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument('--classname', help="The specific class to search for IncludeDirectives if multiple classes implement the interface.")
+    selection.add_argument('--all', action='store_true', help="Generate configurations for the hierarchies of all classes implementing the interface without prompting.")
     parser.add_argument('-o', '--output-dir', type=str, default='IncludeConfig', help='Directory to save the output files. Default: %(default)s')
     parser.add_argument('--initial-state-name', type=str, default='InitialState', help='Name part for initial state. Default: %(default)s')
     parser.add_argument('--config-name', type=str, default='RelationsConfig', help='Name part for configuration files. Default: %(default)s')
-    return parser.parse_args()
\ No newline at end of file
+    parser.add_argument('--include-store', choices=['list', 'hashset'], default='list', help="Backing store of the includes in the generated classes. 'hashset' adds a HashSet next to the ordered list, so adding an include no longer scans the list. Default: %(default)s")
+    parser.add_argument('--split-query-hints', action='store_true', help='Add a CollectionPaths table and an IsSplitQueryRecommended property to the generated classes, telling whether the current includes load collections side by side and are better loaded with a split query. Collections are recognized from the property types of the entities and from Select projections in the include directives.')
+    parser.add_argument('--include-fingerprint', action='store_true', help='Add an IncludePaths table and an IncludeFingerprint property to the generated classes, one bit per current include, so equal sets of includes can key caches of compiled queries. AddInclude takes the index of the path as an extra parameter. Up to 64 paths the fingerprint is a ulong; beyond that it is a ulong[] compared with IncludeFingerprintComparer, so adding a directive past the 64th path changes its type. The indexes stay stable across runs through the include paths recorded in the .includy-manifest.json file of the output directory; deleting it renumbers the paths.')
+    parser.add_argument('--compact-interfaces', action='store_true', help='Factor the methods the state interfaces share into shared base interfaces, which shrinks the generated code of wide entities. The fluent API stays the same.')
+    parser.add_argument('--bundle', choices=['entity', 'single'], help="Write each entity's class and interfaces into one file ('entity') or the whole configuration into one file ('single') instead of a file per interface.")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB', help='Only scan source files matching GLOB; may be repeated. Globs without a slash match file names, others paths relative to the project.')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB', help='Skip files and directories matching GLOB, in .gitignore syntax; may be repeated. bin, obj, .git and similar directories are always skipped.')
+    parser.add_argument('--no-gitignore', action='store_true', help='Do not skip the files ignored by the .gitignore files of the project.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of processes used to scan source files and to generate the entities, 0 uses one per CPU. Default: %(default)s')
+    parser.add_argument('--cache-dir', type=str, help='Directory of the persistent parse cache. Unchanged files are not parsed again on later runs.')
+    incremental = parser.add_mutually_exclusive_group()
+    incremental.add_argument('--since', metavar='REV', help='Only parse the files git reports as changed since REV; the facts of all other files come from the parse cache. Requires --cache-dir.')
+    incremental.add_argument('--changed-only', action='store_true', help='Only parse the files git reports as changed since the last --since or --changed-only run. Requires --cache-dir.')
+    parser.add_argument('--emit-graph', metavar='FILE', help='Save the include graph of every entity, its paths, states and transitions, to FILE in a versioned JSON format.')
+    parser.add_argument('--from-graph', metavar='FILE', help='Generate the configurations from an include graph saved with --emit-graph instead of scanning the project.')
+    parser.add_argument('--analyze', nargs='?', const='text', choices=['text', 'json'], help='Instead of generating, report the collection fan-out depth and the estimated cartesian factor of every include path, as text (default) or JSON. Exits with status 1 if a threshold is exceeded.')
+    parser.add_argument('--collection-size', type=int, default=10, metavar='ROWS', help='With --analyze, the number of rows assumed per collection navigation. Default: %(default)s')
+    parser.add_argument('--max-fan-out-depth', type=int, metavar='N', help='With --analyze, fail if a path loads more than N nested collections.')
+    parser.add_argument('--max-cartesian-factor', type=int, metavar='N', help='With --analyze, fail if the estimated cartesian factor of a path or of all includes of an entity exceeds N.')
+    parser.add_argument('--check', action='store_true', help='Exit early with status 0 if the generated files are up to date with their inputs.')
+    parser.add_argument('--watch', action='store_true', help='Keep running and regenerate the configurations of the affected entities whenever .cs files of the project change.')
+    parser.add_argument('--debounce', type=float, default=0.3, metavar='SECONDS', help='In watch mode, wait until no file changed for SECONDS before regenerating. Default: %(default)s')
+    parser.add_argument('--stats', nargs='?', const='text', choices=['text', 'json'], help='Report counters and the wall and CPU time of every stage, as text (default) or JSON.')
+    parser.add_argument('--profile', metavar='FILE', help='Write cProfile statistics of the run to FILE.')
+    return parser
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to the arguments of the process.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.since or args.changed_only) and not args.cache_dir:
+        parser.error("--since and --changed-only require --cache-dir")
+    if args.from_graph and args.watch:
+        parser.error("--watch cannot be combined with --from-graph")
+    if args.analyze and (args.watch or args.from_graph):
+        parser.error("--analyze cannot be combined with --watch or --from-graph")
+    return args
@@ -1,86 +1,951 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 import json
-from config.args_parser import parse_args
+import cProfile
+from functools import partial
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from config.args_parser import build_parser, parse_args
 from processing.complete_paths import complete_paths
 from processing.create_state_dictionary import create_state_dictionary
 from processing.create_next_states_dictionary import create_next_states_dictionary
 from processing.process_include_configuration import process_include_configuration
-from utils.file_utils import find_all_cs_files
-from utils.class_utils import find_classes_implementing_interface, find_all_child_classes
-from utils.include_directives import find_include_directives
+from processing.include_graph import save_include_graph, load_include_graph
+from processing.include_fingerprint import declared_include_paths, assign_include_indexes
+from processing.include_cost import classify_navigations, analyze_include_cost, find_violations, format_cost_report
+from utils.entity_properties import extract_properties
+from utils.file_utils import find_all_cs_files, find_files_in_directories
+from utils.class_utils import build_class_index, find_classes_implementing_interface, find_all_child_classes
+from utils.source_scanner import scan_files
+from utils.parse_cache import load_cache_revision, save_cache_revision
+from utils.git_changes import current_revision, find_changed_files
+from output.bundle import open_bundle, add_to_bundle, close_bundle, discard_bundle
+from output.write_files import write_output_file, write_to_memory
+from utils.directory_operations import create_directories
+from output.manifest import compute_input_fingerprints, load_manifest, save_manifest, is_up_to_date, remove_stale_outputs
+from utils.file_watcher import open_watcher, update_watches, close_watcher, wait_for_changes
+from utils import stats
 
 DEFAULT_OUTPUT_DIRECTORY = 'IncludeConfig'
 DEFAULT_INITIAL_STATE_NAME = 'InitialState'
 DEFAULT_CONFIG_NAME = 'RelationsConfig'
 
-def main():
-    args = parse_args()
+# Threads writing generated files while the worker processes generate further entities
+WRITER_THREADS = 4
 
-    root_dir = args.project
-    out_dir = os.path.join(root_dir, args.output_dir)
-    interface_name = 'IQueryObject'
+def find_incremental_changes(root_dir, cache_dir, since=None):
+    """
+    Determine the files to parse again in incremental mode.
 
-    cs_files = []
-    dal_dirs = [subdir for subdir, _, _ in os.walk(root_dir) if 'DAL' in os.path.basename(subdir)]
-    for dal_dir in dal_dirs:
-        cs_files.extend(find_all_cs_files(dal_dir))
+    Args:
+        root_dir (str): The project directory.
+        cache_dir (str): The directory of the parse cache.
+        since (str, optional): The revision to compare against. Defaults to the revision of the last incremental run.
 
-    classes = find_classes_implementing_interface(cs_files, interface_name)
+    Returns:
+        set: The absolute paths of the changed files, or None if every file has to be checked.
+    """
+    state = load_cache_revision(cache_dir)
+    if since is None and state is None:
+        return None
 
-    if not classes:
-        cs_files = find_all_cs_files(root_dir)
-        classes = find_classes_implementing_interface(cs_files, interface_name)
+    changed_files = find_changed_files(root_dir, since or state["revision"])
+    if changed_files is not None and state is not None:
+        # Files modified during the last run may have been reverted since, the cache still holds their modified facts
+        changed_files.update(state["dirty"])
+    return changed_files
+
+def walk_project(args, directories=None):
+    """
+    Find the .cs files of the project with the walk options of the command line.
+
+    The generated output and the include graph file are outputs of the generator, so the walk leaves them out.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        directories (list, optional): A list that receives every directory the walk entered.
+
+    Returns:
+        list: A list of paths to .cs files.
+    """
+    skip = [os.path.join(args.project, args.output_dir)]
+    if args.emit_graph:
+        skip.append(args.emit_graph)
+    return find_all_cs_files(args.project, args.include, args.exclude, not args.no_gitignore, directories, skip)
+
+def resolve_classes(class_index, cs_files, root_dir, interface_name):
+    """
+    Find the classes implementing the query object interface, preferring those in DAL directories.
+
+    Args:
+        class_index (dict): The class index returned by build_class_index.
+        cs_files (list): The .cs files of the project.
+        root_dir (str): The project directory.
+        interface_name (str): The name of the interface.
+
+    Returns:
+        dict: A dictionary mapping class names to the files declaring them.
+    """
+    dal_files = find_files_in_directories(cs_files, root_dir, 'DAL')
+
+    classes = find_classes_implementing_interface(class_index, interface_name, dal_files)
 
     if not classes:
-        print(f"No classes implementing {interface_name} found.")
-        return
+        classes = find_classes_implementing_interface(class_index, interface_name)
+    return classes
+
+def select_classes(classes, args, interface_name, interactive=True):
+    """
+    Select the hierarchies to generate configurations for, prompting if the choice is ambiguous.
+
+    Args:
+        classes (dict): The classes implementing the interface, see resolve_classes.
+        args (argparse.Namespace): The parsed command-line arguments.
+        interface_name (str): The name of the interface.
+        interactive (bool): Whether to prompt for the class if the choice is ambiguous.
 
+    Returns:
+        list: The names of the selected root classes.
+
+    Raises:
+        ValueError: If the choice is ambiguous and prompting is not allowed.
+    """
+    if args.all:
+        # Every implementing class is a root of its own hierarchy, all of them are resolved from the same index
+        return list(classes)
     if len(classes) > 1 and not args.classname:
+        if not interactive:
+            raise ValueError(f"Multiple classes implementing {interface_name} found: {', '.join(classes)}. Pass 'classname' or 'all'.")
         print(f"Multiple classes implementing {interface_name} found:")
         for cls, path in classes.items():
             print(f"{cls} in {path}")
-        selected_class = input("Please specify the class to search for IncludeDirectives: ")
-    else:
-        selected_class = args.classname if args.classname else next(iter(classes))
+        return [input("Please specify the class to search for IncludeDirectives: ")]
+    return [args.classname if args.classname else next(iter(classes))]
+
+def collect_include_directives(class_index, file_facts, selected_classes, report=True):
+    """
+    Collect the include directives declared by the most specific classes of the selected hierarchies.
 
-    all_child_classes = find_all_child_classes(root_dir, selected_class)
+    Args:
+        class_index (dict): The class index returned by build_class_index.
+        file_facts (dict): A dictionary mapping file paths to the facts returned by scan_file.
+        selected_classes (list): The names of the selected root classes.
+        report (bool): Whether to report classes without include directives.
 
-    most_specific_classes = {cls: path for cls, path in all_child_classes.items() if cls not in all_child_classes.values()}
+    Returns:
+        list: A list of dictionaries with the keys 'Entity', 'paths' and 'collections', without duplicates.
+    """
+    most_specific_classes = {}
+    for selected_class in selected_classes:
+        all_child_classes = find_all_child_classes(class_index, selected_class)
+        most_specific_classes.update({cls: path for cls, path in all_child_classes.items() if cls not in all_child_classes.values()})
 
     results = []
     for cls, file_path in most_specific_classes.items():
-        include_directives = find_include_directives(file_path)
+        include_directives = file_facts[file_path]["include_directives"]
         if include_directives:
-            for file_path, entity_type, cleaned_code in include_directives:
+            for entity_type, cleaned_code, collection_paths in include_directives:
                 result = {
                     "Entity": entity_type,
-                    "paths": cleaned_code
+                    "paths": cleaned_code,
+                    "collections": collection_paths
                 }
-                results.append(result)
-        else:
+                # Hierarchies resolved in batch mode may share classes declaring the same directives
+                if result not in results:
+                    results.append(result)
+        elif report:
             print(f"No IncludeDirectives found in {cls}.")
+    return results
+
+def entity_properties_lookup(class_index):
+    """
+    Build a lookup of the properties of entity types, reading the files the class index names for them on demand.
+
+    Args:
+        class_index (dict): The class index returned by build_class_index.
+
+    Returns:
+        callable: A function returning the properties of an entity type mapped to their declared types, or an empty
+                  dictionary if the type is unknown, see extract_properties.
+    """
+    properties_by_file = {}
+
+    def properties_of(type_name):
+        entry = class_index.get(type_name)
+        if entry is None:
+            return {}
+        file_path = entry["file"]
+        if file_path not in properties_by_file:
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    properties_by_file[file_path] = extract_properties(f.read())
+            except OSError:
+                properties_by_file[file_path] = {}
+        return properties_by_file[file_path].get(type_name, {})
+
+    return properties_of
+
+def classify_collections(results, class_index):
+    """
+    Recognize the collection navigations of include directives from the property types of the entities.
+
+    The scanner only sees the navigations the include directives project with Select. Collections included as a
+    leaf, as in 'entity => entity.GroupUsers', are recognized by the declared type of their property.
+
+    Args:
+        results (list): The include directives returned by collect_include_directives.
+        class_index (dict): The class index returned by build_class_index.
+
+    Returns:
+        list: The include directives with the collection paths of every navigation known to be a collection.
+    """
+    properties_of = entity_properties_lookup(class_index)
+    return [dict(result, collections=[path for path, kind in classify_navigations(result, properties_of).items() if kind == 'collection'])
+            for result in results]
 
-    if results:
-        for result in results:
-            entity_data = {
-                "Entity": result["Entity"],
-                "paths": result["paths"]
-            }
+def generate_entities(results, args, out_dir, previous=None, include_paths=None):
+    """
+    Generate the configuration of every entity.
 
-            # empty IncludeDirectives specified in the code 
-            if entity_data["paths"] == ['']:  
+    Args:
+        results (list): The include directives returned by collect_include_directives.
+        args (argparse.Namespace): The parsed command-line arguments.
+        out_dir (str): The output directory.
+        previous (dict, optional): The entities of an earlier generation. Entities whose include directives did not
+                                   change keep their files and are not generated again, unless all entities share
+                                   a single bundle.
+        include_paths (dict, optional): A dictionary mapping entity names to the include paths of an earlier
+                                        generation in the order of their indexes, see entity_include_paths. Only
+                                        used with --include-fingerprint.
+
+    With more than one job, the entities are generated in worker processes while a pool of WRITER_THREADS threads
+    writes the files of the entities already generated. Files and bundles are written in the order of the entities
+    either way, so the results do not depend on the number of jobs.
+
+    Returns:
+        dict: A dictionary mapping entity names to dictionaries with the keys 'results', the include directives of
+              the entity, 'include_paths', its include paths in the order of their indexes or None without
+              --include-fingerprint, and 'files', the generated files mapped to their content hashes.
+    """
+    results_by_entity = group_by_entity(results)
+    include_paths = include_paths or {}
+
+    # A single bundle holds every entity, so it is always generated as a whole
+    single_bundle = open_bundle(os.path.join(out_dir, f"{args.config_name}.cs")) if args.bundle == 'single' else None
+    open_bundles = [single_bundle] if single_bundle else []
+    if single_bundle:
+        previous = None
+
+    stale_entities = [entity for entity, entity_results in results_by_entity.items()
+                      if not (previous and entity in previous and previous[entity]["results"] == entity_results)]
+    tables = {entity: entity_include_paths(results_by_entity[entity], include_paths.get(entity)) if args.include_fingerprint else None
+              for entity in stale_entities}
+    built = (build_entities([results_by_entity[entity] for entity in stale_entities], args, out_dir, args.bundle is not None, [tables[entity] for entity in stale_entities])
+             if worker_count(args.jobs) > 1 and len(stale_entities) > 1 else None)
+    writer = ThreadPoolExecutor(max_workers=WRITER_THREADS) if built is not None and args.bundle is None else None
+
+    def emit(entity, write=None):
+        if built is None:
+            return generate_entity(results_by_entity[entity], args, out_dir, write, args.bundle is not None, tables[entity])
+        sources = next(built)
+        if writer is None:
+            return {file_path: write(file_path, source) for file_path, source in sources.items()}
+        create_directories(sorted({os.path.dirname(file_path) for file_path in sources}))
+        return {file_path: writer.submit(write_output_file, file_path, source) for file_path, source in sources.items()}
+
+    entities = {}
+    try:
+        for entity, entity_results in results_by_entity.items():
+            if previous and entity in previous and previous[entity]["results"] == entity_results:
+                entities[entity] = previous[entity]
                 continue
 
-            completed_paths = complete_paths(entity_data)
-            state_dictionary = create_state_dictionary(completed_paths, args.initial_state_name)
-            next_states_dictionary = create_next_states_dictionary(state_dictionary, args.initial_state_name)
-            process_include_configuration(next_states_dictionary, out_dir, args.config_name)
+            if args.bundle == 'entity':
+                bundle = open_bundle(os.path.join(out_dir, entity, f"{args.config_name}.cs"))
+                open_bundles.append(bundle)
+                emit(entity, partial(add_to_bundle, bundle))
+                open_bundles.remove(bundle)
+                generated_files = close_bundle(bundle)
+            elif single_bundle:
+                generated_files = emit(entity, partial(add_to_bundle, single_bundle))
+            else:
+                generated_files = emit(entity)
+            entities[entity] = {"results": entity_results, "include_paths": tables[entity], "files": generated_files}
+
+        if writer is not None:
+            # Wait for the writes and replace the pending results by the content hashes
+            for data in entities.values():
+                data["files"] = {file_path: digest.result() if isinstance(digest, Future) else digest for file_path, digest in data["files"].items()}
+
+        if single_bundle:
+            open_bundles.remove(single_bundle)
+            bundle_files = close_bundle(single_bundle)
+            for data in entities.values():
+                data["files"] = bundle_files
+    except BaseException:
+        # Leave the previous outputs in place
+        for bundle in open_bundles:
+            discard_bundle(bundle)
+        if built is not None:
+            built.close()
+        raise
+    finally:
+        if writer is not None:
+            writer.shutdown(wait=True)
+    return entities
+
+def worker_count(jobs):
+    """
+    Resolve the number of worker processes of a --jobs value.
+
+    Args:
+        jobs (int): The number of jobs, 0 for one per CPU.
 
+    Returns:
+        int: The number of worker processes.
+    """
+    return jobs if jobs != 0 else os.cpu_count() or 1
+
+def build_entity(entity_results, include_paths, args, out_dir, bundled):
+    """
+    Generate the configuration of one entity in memory. Runs in the worker processes of build_entities.
+
+    Args:
+        entity_results (list): The include directives of the entity, see collect_include_directives.
+        include_paths (list): The include paths of the entity in the order of their indexes, see entity_include_paths,
+                              or None without --include-fingerprint.
+        args (argparse.Namespace): The parsed command-line arguments.
+        out_dir (str): The output directory.
+        bundled (bool): Whether the generated files are appended to a bundle.
+
+    Returns:
+        dict: A dictionary mapping the paths of the generated files to their sources, in the order they were generated.
+    """
+    sources = {}
+    generate_entity(entity_results, args, out_dir, partial(write_to_memory, sources), bundled, include_paths)
+    return sources
+
+def build_entities(entity_results_list, args, out_dir, bundled, include_paths_list):
+    """
+    Generate the configurations of several entities in memory, spreading them across a process pool.
+
+    Every entity is handed out on its own, so a large entity does not hold back the small ones queued behind it.
+
+    Args:
+        entity_results_list (list): The include directives of every entity, see group_by_entity.
+        args (argparse.Namespace): The parsed command-line arguments. args.jobs is the number of worker processes.
+        out_dir (str): The output directory.
+        bundled (bool): Whether the generated files are appended to a bundle.
+        include_paths_list (list): The include paths of every entity, see build_entity.
+
+    Yields:
+        dict: The sources of each entity, see build_entity, in the order of entity_results_list.
+    """
+    jobs = min(worker_count(args.jobs), len(entity_results_list))
+    if jobs <= 1:
+        for entity_results, include_paths in zip(entity_results_list, include_paths_list):
+            yield build_entity(entity_results, include_paths, args, out_dir, bundled)
+        return
+
+    build = partial(build_entity, args=args, out_dir=out_dir, bundled=bundled)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for sources, counters, stages in executor.map(partial(stats.run_with_counters, build), entity_results_list, include_paths_list):
+            stats.merge_counters(counters, stages)
+            yield sources
+
+def group_by_entity(results):
+    """
+    Group include directives by the entity they configure.
+
+    Args:
+        results (list): The include directives returned by collect_include_directives.
+
+    Returns:
+        dict: A dictionary mapping entity names to their include directives, in the order of first appearance.
+    """
+    results_by_entity = {}
+    for result in results:
+        results_by_entity.setdefault(result["Entity"], []).append(result)
+    return results_by_entity
+
+def build_include_graph(result, initial_state_name):
+    """
+    Build the include graph of one IncludeDirectives declaration.
+
+    Args:
+        result (dict): The include directives with the keys 'Entity', 'paths' and 'collections', see
+                       collect_include_directives.
+        initial_state_name (str): The name part of the initial state.
+
+    Returns:
+        dict: The next states dictionary of the entity, see create_next_states_dictionary, with the key
+              'include_paths', the include paths in the order they are declared. An empty declaration has no
+              transitions.
+    """
+    entity_data = {
+        "Entity": result["Entity"],
+        "paths": result["paths"],
+        "collections": result["collections"]
+    }
+
+    # empty IncludeDirectives specified in the code 
+    if entity_data["paths"] == ['']:  
+        return {"initial_entity": result["Entity"], "transitions": [], "include_paths": []}
+
+    with stats.stage("complete_paths"):
+        completed_paths = complete_paths(entity_data)
+    with stats.stage("create_state_dictionary"):
+        state_dictionary = create_state_dictionary(completed_paths, initial_state_name)
+    with stats.stage("create_next_states_dictionary"):
+        next_states_dictionary = create_next_states_dictionary(state_dictionary, initial_state_name)
+    next_states_dictionary["include_paths"] = declared_include_paths(entity_data["paths"])
+    return next_states_dictionary
+
+def graph_results(results, initial_state_name):
+    """
+    Replace include directives by their include graphs.
+
+    Args:
+        results (list): The include directives returned by collect_include_directives.
+        initial_state_name (str): The name part of the initial state.
+
+    Returns:
+        list: A list of dictionaries with the keys 'Entity' and 'graph', the next states dictionary.
+    """
+    return [{"Entity": result["Entity"], "graph": build_include_graph(result, initial_state_name)} for result in results]
+
+def entity_include_paths(entity_results, previous=None):
+    """
+    Assign the include paths of an entity their indexes in the include fingerprint.
+
+    Args:
+        entity_results (list): The include directives of the entity, see collect_include_directives, or their
+                               include graphs, see graph_results.
+        previous (list, optional): The include paths of the entity in an earlier generation, which keep their indexes.
+
+    Returns:
+        list: The include paths in the order of their indexes, see assign_include_indexes.
+    """
+    declared = []
+    for result in entity_results:
+        declared.extend(result["graph"]["include_paths"] if "graph" in result else declared_include_paths(result["paths"]))
+    return assign_include_indexes(declared, previous)
+
+def generate_entity(entity_results, args, out_dir, write=None, bundled=False, include_paths=None):
+    """
+    Generate the configuration of one entity.
+
+    Args:
+        entity_results (list): The include directives of the entity, see collect_include_directives, or their
+                               include graphs, see graph_results.
+        args (argparse.Namespace): The parsed command-line arguments.
+        out_dir (str): The output directory.
+        write (callable, optional): The function writing the generated files, see process_include_configuration.
+                                    Defaults to writing separate files.
+        bundled (bool): Whether the generated files are appended to a bundle.
+        include_paths (list, optional): With --include-fingerprint, the include paths of the entity in the order of
+                                        their indexes, see entity_include_paths. Defaults to the order they are
+                                        declared in.
+
+    Returns:
+        dict: A dictionary mapping the generated files to their content hashes.
+    """
+    generated_files = {}
+    for result in entity_results:
+        next_states_dictionary = result["graph"] if "graph" in result else build_include_graph(result, args.initial_state_name)
+        if not next_states_dictionary["transitions"]:
+            continue
+        with stats.stage("process_include_configuration"):
+            generated_files.update(process_include_configuration(next_states_dictionary, out_dir, args.config_name, args.include_store, args.compact_interfaces, write, bundled,
+                                                                 args.split_query_hints, args.include_fingerprint, include_paths))
+    return generated_files
+
+def collect_generated_files(entities):
+    """
+    Merge the generated files of all entities.
+
+    Args:
+        entities (dict): The entities returned by generate_entities.
+
+    Returns:
+        dict: A dictionary mapping the paths of all generated files to their content hashes.
+    """
+    generated_files = {}
+    for data in entities.values():
+        generated_files.update(data["files"])
+    return generated_files
+
+def collect_include_paths(entities):
+    """
+    Collect the include paths of all entities for the manifest.
+
+    Args:
+        entities (dict): The entities returned by generate_entities.
+
+    Returns:
+        dict: A dictionary mapping entity names to their include paths in the order of their indexes. Empty without
+              --include-fingerprint.
+    """
+    return {entity: data["include_paths"] for entity, data in entities.items() if data["include_paths"] is not None}
+
+def run(args):
+    """
+    Run the generator with parsed command-line arguments.
+
+    Unless --check finds the generated files up to date, the project is walked and scanned, or the include graph
+    of --from-graph is loaded, and the configurations are generated and recorded in the manifest. --analyze reports
+    the include cost instead of generating, --watch keeps regenerating after the first run. Stage timings and
+    counters are collected in utils.stats for --stats and --profile, see main.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments, see parse_args.
+
+    Returns:
+        int: The exit status, 0 on success and 1 if the include graph cannot be read or --analyze exceeds a
+             threshold.
+    """
+    root_dir = args.project
+    out_dir = os.path.join(root_dir, args.output_dir)
+    interface_name = 'IQueryObject'
 
-    else:
+    # A saved include graph replaces the whole project as input
+    with stats.stage("walk"):
+        cs_files = walk_project(args) if not args.from_graph else []
+
+    # Everything the outputs depend on: the options and every source file except the generated ones
+    options = {
+        "output_dir": args.output_dir,
+        "initial_state_name": args.initial_state_name,
+        "config_name": args.config_name,
+        "include_store": args.include_store,
+        "split_query_hints": args.split_query_hints,
+        "include_fingerprint": args.include_fingerprint,
+        "compact_interfaces": args.compact_interfaces,
+        "bundle": args.bundle,
+        "classname": args.classname,
+        "all": args.all,
+        "emit_graph": args.emit_graph,
+        "from_graph": args.from_graph
+    }
+    with stats.stage("check"):
+        output_prefix = os.path.join(os.path.normpath(out_dir), '')
+        input_files = [f for f in cs_files if not os.path.normpath(f).startswith(output_prefix)]
+        if args.from_graph and os.path.isfile(args.from_graph):
+            input_files.append(args.from_graph)
+        inputs = compute_input_fingerprints(input_files, root_dir)
+        manifest = load_manifest(out_dir)
+        up_to_date = (args.check and not args.watch and not args.analyze and is_up_to_date(manifest, out_dir, options, inputs)
+                      and (not args.emit_graph or os.path.isfile(args.emit_graph)))
+
+    if up_to_date:
+        print("Generated files are up to date.")
+        return 0
+
+    if args.from_graph:
+        with stats.stage("graph"):
+            try:
+                results = [{"Entity": graph["initial_entity"], "graph": graph} for graph in load_include_graph(args.from_graph, args.initial_state_name)]
+            except (OSError, ValueError) as error:
+                print(f"Cannot read the include graph {args.from_graph}: {error}")
+                return 1
+        generate_and_record(args, results, options, inputs, manifest)
+        return 0
+
+    # In incremental mode git names the changed files; the facts of all others come from the parse cache
+    changed_files = None
+    walked_files = {os.path.abspath(file_path) for file_path in cs_files}
+    if args.since or args.changed_only:
+        with stats.stage("changes"):
+            changed_files = find_incremental_changes(root_dir, args.cache_dir, args.since)
+            # Git also reports other files, generated outputs and files the walk skips
+            if changed_files is not None:
+                changed_files &= walked_files
+        if changed_files is None:
+            print("Changed files unknown, checking all files against the parse cache.")
+        else:
+            stats.increment("files_changed", len(changed_files))
+
+    # Index every class of the project once; all hierarchy lookups are answered from this index
+    with stats.stage("scan"):
+        file_facts = scan_files(cs_files, args.jobs, args.cache_dir, changed_files)
+
+    if args.since or args.changed_only:
+        with stats.stage("changes"):
+            revision = current_revision(root_dir)
+            dirty_files = find_changed_files(root_dir, revision) if revision else None
+            if dirty_files is not None:
+                save_cache_revision(args.cache_dir, revision, dirty_files & walked_files)
+
+    with stats.stage("index"):
+        class_index = build_class_index(file_facts)
+
+    with stats.stage("resolve"):
+        classes = resolve_classes(class_index, cs_files, root_dir, interface_name)
+
+    if not classes:
+        print(f"No classes implementing {interface_name} found.")
+        return 0
+
+    selected_classes = select_classes(classes, args, interface_name)
+    results = collect_include_directives(class_index, file_facts, selected_classes)
+    if not results:
         print("No IncludeDirectives found.")
 
+    if args.analyze:
+        return analyze(args, results, class_index)
+    if args.split_query_hints:
+        results = classify_collections(results, class_index)
+
+    entities = generate_and_record(args, results, options, inputs, manifest)
+
+    if args.watch:
+        state = {
+            "options": options,
+            "file_facts": file_facts,
+            "selected_classes": selected_classes,
+            "entities": entities
+        }
+        return watch(args, state)
+    return 0
+
+def analyze(args, results, class_index):
+    """
+    Report the estimated row multiplication of the include directives instead of generating configurations.
+
+    The navigations are classified with the properties of the entity classes, which are read from the files the
+    class index names for them.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        results (list): The include directives returned by collect_include_directives.
+        class_index (dict): The class index returned by build_class_index.
+
+    Returns:
+        int: The exit status, 1 if a threshold is exceeded.
+    """
+    properties_of = entity_properties_lookup(class_index)
+    with stats.stage("analyze"):
+        reports = [analyze_include_cost(result, properties_of, args.collection_size) for result in results]
+        violations = find_violations(reports, args.max_fan_out_depth, args.max_cartesian_factor)
+    print(format_cost_report(reports, violations, args.collection_size, args.analyze))
+    return 1 if violations else 0
+
+def generate_and_record(args, results, options, inputs, manifest):
+    """
+    Generate the configurations, save the include graph if requested and record the outputs in the manifest.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        results (list): The include directives returned by collect_include_directives, or include graphs.
+        options (dict): The generator options the outputs depend on.
+        inputs (dict): The input fingerprints, see compute_input_fingerprints.
+        manifest (dict): The manifest of the previous run, or None.
+
+    Returns:
+        dict: The generated entities, see generate_entities.
+    """
+    out_dir = os.path.join(args.project, args.output_dir)
+    if args.emit_graph:
+        # Build the graphs once, the generation below reuses them
+        with stats.stage("graph"):
+            if not args.from_graph:
+                results = graph_results(results, args.initial_state_name)
+            save_include_graph(args.emit_graph, [result["graph"] for result in results], args.initial_state_name)
+
+    # The include paths keep the indexes of the previous run, so the include fingerprints stay comparable
+    with stats.stage("generate"):
+        entities = generate_entities(results, args, out_dir, include_paths=(manifest or {}).get("include_paths"))
+    generated_files = collect_generated_files(entities)
+
+    with stats.stage("manifest"):
+        stats.increment("files_removed", len(remove_stale_outputs(manifest, out_dir, generated_files)))
+        save_manifest(out_dir, options, inputs, generated_files, collect_include_paths(entities))
+    return entities
+
+def watch(args, state):
+    """
+    Regenerate the configurations whenever .cs files of the project change, until interrupted.
+
+    The facts of all files, the class index and the generated files of every entity are kept in memory. After a
+    burst of changes only the changed files are parsed again, and only the entities whose include directives
+    changed are generated again. A rebuild that fails is reported and keeps the previous state; its changes are
+    rebuilt again with the next burst.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        state (dict): The state of the initial run with the keys 'options', 'file_facts', 'selected_classes'
+                      and 'entities'.
+
+    Returns:
+        int: The exit status.
+    """
+    root_dir = args.project
+    out_dir = os.path.join(root_dir, args.output_dir)
+
+    def walk():
+        directories = []
+        return walk_project(args, directories), directories
+
+    watcher = open_watcher(walk, out_dir, args.debounce)
+    print(f"Watching {root_dir} for changes{'' if watcher['fd'] is not None else ' by polling'}, press Ctrl+C to stop.", flush=True)
+    failed = set()
+    try:
+        while True:
+            changed = wait_for_changes(watcher) | failed
+            cs_files, directories = walk()
+            if not update_watches(watcher, directories):
+                close_watcher(watcher)
+            try:
+                regenerate(args, state, cs_files, changed)
+                failed = set()
+            except Exception as error:
+                # For example a file removed between the walk and the scan, OSError names the file
+                print(f"Regeneration failed, keeping the previous outputs: {error}", flush=True)
+                failed = changed
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        close_watcher(watcher)
+
+def regenerate(args, state, cs_files, changed):
+    """
+    Bring the generated files up to date after a burst of changes in watch mode.
+
+    The state is only updated once the files are generated, so a rebuild that raises leaves it as it was.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        state (dict): The watch state, see watch. Updated in place.
+        cs_files (list): The .cs files of the project after the changes.
+        changed (set): The absolute paths of the changed files and of directories with changes below them.
+
+    Returns:
+        None
+    """
+    root_dir = args.project
+    out_dir = os.path.join(root_dir, args.output_dir)
+    interface_name = 'IQueryObject'
+    changed_dirs = [os.path.join(path, '') for path in changed if not path.endswith('.cs')]
+
+    old_facts = state["file_facts"]
+    stale_files = []
+    for file_path in cs_files:
+        path = os.path.abspath(file_path)
+        if file_path not in old_facts or path in changed or any(path.startswith(d) for d in changed_dirs):
+            stale_files.append(file_path)
+    file_facts = {file_path: old_facts.get(file_path) for file_path in cs_files}
+    file_facts.update(scan_files(stale_files, args.jobs))
+
+    # Changes that do not touch any declaration leave the class index and the outputs as they are
+    if file_facts == old_facts:
+        return
+
+    class_index = build_class_index(file_facts)
+    classes = resolve_classes(class_index, cs_files, root_dir, interface_name)
+    selected_classes = select_classes(classes, args, interface_name) if args.all else state["selected_classes"]
+    results = collect_include_directives(class_index, file_facts, selected_classes, report=False)
+    if args.split_query_hints:
+        results = classify_collections(results, class_index)
+    if args.emit_graph:
+        results = graph_results(results, args.initial_state_name)
+        save_include_graph(args.emit_graph, [result["graph"] for result in results], args.initial_state_name)
+
+    manifest = load_manifest(out_dir)
+    entities = generate_entities(results, args, out_dir, state["entities"], (manifest or {}).get("include_paths"))
+    regenerated = [entity for entity, data in entities.items() if data is not state["entities"].get(entity)]
+    removed = [entity for entity in state["entities"] if entity not in entities]
+
+    generated_files = collect_generated_files(entities)
+    output_prefix = os.path.join(os.path.normpath(out_dir), '')
+    inputs = compute_input_fingerprints([f for f in cs_files if not os.path.normpath(f).startswith(output_prefix)], root_dir)
+    remove_stale_outputs(manifest, out_dir, generated_files)
+    save_manifest(out_dir, state["options"], inputs, generated_files, collect_include_paths(entities))
+    state["file_facts"] = file_facts
+    state["entities"] = entities
+
+    if regenerated:
+        print(f"Regenerated {', '.join(regenerated)}.", flush=True)
+    if removed:
+        print(f"Removed {', '.join(removed)}.", flush=True)
+
+# Options of the command line that only apply to a run of the command, not to generate
+COMMAND_LINE_ONLY_OPTIONS = {'project', 'check', 'watch', 'debounce', 'stats', 'profile', 'since', 'changed_only', 'emit_graph', 'from_graph',
+                             'analyze', 'collection_size', 'max_fan_out_depth', 'max_cartesian_factor'}
+
+def generate_options(project, options=None):
+    """
+    Build the arguments of a generate call from the defaults of the command line.
+
+    Args:
+        project (str): The project directory to search in.
+        options (dict, optional): Options overriding the defaults, keyed by the names of the command-line options
+                                  with underscores, for example {'all': True, 'include_store': 'hashset'}.
+
+    Returns:
+        argparse.Namespace: The arguments, as parse_args would return them.
+
+    Raises:
+        ValueError: If an option is unknown, only applies to the command line or has an invalid value.
+    """
+    parser = build_parser()
+    actions = {action.dest: action for action in parser._actions}
+    args = parser.parse_args([f'--project={project}'])
+    for key, value in (options or {}).items():
+        if key in COMMAND_LINE_ONLY_OPTIONS or not hasattr(args, key):
+            raise ValueError(f"Unknown option '{key}'.")
+        if not is_valid_option_value(actions[key], value):
+            raise ValueError(f"Invalid value {value!r} for option '{key}'.")
+        setattr(args, key, value)
+    if args.all and args.classname:
+        raise ValueError("The options 'all' and 'classname' exclude each other.")
+    return args
+
+def is_valid_option_value(action, value):
+    """
+    Check a value against the type and choices the command line accepts for an option.
+
+    Args:
+        action (argparse.Action): The parser action of the option.
+        value: The value to check.
+
+    Returns:
+        bool: True if parsing the command line could have produced the value.
+    """
+    if value is None:
+        return action.default is None
+    # Flags without an argument, like --all
+    if action.nargs == 0:
+        return isinstance(value, bool)
+    # Repeatable options, like --include, take a list of strings
+    if isinstance(action.default, list):
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    expected = action.type or str
+    if expected is float:
+        expected = (int, float)
+    if isinstance(value, bool) or not isinstance(value, expected):
+        return False
+    return action.choices is None or value in action.choices
+
+def generate(project, options=None, state=None):
+    """
+    Generate the configurations of a project in memory, without writing any file.
+
+    Nothing is printed and nothing is prompted. Passing the same state dictionary to later calls keeps the facts of
+    all files, the class index and the generated sources of every entity warm: only files whose modification time or
+    size changed are parsed again, and only entities whose include directives or generation options changed are
+    generated again. The parse cache of 'cache_dir' is only read and updated by the first call of a state.
+
+    Args:
+        project (str): The project directory to search in.
+        options (dict, optional): Options overriding the defaults of the command line, see generate_options.
+        state (dict, optional): A dictionary the warm state is kept in between calls. Updated in place.
+
+    Returns:
+        dict: A dictionary mapping the generated files, as '/'-separated paths relative to the output directory, to
+              their sources. Empty if no class implements the query object interface.
+
+    Raises:
+        ValueError: If an option is invalid, or if several classes implement the interface and neither 'classname'
+                    nor 'all' is given.
+    """
+    args = generate_options(project, options)
+    root_dir = args.project
+    out_dir = os.path.join(root_dir, args.output_dir)
+    interface_name = 'IQueryObject'
+    if state is None:
+        state = {}
+    if state.get("project") != os.path.abspath(root_dir):
+        state.clear()
+        state["project"] = os.path.abspath(root_dir)
+
+    with stats.stage("walk"):
+        cs_files = walk_project(args)
+
+    with stats.stage("scan"):
+        old_facts = state.get("file_facts")
+        old_fingerprints = state.get("fingerprints", {})
+        fingerprints = {}
+        stale_files = []
+        for file_path in cs_files:
+            try:
+                stat = os.stat(file_path)
+                fingerprints[file_path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                fingerprints[file_path] = None
+            if old_facts is None or file_path not in old_facts or fingerprints[file_path] != old_fingerprints.get(file_path):
+                stale_files.append(file_path)
+        file_facts = {file_path: (old_facts or {}).get(file_path) for file_path in cs_files}
+        file_facts.update(scan_files(stale_files, args.jobs, args.cache_dir if old_facts is None else None))
+        state["fingerprints"] = fingerprints
+
+    # Changes that do not touch any declaration keep the class index
+    if file_facts != old_facts or "class_index" not in state:
+        with stats.stage("index"):
+            state["class_index"] = build_class_index(file_facts)
+        state["file_facts"] = file_facts
+    class_index = state["class_index"]
+
+    with stats.stage("resolve"):
+        classes = resolve_classes(class_index, cs_files, root_dir, interface_name)
+    if not classes:
+        return {}
+
+    selected_classes = select_classes(classes, args, interface_name, interactive=False)
+    results = collect_include_directives(class_index, file_facts, selected_classes, report=False)
+    if args.split_query_hints:
+        results = classify_collections(results, class_index)
+
+    # The sources of an entity depend on its include directives and on the options shaping the generated code
+    generation_key = (args.output_dir, args.initial_state_name, args.config_name, args.include_store, args.split_query_hints, args.compact_interfaces,
+                      args.include_fingerprint, args.bundle is not None)
+    previous = state.get("entities", {}) if state.get("generation_key") == generation_key else {}
+    results_by_entity = group_by_entity(results)
+    stale_entities = [entity for entity, entity_results in results_by_entity.items()
+                      if entity not in previous or previous[entity]["results"] != entity_results]
+
+    # The include paths keep their indexes across calls, starting from those of the last run writing the output directory
+    if "include_paths" not in state:
+        state["include_paths"] = dict((load_manifest(out_dir) or {}).get("include_paths") or {})
+    if args.include_fingerprint:
+        for entity in stale_entities:
+            state["include_paths"][entity] = entity_include_paths(results_by_entity[entity], state["include_paths"].get(entity))
+
+    built = build_entities([results_by_entity[entity] for entity in stale_entities], args, out_dir, args.bundle is not None,
+                           [state["include_paths"][entity] if args.include_fingerprint else None for entity in stale_entities])
+    entities = {entity: {"results": results_by_entity[entity], "sources": sources} for entity, sources in zip(stale_entities, built)}
+    entities = {entity: entities.get(entity) or previous[entity] for entity in results_by_entity}
+    state["generation_key"] = generation_key
+    state["entities"] = entities
+
+    # Bundles are joined the way add_to_bundle joins them
+    generated = {}
+    for entity, data in entities.items():
+        if args.bundle == 'entity' and data["sources"]:
+            generated[f"{entity}/{args.config_name}.cs"] = "\n".join(data["sources"].values())
+        elif args.bundle is None:
+            for file_path, source in data["sources"].items():
+                generated[os.path.relpath(file_path, out_dir).replace(os.sep, '/')] = source
+    if args.bundle == 'single' and any(data["sources"] for data in entities.values()):
+        generated[f"{args.config_name}.cs"] = "\n".join(source for data in entities.values() for source in data["sources"].values())
+    return generated
+
+def main():
+    args = parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        status = run(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+
+    if args.stats:
+        print(stats.format_report(args.stats))
+    return status
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
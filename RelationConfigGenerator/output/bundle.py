@@ -0,0 +1,142 @@
+import os
+import hashlib
+from utils import stats
+
+# Generated code is collected in memory and written in batches of about this many bytes
+BUNDLE_BATCH_SIZE = 1024 * 1024
+
+def open_bundle(file_path):
+    """
+    Start a bundle that collects many generated files into a single source file.
+
+    The bundle is streamed into a temporary file next to its destination and only moved into place by close_bundle,
+    so readers never see a partially written bundle. The temporary file is only created once content is written,
+    so a bundle nothing is added to leaves no trace.
+
+    Args:
+        file_path (str): The path of the bundle file.
+
+    Returns:
+        dict: The bundle state passed to add_to_bundle, close_bundle and discard_bundle.
+    """
+    return {
+        "path": file_path,
+        "temp_path": f"{file_path}.{os.getpid()}.tmp",
+        "file": None,
+        "digest": hashlib.sha1(),
+        "batch": [],
+        "batch_size": 0,
+        "empty": True
+    }
+
+def flush_bundle(bundle):
+    """
+    Write the collected batch of a bundle to its temporary file.
+
+    Args:
+        bundle (dict): The bundle state returned by open_bundle.
+
+    Returns:
+        None
+    """
+    if bundle["batch"]:
+        if bundle["file"] is None:
+            os.makedirs(os.path.dirname(bundle["path"]) or '.', exist_ok=True)
+            bundle["file"] = open(bundle["temp_path"], 'wb')
+        data = b''.join(bundle["batch"])
+        bundle["file"].write(data)
+        bundle["digest"].update(data)
+        bundle["batch"] = []
+        bundle["batch_size"] = 0
+
+def add_to_bundle(bundle, file_path, content):
+    """
+    Append a generated file to a bundle.
+
+    Has the signature of write_output_file, so the writers of the generated code can target a bundle instead of
+    separate files.
+
+    Args:
+        bundle (dict): The bundle state returned by open_bundle.
+        file_path (str): The path the file would have outside of a bundle. Only used for reporting.
+        content (str): The content of the file.
+
+    Returns:
+        str: The content hash of the added content.
+    """
+    data = content.encode('utf-8')
+    if not bundle["empty"]:
+        data = b'\n' + data
+    bundle["empty"] = False
+    bundle["batch"].append(data)
+    bundle["batch_size"] += len(data)
+    if bundle["batch_size"] >= BUNDLE_BATCH_SIZE:
+        flush_bundle(bundle)
+    stats.increment("files_bundled")
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+def file_digest(file_path):
+    """
+    Hash the content of an existing file.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        str: The hex digest of the content, or None if the file cannot be read.
+    """
+    digest = hashlib.sha1()
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(BUNDLE_BATCH_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def close_bundle(bundle):
+    """
+    Finish a bundle and replace the bundle file atomically.
+
+    An unchanged bundle is not replaced, so its modification time is kept. A bundle nothing was added to is not
+    written at all.
+
+    Args:
+        bundle (dict): The bundle state returned by open_bundle.
+
+    Returns:
+        dict: A dictionary mapping the path of the bundle file to its content hash, empty if nothing was added.
+    """
+    if bundle["empty"]:
+        return {}
+    flush_bundle(bundle)
+    size = bundle["file"].tell()
+    bundle["file"].close()
+    digest = bundle["digest"].hexdigest()
+
+    if file_digest(bundle["path"]) == digest:
+        os.remove(bundle["temp_path"])
+        stats.increment("files_unchanged")
+    else:
+        os.replace(bundle["temp_path"], bundle["path"])
+        stats.increment("files_written")
+        stats.increment("bytes_written", size)
+    return {bundle["path"]: digest}
+
+def discard_bundle(bundle):
+    """
+    Abandon a bundle, for example after an error, and remove its temporary file.
+
+    Args:
+        bundle (dict): The bundle state returned by open_bundle.
+
+    Returns:
+        None
+    """
+    if bundle["file"] is None:
+        return
+    bundle["file"].close()
+    try:
+        os.remove(bundle["temp_path"])
+    except OSError:
+        pass
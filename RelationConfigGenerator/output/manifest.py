@@ -0,0 +1,135 @@
+import os
+import json
+import hashlib
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE_NAME = '.includy-manifest.json'
+
+def compute_input_fingerprints(files, root_dir):
+    """
+    Fingerprint the input files of a run by their modification time and size.
+
+    Args:
+        files (list): A list of input file paths.
+        root_dir (str): The project directory the fingerprints are recorded relative to.
+
+    Returns:
+        dict: A dictionary mapping relative file paths to [mtime, size] pairs.
+    """
+    fingerprints = {}
+    for file_path in files:
+        stat = os.stat(file_path)
+        fingerprints[os.path.relpath(file_path, root_dir).replace(os.sep, '/')] = [stat.st_mtime_ns, stat.st_size]
+    return fingerprints
+
+def load_manifest(output_dir):
+    """
+    Load the output manifest of the previous run.
+
+    Args:
+        output_dir (str): The directory holding the generated files.
+
+    Returns:
+        dict: The manifest with the keys 'version', 'options', 'inputs', 'outputs' and optionally 'include_paths',
+              or None if there is no usable manifest.
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def save_manifest(output_dir, options, inputs, outputs, include_paths=None):
+    """
+    Save the output manifest of the current run.
+
+    Args:
+        output_dir (str): The directory holding the generated files.
+        options (dict): The generator options the outputs depend on.
+        inputs (dict): The input fingerprints, see compute_input_fingerprints.
+        outputs (dict): A dictionary mapping the generated file paths to their content hashes.
+        include_paths (dict, optional): A dictionary mapping entity names to their include paths in the order of
+                                        their indexes in the include fingerprint, kept for the next run.
+
+    Returns:
+        None
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "options": options,
+        "inputs": inputs,
+        "outputs": {os.path.relpath(path, output_dir).replace(os.sep, '/'): digest for path, digest in sorted(outputs.items())}
+    }
+    if include_paths:
+        manifest["include_paths"] = include_paths
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, sort_keys=True, separators=(',', ':'))
+    os.replace(temp_path, manifest_path)
+
+def is_up_to_date(manifest, output_dir, options, inputs):
+    """
+    Check whether the generated files recorded in a manifest are current.
+
+    The outputs are current if the options and input fingerprints are unchanged and every generated file still
+    exists with the recorded content.
+
+    Args:
+        manifest (dict): The manifest returned by load_manifest, or None.
+        output_dir (str): The directory holding the generated files.
+        options (dict): The generator options of the current run.
+        inputs (dict): The input fingerprints of the current run.
+
+    Returns:
+        bool: True if nothing has to be generated.
+    """
+    if manifest is None or manifest["options"] != options or manifest["inputs"] != inputs:
+        return False
+
+    for relative_path, digest in manifest["outputs"].items():
+        try:
+            with open(os.path.join(output_dir, relative_path), 'rb') as f:
+                if hashlib.sha1(f.read().replace(b'\r\n', b'\n')).hexdigest() != digest:
+                    return False
+        except OSError:
+            return False
+    return True
+
+def remove_stale_outputs(manifest, output_dir, outputs):
+    """
+    Remove generated files of the previous run that are no longer produced.
+
+    Directories left empty by the removal are removed as well.
+
+    Args:
+        manifest (dict): The manifest of the previous run, or None.
+        output_dir (str): The directory holding the generated files.
+        outputs (dict): A dictionary mapping the file paths generated by the current run to their content hashes.
+
+    Returns:
+        list: The paths of the removed files.
+    """
+    if manifest is None:
+        return []
+
+    current = {os.path.normpath(os.path.relpath(path, output_dir)) for path in outputs}
+    removed = []
+    for relative_path in manifest["outputs"]:
+        if os.path.normpath(relative_path) in current:
+            continue
+        file_path = os.path.join(output_dir, relative_path)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            removed.append(file_path)
+
+        directory = os.path.dirname(file_path)
+        while os.path.normpath(directory) != os.path.normpath(output_dir) and os.path.isdir(directory) and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+    return removed
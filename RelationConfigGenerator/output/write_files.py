@@ -1,19 +1,15 @@
-def write_class_file(initial_entity_name, class_def, class_interfaces, output_dir, config_name, namespace):
-    """
-    Write the class file for the given configuration.
+import hashlib
+from string import Template
+from utils import stats
 
-    This function generates the class file for the given configuration name. It includes methods for adding and removing
-    include paths, and integrates the necessary interfaces if provided.
+# Include paths a word of an include fingerprint holds, one bit of a ulong each
+FINGERPRINT_WORD_BITS = 64
 
-    Args:
-        initial_entity_name (str): The name of the initial entity.
-        class_def (str): The class definition string.
-        class_interfaces (set): A set of interfaces to be implemented by the class.
-
-    Returns:
-        None
-    """
-    include_code = """
+# Backing stores of the includes of a generated class. 'list' checks membership by scanning the list,
+# 'hashset' keeps a HashSet next to the list so that adding an include is constant time.
+# $index_parameter, $on_added and $on_removed are filled in by include_store_code.
+INCLUDE_STORES = {
+    "list": """
         private readonly List<string> _includes = new List<string>(); // Stores the includes for related entities
 
         /// <summary>
@@ -24,12 +20,12 @@ def write_class_file(initial_entity_name, class_def, class_interfaces, output_di
         /// <summary>
         /// Adds an include path to the current query object.
         /// </summary>
-        /// <param name="include">The path of the include to be added.</param>
-        protected void AddInclude(string include)
+        /// <param name="include">The path of the include to be added.</param>$index_documentation
+        protected void AddInclude(string include$index_parameter)
         {
             if (!string.IsNullOrWhiteSpace(include) && !_includes.Contains(include))
             {
-                _includes.Add(include);
+                _includes.Add(include);$on_added
             }
         }
 
@@ -41,19 +37,376 @@ def write_class_file(initial_entity_name, class_def, class_interfaces, output_di
         {
             if (_includes.Contains(include))
             {
-                _includes.Remove(include);
+                _includes.Remove(include);$on_removed
+            }
+        }
+    """,
+    "hashset": """
+        private readonly List<string> _includes = new List<string>(); // Stores the includes for related entities in insertion order
+        private readonly HashSet<string> _includeSet = new HashSet<string>(); // Answers membership checks for the includes in constant time
+
+        /// <summary>
+        /// Gets the list of includes to be applied to the query.
+        /// </summary>
+        public virtual List<string> Includes => _includes;
+
+        /// <summary>
+        /// Adds an include path to the current query object.
+        /// </summary>
+        /// <param name="include">The path of the include to be added.</param>$index_documentation
+        protected void AddInclude(string include$index_parameter)
+        {
+            if (!string.IsNullOrWhiteSpace(include) && _includeSet.Add(include))
+            {
+                _includes.Add(include);$on_added
             }
         }
+
+        /// <summary>
+        /// Removes an include path from the current query object.
+        /// </summary>
+        /// <param name="include">The path of the include to be removed.</param>
+        protected void RemoveInclude(string include)
+        {
+            if (include != null && _includeSet.Remove(include))
+            {
+                _includes.Remove(include);$on_removed
+            }
+        }
+    """
+}
+
+def write_output_file(file_path, content):
     """
+    Write a generated file unless it already has the given content.
+
+    Skipping unchanged files keeps their modification time, so build tools do not recompile them.
+
+    Args:
+        file_path (str): The path of the file to write.
+        content (str): The content of the file.
+
+    Returns:
+        str: The content hash of the file.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            unchanged = file.read() == content
+    except (OSError, UnicodeDecodeError):
+        unchanged = False
+
+    if unchanged:
+        stats.increment("files_unchanged")
+    else:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        stats.increment("files_written")
+        stats.increment("bytes_written", len(content))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+def write_to_memory(sources, file_path, content):
+    """
+    Keep a generated file in memory instead of writing it.
+
+    Has the signature of write_output_file once sources is bound, for example with functools.partial.
+
+    Args:
+        sources (dict): A dictionary receiving the file path and content.
+        file_path (str): The path the file would be written to.
+        content (str): The content of the file.
+
+    Returns:
+        str: The content hash of the file.
+    """
+    sources[file_path] = content
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+def include_store_code(include_store, fingerprinted=False):
+    """
+    Generate the members that store the includes of a class.
+
+    Args:
+        include_store (str): The backing store of the includes, a key of INCLUDE_STORES.
+        fingerprinted (bool): Whether adding and removing includes maintains the include fingerprint, see
+                              include_fingerprint_code.
+
+    Returns:
+        str: The code of the members.
+    """
+    if not fingerprinted:
+        return Template(INCLUDE_STORES[include_store]).substitute(index_documentation="", index_parameter="", on_added="", on_removed="")
+    return Template(INCLUDE_STORES[include_store]).substitute(
+        index_documentation='\n        /// <param name="index">The index of the path in IncludePaths, or -1 to look it up.</param>',
+        index_parameter=", int index = -1",
+        on_added="\n                TrackInclude(include, index);",
+        on_removed="\n                UntrackInclude(include);"
+    )
+
+def include_fingerprint_code(include_paths):
+    """
+    Generate the members that fingerprint the current includes of a class.
+
+    Every include path gets a stable index, its position in include_paths, and the fingerprint holds one bit per
+    current include. Equal sets of includes therefore have equal fingerprints, which callers can use to cache
+    compiled queries without hashing include strings. Up to FINGERPRINT_WORD_BITS paths the fingerprint is a single
+    ulong, beyond that an array of ulong words compared with IncludeFingerprintComparer.
+
+    Args:
+        include_paths (list): The include paths of the class, in the order of their indexes.
+
+    Returns:
+        str: The code of the members.
+    """
+    paths = "".join(f"""            "{path}",\n""" for path in include_paths)
+    indexes = "".join(f"""            {{ "{path}", {index} }},\n""" for index, path in enumerate(include_paths))
+    words = -(-len(include_paths) // FINGERPRINT_WORD_BITS)
+    if words <= 1:
+        fingerprint_type = "ulong"
+        fingerprint_members = """
+        private ulong _includeFingerprint; // One bit per current include, see IncludePaths
+
+        /// <summary>
+        /// Gets the fingerprint of the current includes, one bit per path of IncludePaths. Equal sets of includes
+        /// have equal fingerprints regardless of their order, so the fingerprint can key caches of compiled queries.
+        /// </summary>
+        public virtual ulong IncludeFingerprint => _includeFingerprint;
+"""
+        cache_comparer = ""
+        lookup = ""
+        has_bit = "(key & (1UL << index)) != 0"
+        set_bit = "_includeFingerprint |= 1UL << index;"
+        clear_bit = "_includeFingerprint &= ~(1UL << index);"
+        comparer = ""
+    else:
+        fingerprint_type = "ulong[]"
+        fingerprint_members = f"""
+        private readonly ulong[] _includeFingerprint = new ulong[{words}]; // One bit per current include, see IncludePaths
+
+        /// <summary>
+        /// Gets a copy of the fingerprint of the current includes, one bit per path of IncludePaths in {words} words.
+        /// Equal sets of includes have equal fingerprints regardless of their order, so the fingerprint can key caches
+        /// of compiled queries that compare keys with IncludeFingerprintComparer.
+        /// </summary>
+        public virtual ulong[] IncludeFingerprint => (ulong[])_includeFingerprint.Clone();
+
+        /// <summary>
+        /// Compares include fingerprints by their words.
+        /// </summary>
+        public static IEqualityComparer<ulong[]> IncludeFingerprintComparer => FingerprintComparer.Instance;
+"""
+        cache_comparer = "FingerprintComparer.Instance"
+        # The cache keeps a copy of the key, callers may reuse their array
+        lookup = """
+            if (IncludePathsByFingerprint.TryGetValue(fingerprint, out var cached))
+            {
+                return cached;
+            }
+            fingerprint = (ulong[])fingerprint.Clone();"""
+        has_bit = "(index >> 6) < key.Length && (key[index >> 6] & (1UL << (index & 63))) != 0"
+        set_bit = "_includeFingerprint[index >> 6] |= 1UL << (index & 63);"
+        clear_bit = "_includeFingerprint[index >> 6] &= ~(1UL << (index & 63));"
+        comparer = """
+#nullable enable
+        private sealed class FingerprintComparer : IEqualityComparer<ulong[]>
+        {
+            public static readonly FingerprintComparer Instance = new FingerprintComparer();
+
+            public bool Equals(ulong[]? x, ulong[]? y)
+            {
+                return ReferenceEquals(x, y) || (x != null && y != null && x.AsSpan().SequenceEqual(y));
+            }
+
+            public int GetHashCode(ulong[] fingerprint)
+            {
+                var hash = new HashCode();
+                foreach (var word in fingerprint)
+                {
+                    hash.Add(word);
+                }
+                return hash.ToHashCode();
+            }
+        }
+#nullable restore
+"""
+    return f"""
+        /// <summary>
+        /// The include paths of the configuration. The index of a path is its bit in IncludeFingerprint.
+        /// </summary>
+        public static readonly IReadOnlyList<string> IncludePaths = new string[]
+        {{
+{paths}        }};
+
+        private static readonly Dictionary<string, int> IncludeIndexes = new Dictionary<string, int>
+        {{
+{indexes}        }};
+
+        private static readonly System.Collections.Concurrent.ConcurrentDictionary<{fingerprint_type}, IReadOnlyList<string>> IncludePathsByFingerprint = new System.Collections.Concurrent.ConcurrentDictionary<{fingerprint_type}, IReadOnlyList<string>>({cache_comparer});
+{fingerprint_members}
+        private int _unindexedIncludes; // Number of current includes with a path that is not in IncludePaths
+
+        /// <summary>
+        /// Gets whether IncludeFingerprint covers every current include. Includes added with a custom path have no bit.
+        /// </summary>
+        public virtual bool IsIncludeFingerprintComplete => _unindexedIncludes == 0;
+
+        /// <summary>
+        /// Gets the include paths of a fingerprint, ordered by their index in IncludePaths.
+        /// </summary>
+        /// <param name="fingerprint">A fingerprint, see IncludeFingerprint.</param>
+        public static IReadOnlyList<string> GetIncludePaths({fingerprint_type} fingerprint)
+        {{{lookup}
+            return IncludePathsByFingerprint.GetOrAdd(fingerprint, key =>
+            {{
+                var paths = new List<string>();
+                for (var index = 0; index < IncludePaths.Count; index++)
+                {{
+                    if ({has_bit})
+                    {{
+                        paths.Add(IncludePaths[index]);
+                    }}
+                }}
+                return paths.ToArray();
+            }});
+        }}
+
+        /// <summary>
+        /// Sets the bit of an added include. The generated methods pass the index of their path, so only custom
+        /// paths are looked up.
+        /// </summary>
+        private void TrackInclude(string include, int index)
+        {{
+            if ((index < 0 || index >= IncludePaths.Count || !string.Equals(IncludePaths[index], include)) && !IncludeIndexes.TryGetValue(include, out index))
+            {{
+                _unindexedIncludes++;
+                return;
+            }}
+            {set_bit}
+        }}
+
+        /// <summary>
+        /// Clears the bit of a removed include.
+        /// </summary>
+        private void UntrackInclude(string include)
+        {{
+            if (IncludeIndexes.TryGetValue(include, out var index))
+            {{
+                {clear_bit}
+            }}
+            else
+            {{
+                _unindexedIncludes--;
+            }}
+        }}
+{comparer}    """
+
+def split_query_code(collection_paths):
+    """
+    Generate the members that recommend a split query for the current includes.
+
+    Two collections that are not nested in each other are joined side by side in a single query, which multiplies
+    their rows. The includes of such collections are better loaded with a split query.
+
+    Args:
+        collection_paths (dict): A dictionary mapping the include paths that load a collection to the deepest
+                                 collection they load.
+
+    Returns:
+        str: The code of the members.
+    """
+    entries = "".join(f"""            {{ "{path}", "{collection}" }},\n""" for path, collection in collection_paths.items())
+    return f"""
+        /// <summary>
+        /// Maps every include path that loads a collection navigation to the deepest collection it loads.
+        /// </summary>
+        public static readonly IReadOnlyDictionary<string, string> CollectionPaths = new Dictionary<string, string>
+        {{
+{entries}        }};
+
+        /// <summary>
+        /// Gets whether the current includes load collections that are not nested in each other. A single query
+        /// would multiply their rows, so the includes should be loaded with a split query.
+        /// </summary>
+        public virtual bool IsSplitQueryRecommended
+        {{
+            get
+            {{
+                var collections = new List<string>();
+                foreach (var include in Includes)
+                {{
+                    if (!CollectionPaths.TryGetValue(include, out var collection))
+                    {{
+                        continue;
+                    }}
+                    foreach (var other in collections)
+                    {{
+                        if (!IsPathPrefix(other, collection) && !IsPathPrefix(collection, other))
+                        {{
+                            return true;
+                        }}
+                    }}
+                    collections.Add(collection);
+                }}
+                return false;
+            }}
+        }}
+
+        /// <summary>
+        /// Checks whether an include path is equal to or nested in another one.
+        /// </summary>
+        private static bool IsPathPrefix(string prefix, string path)
+        {{
+            return path.StartsWith(prefix, StringComparison.Ordinal) && (path.Length == prefix.Length || path[prefix.Length] == '.');
+        }}
+    """
+
+def write_class_file(initial_entity_name, class_methods, class_interfaces, output_dir, config_name, namespace, include_store="list", collection_paths=None, write=write_output_file, bundled=False, include_paths=None):
+    """
+    Write the class file for the given configuration.
+
+    This function generates the class file for the given configuration name. It includes methods for adding and removing
+    include paths, and integrates the necessary interfaces if provided. The file is assembled from its parts in a
+    single join, so emitting a class with thousands of methods stays linear in its size.
+
+    Args:
+        initial_entity_name (str): The name of the initial entity.
+        class_methods (list): The definitions of the class methods, see process_transitions.
+        class_interfaces (set): A set of interfaces to be implemented by the class.
+        include_store (str): The backing store of the includes, a key of INCLUDE_STORES.
+        collection_paths (dict, optional): A dictionary mapping the include paths that load a collection to the deepest
+                                           collection they load. If given, the class tells whether the current
+                                           includes should be loaded with a split query.
+        write (callable): The function that writes a generated file and returns its content hash, for example
+                          write_output_file or a bundle, see output.bundle.add_to_bundle.
+        bundled (bool): Whether the file is appended to a bundle, in which the interfaces are imported inside the
+                        namespace.
+        include_paths (list, optional): The include paths in the order of their indexes. If given, the class
+                                        maintains an include fingerprint, see include_fingerprint_code.
+
+    Returns:
+        dict: A dictionary mapping the path of the written file to its content hash.
+    """
+    if not bundled:
+        parts = [f"using {namespace}.Interfaces;\n\nnamespace {namespace}\n{{\n"]
+    else:
+        # Using directives have to precede everything else in a file, so a bundle imports the interfaces per namespace
+        parts = [f"namespace {namespace}\n{{\n    using global::{namespace}.Interfaces;\n\n"]
     if class_interfaces:
-        class_def = class_def.replace(f"public class {initial_entity_name}{config_name} : ", f"public class {initial_entity_name}{config_name} : {', '.join(class_interfaces)}\n{{\n{include_code}\n")
+        parts.append(f"    public class {initial_entity_name}{config_name} : {', '.join(sorted(class_interfaces))}\n{{\n")
     else:
-        class_def = class_def.replace(f"public class {initial_entity_name}{config_name} : ", f"public class {initial_entity_name}{config_name}\n{{\n{include_code}\n")
-    class_def += "    }\n}\n"
-    with open(f"{output_dir}/{initial_entity_name}/{config_name}.cs", 'w') as file:
-        file.write(class_def)
+        parts.append(f"    public class {initial_entity_name}{config_name}\n{{\n")
+    parts.append(include_store_code(include_store, include_paths is not None))
+    if collection_paths is not None:
+        parts.append(split_query_code(collection_paths))
+    if include_paths is not None:
+        parts.append(include_fingerprint_code(include_paths))
+    parts.append("\n")
+    parts.extend(class_methods)
+    parts.append("    }\n}\n")
+    class_def = "".join(parts)
+    file_path = f"{output_dir}/{initial_entity_name}/{config_name}.cs"
+    return {file_path: write(file_path, class_def)}
 
-def write_interface_files(interfaces, output_dir, initial_entity_name, namespace):
+def write_interface_files(interfaces, output_dir, initial_entity_name, namespace, interface_bases=None, shared_interfaces=None, write=write_output_file):
     """
     Write the interface files for the given interfaces.
 
@@ -62,14 +415,35 @@ def write_interface_files(interfaces, output_dir, initial_entity_name, namespace
 
     Args:
         interfaces (dict): A dictionary where the keys are interface names and the values are sets of method signatures.
+        interface_bases (dict, optional): A dictionary mapping interface names to the interfaces they inherit from.
+        shared_interfaces (set, optional): Interfaces that are written together into one SharedInterfaces file
+                                           instead of a file of their own.
+        write (callable): The function that writes a generated file and returns its content hash.
 
     Returns:
-        None
-    """
-    for interface_name, methods in interfaces.items():
-        interface_def = f"namespace {namespace}.Interfaces\n{{\n    public interface {interface_name}\n    {{\n"
-        for method in set(methods):
-            interface_def += f"        {method}\n"
-        interface_def += "    }\n}\n"
-        with open(f"{output_dir}/{initial_entity_name}/Interfaces/{interface_name}.cs", 'w') as file:
-            file.write(interface_def)
\ No newline at end of file
+        dict: A dictionary mapping the paths of the written files to their content hashes.
+    """
+    interface_bases = interface_bases or {}
+    shared_interfaces = shared_interfaces or set()
+
+    def interface_code(interface_name):
+        bases = interface_bases.get(interface_name)
+        parts = [f"    public interface {interface_name}{' : ' + ', '.join(bases) if bases else ''}\n    {{\n"]
+        parts.extend(f"        {method}\n" for method in sorted(set(interfaces[interface_name])))
+        parts.append("    }\n")
+        return "".join(parts)
+
+    written_files = {}
+    for interface_name in interfaces:
+        if interface_name in shared_interfaces:
+            continue
+        interface_def = f"namespace {namespace}.Interfaces\n{{\n{interface_code(interface_name)}}}\n"
+        file_path = f"{output_dir}/{initial_entity_name}/Interfaces/{interface_name}.cs"
+        written_files[file_path] = write(file_path, interface_def)
+
+    if shared_interfaces:
+        shared_code = "\n".join(interface_code(interface_name) for interface_name in sorted(shared_interfaces))
+        shared_def = f"namespace {namespace}.Interfaces\n{{\n{shared_code}}}\n"
+        file_path = f"{output_dir}/{initial_entity_name}/Interfaces/SharedInterfaces.cs"
+        written_files[file_path] = write(file_path, shared_def)
+    return written_files
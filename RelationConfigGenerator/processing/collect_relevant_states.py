@@ -1,28 +1,24 @@
-def collect_relevant_states(transitions):
+def collect_relevant_states(graph):
     """
-    Collect relevant states from a list of transitions.
+    Collect relevant states from a state graph.
 
-    This function processes a list of transition dictionaries to identify and collect all relevant states.
-    A state is considered relevant if it is either a current state in any transition or a next state referenced
-    by any transition.
+    This function marks all relevant states of a state graph. A state is considered relevant if it is either the
+    current state of a transition with next states or a next state referenced by any transition.
 
     Args:
-        transitions (list): A list of transition dictionaries. Each dictionary should have the keys 'current_state'
-                            and 'next_states'. 'current_state' is a string representing the current state, and
-                            'next_states' is a list of strings representing the possible next states.
+        graph (dict): The state graph returned by build_state_graph.
 
     Returns:
-        set: A set of all relevant states, which includes both current states and next states.
+        bytearray: A flag per state ID, 1 for the relevant states.
     """
-    relevant_states = set()
-    referenced_states = set()
-    
-    for transition in transitions:
-        current_state = transition['current_state']
-        next_states = transition['next_states']
-        
-        if next_states:
-            relevant_states.add(current_state)
-            referenced_states.update(next_states)
-    
-    return relevant_states.union(referenced_states)
\ No newline at end of file
+    relevant_states = bytearray(len(graph["names"]))
+    next_offsets = graph["next_offsets"]
+
+    for transition, state in enumerate(graph["transition_states"]):
+        if next_offsets[transition + 1] > next_offsets[transition]:
+            relevant_states[state] = 1
+
+    for state in graph["next_targets"]:
+        relevant_states[state] = 1
+
+    return relevant_states
@@ -0,0 +1,161 @@
+from .process_transitions import interface_methods
+from .state_graph import has_unique_states
+from utils import stats
+
+def block_name(members):
+    """
+    Name the shared interface that declares the methods of a block of sibling states.
+
+    Args:
+        members (list): The states of the block, in transition order.
+
+    Returns:
+        str: The interface name.
+    """
+    if len(members) == 1:
+        return f"I{members[0]}Step"
+    return f"I{members[0]}Through{members[-1]}"
+
+def build_block_tree(members, method_of, blocks, bases, except_blocks):
+    """
+    Build a balanced tree of shared interfaces over a group of sibling states.
+
+    Every leaf declares the method of one state and every inner block inherits its two halves. For each state, the
+    blocks that together cover every other state of the group are recorded: at each level of the tree, the half that
+    does not contain the state. That way 'all siblings except this one' takes a logarithmic number of bases.
+
+    Args:
+        members (list): The states of the group, in transition order.
+        method_of (dict): A dictionary mapping each state to the interface method that moves to it.
+        blocks (dict): Receives the shared interfaces, mapped to the sets of methods they declare themselves.
+        bases (dict): Receives the base interfaces of the inner blocks.
+        except_blocks (dict): Receives, for each state, the blocks covering all other states of the group.
+
+    Returns:
+        str: The name of the root block, which covers the whole group.
+    """
+    name = block_name(members)
+    if len(members) == 1:
+        blocks[name] = {method_of[members[0]]}
+        return name
+
+    middle = len(members) // 2
+    halves = [members[:middle], members[middle:]]
+    for half, other in ((halves[0], halves[1]), (halves[1], halves[0])):
+        for member in half:
+            except_blocks.setdefault(member, []).append(block_name(other))
+
+    blocks[name] = set()
+    bases[name] = [build_block_tree(half, method_of, blocks, bases, except_blocks) for half in halves]
+    return name
+
+def covered_methods(name, blocks, bases):
+    """
+    Collect the methods an interface declares and inherits.
+
+    Args:
+        name (str): The interface name.
+        blocks (dict): A dictionary mapping interfaces to the methods they declare themselves.
+        bases (dict): A dictionary mapping interfaces to their base interfaces.
+
+    Returns:
+        set: All methods of the interface.
+    """
+    methods = set(blocks.get(name, ()))
+    for base in bases.get(name, []):
+        methods |= covered_methods(base, blocks, bases)
+    return methods
+
+def compact_interfaces(graph, interfaces, methods=None):
+    """
+    Factor the shared method sets of the state interfaces into shared base interfaces.
+
+    The next states of a state are the top-level states except its own first part, its siblings and its children.
+    Each of these sets is covered by blocks of a balanced tree over the sibling group it belongs to, so a state
+    interface inherits a logarithmic number of blocks instead of declaring a method per next state. The blocks are
+    disjoint, so no method is inherited twice. State interfaces with identical method sets inherit from the first of
+    them instead. The methods of every state interface, and therefore the fluent API, stay the same.
+
+    Args:
+        graph (dict): The state graph returned by build_state_graph.
+        interfaces (dict): A dictionary mapping the state interfaces to their sets of methods, see process_transitions.
+        methods (list, optional): The interface method declarations, see interface_methods. Built from the graph
+                                  if not given.
+
+    Returns:
+        tuple: A dictionary mapping every interface, state and shared, to the methods it declares itself,
+               a dictionary mapping interfaces to their base interfaces, and the set of shared interface names.
+    """
+    if not has_unique_states(graph):
+        # Paths whose state names collide cannot be told apart in shared interfaces, keep the interfaces as they are
+        return interfaces, {}, set()
+
+    if methods is None:
+        methods = interface_methods(graph)
+    names = graph['names']
+
+    # Sibling groups, keyed by the parent path; the top-level states are the children of the empty path
+    groups = {}
+    states_by_path = {}
+    for path, state in zip(graph['paths'], graph['transition_states']):
+        states_by_path[path] = names[state]
+        if path:
+            groups.setdefault(path.rpartition('.')[0], []).append(names[state])
+
+    method_of = {names[state]: methods[state] for state in graph['transition_states']}
+    blocks = {}
+    bases = {}
+    except_blocks = {}
+    group_roots = {parent: build_block_tree(members, method_of, blocks, bases, except_blocks) for parent, members in groups.items()}
+
+    compacted = {}
+    interface_bases = {}
+    canonical = {}
+    for path, state in zip(graph['paths'], graph['transition_states']):
+        interface_name = f"I{names[state]}"
+        if interface_name not in interfaces:
+            continue
+        state_methods = interfaces[interface_name]
+
+        components = []
+        if path:
+            first_part, _, _ = path.partition('.')
+            components.extend(except_blocks.get(states_by_path.get(first_part), []))
+            if '.' in path:
+                components.extend(except_blocks.get(names[state], []))
+        if path in group_roots:
+            components.append(group_roots[path])
+
+        covered = set()
+        for component in components:
+            covered |= covered_methods(component, blocks, bases)
+        if not covered <= state_methods:
+            # The next states do not follow the usual structure, declare them directly
+            components = []
+            covered = set()
+
+        key = frozenset(state_methods)
+        if key in canonical:
+            compacted[interface_name] = set()
+            interface_bases[interface_name] = [canonical[key]]
+            continue
+        canonical[key] = interface_name
+        compacted[interface_name] = state_methods - covered
+        if components:
+            interface_bases[interface_name] = components
+
+    # Keep the blocks the state interfaces actually build on
+    shared = set()
+    pending = [base for name in list(compacted) for base in interface_bases.get(name, [])]
+    while pending:
+        name = pending.pop()
+        if name in shared or name not in blocks:
+            continue
+        shared.add(name)
+        compacted[name] = blocks[name]
+        if name in bases:
+            interface_bases[name] = bases[name]
+            pending.extend(bases[name])
+
+    stats.increment("shared_interfaces_generated", len(shared))
+    return compacted, interface_bases, shared
@@ -1,3 +1,5 @@
+from utils import stats
+
 def complete_paths(data):
     """
     Complete and sort paths for an entity.
@@ -10,13 +12,15 @@ def complete_paths(data):
         data (dict): A dictionary with the following keys:
             - "Entity" (str): The name of the entity.
             - "paths" (list): A list of strings representing the paths.
+            - "collections" (list, optional): The paths that end in a collection navigation.
 
     Returns:
-        dict: A dictionary containing the entity name and a sorted list of all paths, including any intermediate paths.
-              The dictionary has the following structure:
+        dict: A dictionary containing the entity name, a sorted list of all paths, including any intermediate paths,
+              and the collection paths. The dictionary has the following structure:
               {
                   "Entity": <entity_name>,
-                  "paths": <sorted_paths>
+                  "paths": <sorted_paths>,
+                  "collections": <collection_paths>
               }
     """
     paths = data["paths"]
@@ -36,8 +40,10 @@ def complete_paths(data):
     
     # Sort paths first by the number of segments, then lexicographically
     sorted_paths = sorted(existing_paths, key=lambda x: (len(x.split('.')), x))
+    stats.increment("paths_completed", len(sorted_paths))
     
     return {
         "Entity": data["Entity"],
-        "paths": sorted_paths
+        "paths": sorted_paths,
+        "collections": data.get("collections", [])
     }
\ No newline at end of file
@@ -1,4 +1,5 @@
 import json
+from utils import stats
 
 def create_next_states_dictionary(entity_data, initial_state_name):
     """
@@ -12,7 +13,7 @@ def create_next_states_dictionary(entity_data, initial_state_name):
         entity_data (dict): A dictionary containing the entity's transition data. It should have the following keys:
             - "initial_entity" (str): The name of the initial entity.
             - "transitions" (list): A list of transition dictionaries. Each dictionary should have the keys
-                                    'current_state' and 'path'.
+                                    'current_state' and 'path', and optionally 'collection'.
 
     Returns:
         dict: A dictionary with the initial entity name and a list of transitions. Each transition maps a current state
@@ -23,6 +24,7 @@ def create_next_states_dictionary(entity_data, initial_state_name):
                       {
                           "current_state": <current_state>,
                           "path": <path>,
+                          "collection": <collection_path>,
                           "next_states": [<next_state1>, <next_state2>, ...]
                       },
                       ...
@@ -40,42 +42,50 @@ def create_next_states_dictionary(entity_data, initial_state_name):
         "transitions": []
     }
 
-    # Create a mapping of paths to current states
-    states_by_path = {transition["path"]: transition["current_state"] for transition in transitions}
+    # Index the paths once: each path is registered under its parent path, top-level paths under the empty path
+    states_by_path = {}
+    children_by_path = {}
+    for transition in transitions:
+        path = transition["path"]
+        states_by_path[path] = transition["current_state"]
+        if path:
+            parent_path = path.rpartition('.')[0]
+            children_by_path.setdefault(parent_path, []).append(path)
+
+    top_level_paths = children_by_path.get("", [])
+    initial_state = f"{entity_name}{initial_state_name}"
 
     for transition in transitions:
         current_state = transition["current_state"]
         path = transition["path"]
-        path_parts = path.split('.')
-        path_length = len(path_parts)
 
-        next_states = set()
-
-        if path_length == 0:
+        if not path:
             # If the path is empty, consider all top-level states as next states
-            next_states.update(s for p, s in states_by_path.items() if len(p.split('.')) == 1)
-        elif path_length >= 1:
-            first_part = path_parts[0]
+            next_paths = top_level_paths
+        else:
+            first_part = path.partition('.')[0]
+            parent_path = path.rpartition('.')[0]
             # Consider all top-level states except the first part of the current path
-            next_states.update(s for p, s in states_by_path.items() if len(p.split('.')) == 1 and p != first_part)
+            next_paths = [p for p in top_level_paths if p != first_part]
             # Consider states at the same level as the current path
-            for candidate_path, candidate_state in states_by_path.items():
-                candidate_parts = candidate_path.split('.')
-                if len(candidate_parts) == path_length and candidate_parts[:-1] == path_parts[:-1] and candidate_path != path:
-                    next_states.add(candidate_state)
+            if parent_path:
+                next_paths.extend(p for p in children_by_path[parent_path] if p != path)
             # Consider states at the next level of the current path
-            next_length = path_length + 1
-            for candidate_path, candidate_state in states_by_path.items():
-                if len(candidate_path.split('.')) == next_length and candidate_path.startswith(path + '.'):
-                    next_states.add(candidate_state)
+            next_paths.extend(children_by_path.get(path, []))
+
+        # Paths can share a state name, for example when a segment has no capitals to abbreviate
+        next_states = list(dict.fromkeys(states_by_path[p] for p in next_paths))
 
         # Remove specific state if necessary
-        next_states.discard(f"{entity_name}{initial_state_name}")
+        if initial_state in next_states:
+            next_states.remove(initial_state)
 
         next_states_dict["transitions"].append({
             "current_state": current_state,
             "path": path,
-            "next_states": list(next_states)
+            "collection": transition.get("collection"),
+            "next_states": next_states
         })
+        stats.increment("next_state_edges", len(next_states))
 
     return next_states_dict
\ No newline at end of file
@@ -1,3 +1,5 @@
+from utils import stats
+
 def process_path_part(path_part):
     """
     Process a part of a path to extract lowercase letters from uppercase letters.
@@ -14,6 +16,27 @@ def process_path_part(path_part):
     result = ''.join(char.lower() for char in path_part if char.isupper())
     return result.capitalize() if result else ""
 
+def find_deepest_collection(path, collections):
+    """
+    Find the deepest collection navigation loaded by an include path.
+
+    Including a path loads every navigation along it, so the path loads a collection if any of its prefixes is one.
+
+    Args:
+        path (str): The include path, for example 'TransactionGroupUsers.GroupUser'.
+        collections (set): The paths that end in a collection navigation.
+
+    Returns:
+        str: The longest prefix of the path that is a collection path, or None.
+    """
+    deepest = None
+    prefix = ""
+    for part in path.split('.') if path else []:
+        prefix = f"{prefix}.{part}" if prefix else part
+        if prefix in collections:
+            deepest = prefix
+    return deepest
+
 def create_state_dictionary(entity_data, initial_state_name):
     """
     Create a state dictionary for an entity based on its paths.
@@ -25,16 +48,19 @@ def create_state_dictionary(entity_data, initial_state_name):
         entity_data (dict): A dictionary containing the entity's data. It should have the following keys:
             - "Entity" (str): The name of the entity.
             - "paths" (list): A list of strings representing the paths.
+            - "collections" (list, optional): The paths that end in a collection navigation.
 
     Returns:
         dict: A dictionary with the initial entity name and a list of transitions. Each transition maps a current state
-              to its corresponding path. The dictionary has the following structure:
+              to its corresponding path and the deepest collection navigation the path loads, or None if it loads none.
+              The dictionary has the following structure:
               {
                   "initial_entity": <entity_name>,
                   "transitions": [
                       {
                           "current_state": <current_state_name>,
-                          "path": <path>
+                          "path": <path>,
+                          "collection": <collection_path>
                       },
                       ...
                   ]
@@ -46,6 +72,8 @@ def create_state_dictionary(entity_data, initial_state_name):
         "transitions": []
     }
 
+    collections = set(entity_data.get('collections', []))
+
     for path in entity_data['paths']:
         if len(path) == 0:
             current_state_name = f"{entity_name}{initial_state_name}"
@@ -57,7 +85,9 @@ def create_state_dictionary(entity_data, initial_state_name):
         
         state_structure["transitions"].append({
             "current_state": current_state_name,
-            "path": path
+            "path": path,
+            "collection": find_deepest_collection(path, collections)
         })
 
+    stats.increment("states_generated", len(state_structure["transitions"]))
     return state_structure
\ No newline at end of file
@@ -0,0 +1,146 @@
+import json
+from .complete_paths import complete_paths
+from utils.entity_properties import navigation_target
+
+def classify_navigations(entity_data, properties_of):
+    """
+    Classify every navigation of an entity's include paths as a collection or a reference.
+
+    Navigations are looked up in the properties of the entity type they start from. Navigations whose type is
+    unknown count as collections if the include directives step into them with Select, and as unknown otherwise.
+
+    Args:
+        entity_data (dict): The include directives with the keys 'Entity', 'paths' and 'collections', see
+                            collect_include_directives.
+        properties_of (callable): A function returning the properties of an entity type, mapped to their declared
+                                  types, or an empty dictionary if the type is unknown.
+
+    Returns:
+        dict: A dictionary mapping every path, including the intermediate ones, to its kind, 'collection',
+              'reference' or 'unknown', in the order of complete_paths.
+    """
+    completed = complete_paths(entity_data)
+    collections = set(completed["collections"])
+    kinds = {}
+    target_types = {"": entity_data["Entity"]}
+    for path in completed["paths"]:
+        if not path:
+            continue
+        parent, _, navigation = path.rpartition('.')
+        parent_type = target_types.get(parent)
+        declared_type = properties_of(parent_type).get(navigation) if parent_type else None
+        if declared_type:
+            target_types[path], is_collection = navigation_target(declared_type)
+            kinds[path] = 'collection' if is_collection else 'reference'
+        else:
+            kinds[path] = 'collection' if path in collections else 'unknown'
+    return kinds
+
+def analyze_include_cost(entity_data, properties_of, collection_size=10):
+    """
+    Estimate the row multiplication of an entity's include directives when they are loaded in a single query.
+
+    Every collection navigation joined into the query multiplies the rows of its parent by the size of the
+    collection. Nested collections multiply along a path, collections side by side multiply with each other.
+
+    Args:
+        entity_data (dict): The include directives with the keys 'Entity', 'paths' and 'collections'.
+        properties_of (callable): A function returning the properties of an entity type, see classify_navigations.
+        collection_size (int): The number of rows assumed per collection.
+
+    Returns:
+        dict: A dictionary with the keys 'entity', 'cartesian_factor', the estimated factor of all includes together,
+              and 'paths', one dictionary per declared include path with the keys 'path', 'fan_out_depth', the
+              number of collections along the path, 'cartesian_factor', 'collections' and 'unknown', the
+              navigations along the path that are collections or could not be classified.
+    """
+    kinds = classify_navigations(entity_data, properties_of)
+
+    # Children come after their parents in kinds, so walking it backwards finishes every subtree before its root
+    subtree_factors = {}
+    for path in reversed(list(kinds)):
+        factor = subtree_factors.pop(path, 1) * (collection_size if kinds[path] == 'collection' else 1)
+        parent = path.rpartition('.')[0]
+        subtree_factors[parent] = subtree_factors.get(parent, 1) * factor
+
+    paths = []
+    for path in dict.fromkeys(entity_data["paths"]):
+        if not path:
+            continue
+        prefixes = ['.'.join(path.split('.')[:length]) for length in range(1, path.count('.') + 2)]
+        collections = [prefix for prefix in prefixes if kinds[prefix] == 'collection']
+        paths.append({
+            "path": path,
+            "fan_out_depth": len(collections),
+            "cartesian_factor": collection_size ** len(collections),
+            "collections": collections,
+            "unknown": [prefix for prefix in prefixes if kinds[prefix] == 'unknown']
+        })
+
+    return {
+        "entity": entity_data["Entity"],
+        "cartesian_factor": subtree_factors.get("", 1),
+        "paths": paths
+    }
+
+def find_violations(reports, max_fan_out_depth=None, max_cartesian_factor=None):
+    """
+    Find the include paths and entities that exceed the cost thresholds.
+
+    Args:
+        reports (list): The reports returned by analyze_include_cost.
+        max_fan_out_depth (int, optional): The highest number of nested collections allowed along a path.
+        max_cartesian_factor (int, optional): The highest estimated factor allowed for a path or for all includes
+                                              of an entity together.
+
+    Returns:
+        list: Messages describing every exceeded threshold.
+    """
+    violations = []
+    for report in reports:
+        for path in report["paths"]:
+            if max_fan_out_depth is not None and path["fan_out_depth"] > max_fan_out_depth:
+                violations.append(f"{report['entity']} {path['path']}: fan-out depth {path['fan_out_depth']} exceeds {max_fan_out_depth}")
+            if max_cartesian_factor is not None and path["cartesian_factor"] > max_cartesian_factor:
+                violations.append(f"{report['entity']} {path['path']}: cartesian factor {path['cartesian_factor']} exceeds {max_cartesian_factor}")
+        if max_cartesian_factor is not None and report["cartesian_factor"] > max_cartesian_factor:
+            violations.append(f"{report['entity']}: cartesian factor {report['cartesian_factor']} of all includes exceeds {max_cartesian_factor}")
+    return violations
+
+def format_cost_report(reports, violations, collection_size, output_format='text'):
+    """
+    Format the include cost reports, ranking the paths by fan-out depth and cartesian factor.
+
+    Args:
+        reports (list): The reports returned by analyze_include_cost.
+        violations (list): The messages returned by find_violations.
+        collection_size (int): The number of rows assumed per collection.
+        output_format (str): 'text' for a human-readable report or 'json'.
+
+    Returns:
+        str: The formatted report.
+    """
+    ranked = sorted(((report["entity"], path) for report in reports for path in report["paths"]),
+                    key=lambda item: (-item[1]["fan_out_depth"], -item[1]["cartesian_factor"], item[0], item[1]["path"]))
+    entities = sorted(reports, key=lambda report: (-report["cartesian_factor"], report["entity"]))
+
+    if output_format == 'json':
+        return json.dumps({
+            "collection_size": collection_size,
+            "paths": [dict(path, entity=entity) for entity, path in ranked],
+            "entities": [{"entity": report["entity"], "cartesian_factor": report["cartesian_factor"]} for report in entities],
+            "violations": violations
+        }, indent=2)
+
+    entity_width = max((len(report["entity"]) for report in reports), default=0)
+    lines = [f"Include paths, assuming {collection_size} rows per collection:"]
+    for entity, path in ranked:
+        unknown = f"  (unknown: {', '.join(path['unknown'])})" if path["unknown"] else ""
+        lines.append(f"  depth {path['fan_out_depth']:2}  factor {path['cartesian_factor']:>10}  {entity:<{entity_width}}  {path['path']}{unknown}")
+    lines.append("Entities, all includes in one query:")
+    for report in entities:
+        lines.append(f"  factor {report['cartesian_factor']:>10}  {report['entity']}")
+    if violations:
+        lines.append("Thresholds exceeded:")
+        lines.extend(f"  {violation}" for violation in violations)
+    return "\n".join(lines)
@@ -0,0 +1,43 @@
+def declared_include_paths(paths):
+    """
+    List the include paths of an IncludeDirectives declaration in the order they are declared.
+
+    Every path follows its intermediate paths, which are declared implicitly by the first path passing through
+    them. Unlike the transitions, which are sorted by depth and name, this order only changes at the end when
+    directives are appended to the declaration.
+
+    Args:
+        paths (list): The paths of the declaration, see collect_include_directives.
+
+    Returns:
+        list: The distinct include paths, without the empty path of the initial state.
+    """
+    declared = {}
+    for path in paths:
+        elements = path.split('.') if path else []
+        for i in range(1, len(elements) + 1):
+            declared.setdefault('.'.join(elements[:i]), None)
+    return list(declared)
+
+def assign_include_indexes(paths, previous=None):
+    """
+    Assign every include path of an entity its index in the include fingerprint.
+
+    The paths of the previous assignment keep their index, even if they are no longer declared, so the bits of an
+    include never move between regenerations. New paths are appended in the order given.
+
+    Args:
+        paths (list): The include paths of the entity, usually in the order they are declared, see
+                      declared_include_paths.
+        previous (list, optional): The include paths of the previous assignment, in the order of their indexes.
+
+    Returns:
+        list: The include paths in the order of their indexes.
+    """
+    include_paths = list(previous or [])
+    known = set(include_paths)
+    for path in paths:
+        if path and path not in known:
+            known.add(path)
+            include_paths.append(path)
+    return include_paths
@@ -0,0 +1,158 @@
+import os
+import json
+
+GRAPH_FORMAT = 'includy-graph'
+GRAPH_VERSION = 1
+
+def encode_graph(graph):
+    """
+    Encode the include graph of an entity in the compact form of the graph file.
+
+    Transitions are stored as parallel lists indexed by transition; collections, next states and the declared
+    order of the include paths refer to other transitions by index instead of repeating their paths and state names.
+
+    Args:
+        graph (dict): The next states dictionary of the entity, see create_next_states_dictionary.
+
+    Returns:
+        dict: A dictionary with the keys 'entity', 'paths', 'states', 'collections', the index of the deepest
+              collection each path loads or None, 'next', the indices of the next states of each transition, and
+              'order', the transitions of the include paths in the order they are declared.
+    """
+    transitions = graph["transitions"]
+    # Paths can share a state name, a next state refers to the first transition of its state
+    index_of_path = {}
+    index_of_state = {}
+    for index, transition in enumerate(transitions):
+        index_of_path.setdefault(transition["path"], index)
+        index_of_state.setdefault(transition["current_state"], index)
+
+    return {
+        "entity": graph["initial_entity"],
+        "paths": [transition["path"] for transition in transitions],
+        "states": [transition["current_state"] for transition in transitions],
+        "collections": [index_of_path[transition["collection"]] if transition.get("collection") else None for transition in transitions],
+        "next": [[index_of_state[state] for state in transition["next_states"]] for transition in transitions],
+        "order": [index_of_path[path] for path in graph.get("include_paths") or index_of_path if path]
+    }
+
+def check_index(index, count, entity):
+    """
+    Check that an index of the graph file refers to a transition of the graph.
+
+    Args:
+        index: The index read from the file.
+        count (int): The number of transitions of the graph.
+        entity (str): The entity of the graph, for the error message.
+
+    Returns:
+        int: The index.
+
+    Raises:
+        ValueError: If the index is not an integer or out of range. Negative indices would silently refer to
+                    transitions counted from the end.
+    """
+    if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < count:
+        raise ValueError(f"the graph of {entity} refers to transition {index!r}, it has {count}")
+    return index
+
+def decode_graph(encoded, initial_state_name=None):
+    """
+    Decode an include graph of the graph file.
+
+    Args:
+        encoded (dict): The graph as returned by encode_graph.
+        initial_state_name (str, optional): The name part of the initial state the graph was built with. If given,
+                                            the first transition has to be the initial state of the entity.
+
+    Returns:
+        dict: The next states dictionary of the entity, see create_next_states_dictionary, with the declared order
+              of its include paths. Graphs saved without an order keep the order of their transitions.
+
+    Raises:
+        ValueError: If the graph is malformed.
+    """
+    try:
+        entity = encoded["entity"]
+        paths, states, collections, next_states = encoded["paths"], encoded["states"], encoded["collections"], encoded["next"]
+        count = len(paths)
+        if not isinstance(entity, str) or not all(isinstance(value, str) for value in paths + states):
+            raise ValueError(f"the graph of {entity!r} has names that are not strings")
+        if not (len(states) == len(collections) == len(next_states) == count):
+            raise ValueError(f"the transitions of {entity} have lists of different lengths")
+        if initial_state_name is not None and count and (paths[0] != '' or states[0] != f"{entity}{initial_state_name}"):
+            raise ValueError(f"the graph of {entity} does not start with its initial state {entity}{initial_state_name}")
+
+        graph = {"initial_entity": entity, "transitions": []}
+        for index in range(count):
+            collection = collections[index]
+            graph["transitions"].append({
+                "current_state": states[index],
+                "path": paths[index],
+                "collection": paths[check_index(collection, count, entity)] if collection is not None else None,
+                "next_states": [states[check_index(state, count, entity)] for state in next_states[index]]
+            })
+        order = encoded.get("order")
+        graph["include_paths"] = [paths[check_index(index, count, entity)] for index in order] if order is not None else [path for path in dict.fromkeys(paths) if path]
+    except (KeyError, TypeError, IndexError) as error:
+        raise ValueError(f"malformed graph: {error!r}") from None
+    return graph
+
+def save_include_graph(file_path, graphs, initial_state_name):
+    """
+    Save the include graphs of a run to a graph file.
+
+    Every graph is written on a line of its own, so the graph files of two runs can be compared line by line.
+    The file is replaced atomically.
+
+    Args:
+        file_path (str): The path of the graph file.
+        graphs (list): The next states dictionaries of the entities, see create_next_states_dictionary.
+        initial_state_name (str): The name part of the initial states the graphs were built with.
+
+    Returns:
+        None
+    """
+    header = json.dumps({"format": GRAPH_FORMAT, "version": GRAPH_VERSION, "initial_state_name": initial_state_name}, separators=(',', ':'))
+    lines = [json.dumps(encode_graph(graph), separators=(',', ':')) for graph in graphs]
+    body = ",\n".join(lines)
+    content = f'{header[:-1]},"graphs":[\n{body}\n]}}\n' if lines else f'{header[:-1]},"graphs":[]}}\n'
+
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, file_path)
+
+def load_include_graph(file_path, initial_state_name=None):
+    """
+    Load the include graphs of a graph file.
+
+    Args:
+        file_path (str): The path of the graph file.
+        initial_state_name (str, optional): The name part of the initial states the graphs are expected to be built
+                                            with, usually the one of the current run.
+
+    Returns:
+        list: The next states dictionaries of the entities, see create_next_states_dictionary.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a graph file of a supported version, is malformed or was built with another
+                    initial state name.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+
+    if not isinstance(document, dict) or document.get("format") != GRAPH_FORMAT:
+        raise ValueError("not an include graph file")
+    if document.get("version") != GRAPH_VERSION:
+        raise ValueError(f"unsupported graph version {document.get('version')!r}, expected {GRAPH_VERSION}")
+    saved_initial_state_name = document.get("initial_state_name")
+    if not isinstance(saved_initial_state_name, str) or not saved_initial_state_name:
+        raise ValueError("the graph file has no initial state name")
+    if initial_state_name is not None and saved_initial_state_name != initial_state_name:
+        raise ValueError(f"the graphs were built with the initial state name {saved_initial_state_name!r}, not {initial_state_name!r}")
+    if not isinstance(document.get("graphs"), list):
+        raise ValueError("the graph file has no graphs")
+    return [decode_graph(encoded, saved_initial_state_name) for encoded in document["graphs"]]
@@ -1,9 +1,13 @@
+from .state_graph import build_state_graph
 from .collect_relevant_states import collect_relevant_states
-from .process_transitions import process_transitions
+from .process_transitions import interface_methods, process_transitions
+from .compact_interfaces import compact_interfaces
+from .include_fingerprint import assign_include_indexes
 from utils.directory_operations import create_directories
-from output.write_files import write_class_file, write_interface_files
+from output.write_files import write_output_file, write_class_file, write_interface_files
+from utils import stats
 
-def process_include_configuration(next_states_dictionary, output_dir, config_name):
+def process_include_configuration(next_states_dictionary, output_dir, config_name, include_store='list', compact=False, write=None, bundled=False, split_query_hints=False, include_fingerprint=False, include_paths=None):
     """
     Process the include configuration based on the next states dictionary.
 
@@ -14,10 +18,26 @@ def process_include_configuration(next_states_dictionary, output_dir, config_nam
         next_states_dictionary (dict): A dictionary containing the next states information. It should have the following keys:
             - "initial_entity" (str): The name of the initial entity.
             - "transitions" (list): A list of transition dictionaries. Each dictionary should have the keys
-                                    'current_state', 'path', and 'next_states'.
+                                    'current_state', 'path', and 'next_states', and optionally 'collection'.
+            - "include_paths" (list, optional): The include paths in the order they are declared.
+        output_dir (str): The directory to write the files to.
+        config_name (str): The name part of the generated class.
+        include_store (str): The backing store of the includes in the generated class, see write_class_file.
+        compact (bool): Whether to factor the shared methods of the interfaces into shared base interfaces.
+        write (callable, optional): The function that writes a generated file and returns its content hash, for
+                                    example a bundle or an in-memory store. Defaults to write_output_file, for which
+                                    the entity directories are created.
+        bundled (bool): Whether the files are appended to a bundle instead of being written as files of their own.
+        split_query_hints (bool): Whether the generated class tells if its includes are better loaded with a split
+                                  query, see split_query_code.
+        include_fingerprint (bool): Whether the generated class fingerprints its current includes, see
+                                    include_fingerprint_code.
+        include_paths (list, optional): With include_fingerprint, the include paths in the order of their indexes in
+                                        the fingerprint, see assign_include_indexes. Defaults to the 'include_paths' of
+                                        the next states dictionary, or to the paths of its transitions.
 
     Returns:
-        None
+        dict: A dictionary mapping the paths of the generated files to their content hashes.
     """
 
     # Extract the initial entity name and transitions from the next states dictionary
@@ -25,28 +45,57 @@ def process_include_configuration(next_states_dictionary, output_dir, config_nam
     transitions = next_states_dictionary['transitions']
 
     # Create necessary directories
-    create_directories([f'{output_dir}/{initial_entity_name}', f'{output_dir}/{initial_entity_name}/Interfaces'])
+    if write is None:
+        with stats.stage("write"):
+            create_directories([f'{output_dir}/{initial_entity_name}', f'{output_dir}/{initial_entity_name}/Interfaces'])
+        write = write_output_file
     
     # Initialize an empty dictionary to store interfaces
     interfaces = {}
     
-    # Initialize the class definition string
     sanitized_output_dir = output_dir.replace('/', '.').lstrip('.')
 
     namespace = f"{sanitized_output_dir}.{config_name}.{initial_entity_name}"
-    class_def = f"using {namespace}.Interfaces;\n\nnamespace {namespace}\n{{\n    public class {initial_entity_name}{config_name} : "
     
-    # Collect all relevant states from the transitions
-    all_relevant_states = collect_relevant_states(transitions)
-    
-    # Process transitions to generate class methods and interfaces
-    class_methods, class_interfaces = process_transitions(transitions, all_relevant_states, interfaces)
-    
-    # Append the class methods to the class definition
-    class_def += class_methods
+    with stats.stage("process_transitions"):
+        # Intern the states, the following stages work on state IDs and resolve names when writing code
+        graph = build_state_graph(next_states_dictionary)
+        methods = interface_methods(graph)
+
+        # Every include path has its bit in the include fingerprint
+        include_indexes = None
+        if not include_fingerprint:
+            include_paths = None
+        else:
+            if include_paths is None:
+                include_paths = assign_include_indexes(next_states_dictionary.get('include_paths') or graph['paths'])
+            include_indexes = {path: index for index, path in enumerate(include_paths)}
+
+        # Collect all relevant states from the transitions
+        all_relevant_states = collect_relevant_states(graph)
+
+        # Process transitions to generate class methods and interfaces
+        class_methods, class_interfaces = process_transitions(graph, all_relevant_states, interfaces, methods, include_indexes)
     
+    stats.increment("interfaces_generated", len(interfaces))
+
+    # Map every include path that loads a collection to the deepest collection it loads, for the split query hint
+    collection_paths = None
+    if split_query_hints:
+        collection_paths = {transition['path']: transition['collection'] for transition in transitions if transition.get('collection')}
+
     # Write the class file
-    write_class_file(initial_entity_name, class_def, class_interfaces, output_dir, config_name, namespace)
+    with stats.stage("write"):
+        generated_files = write_class_file(initial_entity_name, class_methods, class_interfaces, output_dir, config_name, namespace, include_store, collection_paths, write, bundled, include_paths)
 
     # Write the interface files
-    write_interface_files(interfaces, output_dir, initial_entity_name, namespace)
\ No newline at end of file
+    if compact:
+        with stats.stage("compact_interfaces"):
+            interfaces, interface_bases, shared_interfaces = compact_interfaces(graph, interfaces, methods)
+        with stats.stage("write"):
+            generated_files.update(write_interface_files(interfaces, output_dir, initial_entity_name, namespace, interface_bases, shared_interfaces, write))
+    else:
+        with stats.stage("write"):
+            generated_files.update(write_interface_files(interfaces, output_dir, initial_entity_name, namespace, write=write))
+
+    return generated_files
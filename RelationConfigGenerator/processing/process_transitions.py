@@ -1,57 +1,91 @@
-def process_transitions(transitions, all_relevant_states, interfaces):
+from utils import stats
+
+def interface_methods(graph):
+    """
+    Build the interface method declaration that moves to each state.
+
+    Args:
+        graph (dict): The state graph returned by build_state_graph.
+
+    Returns:
+        list: The method declarations, indexed by state ID. A method returns the interface of its state if the state
+              has next states.
+    """
+    next_offsets = graph["next_offsets"]
+    methods = []
+    for state, name in enumerate(graph["names"]):
+        # Find the corresponding transition for the state
+        transition = graph["first_transitions"][state]
+
+        # Get the path of the state
+        path = graph["paths"][transition] if transition >= 0 else 'initialpath'
+
+        if transition >= 0 and next_offsets[transition + 1] > next_offsets[transition]:
+            methods.append(f"I{name} {name}(string path = \"{path}\");")
+        else:
+            methods.append(f"void {name}(string path = \"{path}\");")
+    return methods
+
+def process_transitions(graph, all_relevant_states, interfaces, methods=None, include_indexes=None):
     """
     Process transitions to generate class methods and interfaces.
 
-    This function processes a list of transitions to generate the class methods and interfaces required for
-    the include configuration. It constructs method signatures based on the current state and next states,
-    and updates the interfaces dictionary with the appropriate interface methods.
+    This function processes the transitions of a state graph to generate the class methods and interfaces required
+    for the include configuration. It constructs method signatures based on the current state and next states,
+    and updates the interfaces dictionary with the appropriate interface methods. The next states are collected
+    as state IDs and resolved to their method declarations once per interface.
 
     Args:
-        transitions (list): A list of transition dictionaries. Each dictionary should have the keys
-                            'current_state', 'next_states', and optionally 'path'.
-        all_relevant_states (set): A set of states that are relevant for processing.
+        graph (dict): The state graph returned by build_state_graph.
+        all_relevant_states (bytearray): The relevant states, see collect_relevant_states.
         interfaces (dict): A dictionary to store the interfaces and their methods.
+        methods (list, optional): The interface method declarations, see interface_methods. Built from the graph
+                                  if not given.
+        include_indexes (dict, optional): A dictionary mapping include paths to their indexes in the include
+                                          fingerprint. The methods pass the index of their path to AddInclude.
 
     Returns:
-        tuple: A tuple containing the class definition string and a set of class interfaces.
+        tuple: A tuple containing the list of class method definitions, in transition order, and a set of class
+               interfaces. The methods are joined once when the class is written, see write_class_file.
     """
-    class_def = ""
+    class_methods = []
     class_interfaces = set()
+    next_states_by_state = {}
+
+    if methods is None:
+        methods = interface_methods(graph)
+
+    names = graph["names"]
+    paths = graph["paths"]
+    next_offsets = graph["next_offsets"]
+    next_targets = graph["next_targets"]
+
+    for transition, state in enumerate(graph["transition_states"]):
+        if not all_relevant_states[state]:
+            continue
+
+        current_state = names[state]
+        path = paths[transition]
+        start, end = next_offsets[transition], next_offsets[transition + 1]
+        index = include_indexes.get(path) if include_indexes else None
+        add_include = f"AddInclude(path, {index});" if index is not None else "AddInclude(path);"
+
+        # Construct the method signature based on whether there are next states
+        method_signature = (
+            f"        public I{current_state} {current_state}(string path = \"{path}\") {{\n"
+            f"            {add_include}\n"
+            f"            return this;\n"
+            f"        }}\n"
+        ) if end > start else f"        public void {current_state}(string path = \"{path}\") {{\n            {add_include}\n        }}\n"
+
+        class_methods.append(method_signature)
+        stats.increment("methods_generated")
+
+        if end > start:
+            class_interfaces.add(f"I{current_state}")
+            next_states_by_state.setdefault(state, set()).update(next_targets[start:end])
+
+    for state, next_states in next_states_by_state.items():
+        interfaces.setdefault(f"I{names[state]}", set()).update(methods[next_state] for next_state in next_states)
 
-    for transition in transitions:
-        current_state = transition['current_state']
-        next_states = transition['next_states']
-        path = transition.get('path', 'initialpath')
-
-        if current_state in all_relevant_states:
-            # Construct the method signature based on whether there are next states
-            method_signature = (
-                f"        public I{current_state} {current_state}(string path = \"{path}\") {{\n"
-                f"            AddInclude(path);\n"
-                f"            return this;\n"
-                f"        }}\n"
-            ) if next_states else f"        public void {current_state}(string path = \"{path}\") {{\n            AddInclude(path);\n        }}\n"
-            
-            class_def += method_signature
-
-            if next_states:
-                interface_name = f"I{current_state}"
-                class_interfaces.add(interface_name)
-
-                if interface_name not in interfaces:
-                    interfaces[interface_name] = set()
-
-                for next_state in next_states:
-                    # Find the corresponding transition for next_state
-                    next_state_transitions = next(filter(lambda t: t['current_state'] == next_state, transitions), None)
-                    
-                    # Get the path of the next state
-                    next_state_path = next_state_transitions.get('path', 'initialpath') if next_state_transitions else 'initialpath'
-
-                    # Adjust the method signature to use next_state's path
-                    if next_state_transitions and next_state_transitions['next_states']:
-                        interfaces[interface_name].add(f"I{next_state} {next_state}(string path = \"{next_state_path}\");")
-                    else:
-                        interfaces[interface_name].add(f"void {next_state}(string path = \"{next_state_path}\");")
-
-    return class_def, class_interfaces
+    return class_methods, class_interfaces
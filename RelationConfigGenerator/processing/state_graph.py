@@ -0,0 +1,87 @@
+from array import array
+
+def build_state_graph(next_states_dictionary):
+    """
+    Intern the states of a next states dictionary into a compact, array-backed graph.
+
+    Every distinct state name gets an integer ID. Transitions are stored as parallel arrays indexed by transition and
+    their next states as one flat array of state IDs, so the emission stages work on integers and only resolve names
+    when the code is written.
+
+    Args:
+        next_states_dictionary (dict): The next states dictionary of an entity, see create_next_states_dictionary.
+
+    Returns:
+        dict: A dictionary with the following keys:
+            - "entity" (str): The name of the initial entity.
+            - "names" (list): The state names, indexed by state ID.
+            - "paths" (list): The paths, indexed by transition.
+            - "transition_states" (array): The state ID of each transition.
+            - "first_transitions" (array): The index of the first transition of each state, -1 for states that
+                                           are only referenced as next states.
+            - "next_offsets" (array): The next states of transition i are next_targets[next_offsets[i]:next_offsets[i + 1]].
+            - "next_targets" (array): The state IDs of the next states of all transitions.
+    """
+    transitions = next_states_dictionary['transitions']
+    ids = {}
+    names = []
+    paths = []
+    transition_states = array('i')
+    first_transitions = array('i')
+
+    for index, transition in enumerate(transitions):
+        name = transition['current_state']
+        state = ids.get(name)
+        if state is None:
+            state = ids[name] = len(names)
+            names.append(name)
+            first_transitions.append(index)
+        transition_states.append(state)
+        paths.append(transition['path'])
+
+    next_offsets = array('i', [0])
+    next_targets = array('i')
+    for transition in transitions:
+        for name in transition['next_states']:
+            state = ids.get(name)
+            if state is None:
+                state = ids[name] = len(names)
+                names.append(name)
+                first_transitions.append(-1)
+            next_targets.append(state)
+        next_offsets.append(len(next_targets))
+
+    return {
+        "entity": next_states_dictionary['initial_entity'],
+        "names": names,
+        "paths": paths,
+        "transition_states": transition_states,
+        "first_transitions": first_transitions,
+        "next_offsets": next_offsets,
+        "next_targets": next_targets
+    }
+
+def has_next_states(graph, transition):
+    """
+    Check whether a transition has next states.
+
+    Args:
+        graph (dict): The state graph returned by build_state_graph.
+        transition (int): The index of the transition.
+
+    Returns:
+        bool: True if the transition has at least one next state.
+    """
+    return graph["next_offsets"][transition + 1] > graph["next_offsets"][transition]
+
+def has_unique_states(graph):
+    """
+    Check whether every transition has a state of its own.
+
+    Args:
+        graph (dict): The state graph returned by build_state_graph.
+
+    Returns:
+        bool: False if the state names of some paths collide.
+    """
+    return len(set(graph["transition_states"])) == len(graph["transition_states"])
@@ -0,0 +1,111 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run
+from output.bundle import open_bundle, add_to_bundle, flush_bundle, close_bundle, discard_bundle
+
+EMPTY_QUERY_OBJECT = '''namespace Synthetic.DAL.QueryObjects
+{
+    public class EmptyQueryObject : Level1QueryObject<EmptyEntity, EmptyQueryObject>
+    {
+        public override ICollection<Func<EmptyEntity, object>> IncludeDirectives { get; } = new List<Func<EmptyEntity, object>>
+        {
+        };
+    }
+}
+'''
+
+def list_files(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+                  for root, _, names in os.walk(directory) for name in names if not name.startswith('.'))
+
+class BundleTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='includy-test-')
+        self.file_path = os.path.join(self.directory, "Entity", "RelationsConfig.cs")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_joins_the_added_files(self):
+        self.assertEqual(list(self.write_bundle("class A {}\n", "class B {}\n")), [self.file_path])
+        with open(self.file_path) as f:
+            self.assertEqual(f.read(), "class A {}\n\nclass B {}\n")
+        self.assertEqual(os.listdir(os.path.dirname(self.file_path)), ["RelationsConfig.cs"])
+
+    def write_bundle(self, *contents):
+        bundle = open_bundle(self.file_path)
+        for index, content in enumerate(contents):
+            add_to_bundle(bundle, f"{index}.cs", content)
+        return close_bundle(bundle)
+
+    def test_unchanged_bundle_is_not_replaced(self):
+        self.write_bundle("class A {}\n")
+        inode = os.stat(self.file_path).st_ino
+        self.write_bundle("class A {}\n")
+        self.assertEqual(os.stat(self.file_path).st_ino, inode)
+        self.write_bundle("class B {}\n")
+        self.assertNotEqual(os.stat(self.file_path).st_ino, inode)
+
+    def test_empty_bundle_is_not_written(self):
+        self.assertEqual(close_bundle(open_bundle(self.file_path)), {})
+        self.assertFalse(os.path.exists(os.path.dirname(self.file_path)))
+
+    def test_discarded_bundle_leaves_no_file(self):
+        bundle = open_bundle(self.file_path)
+        add_to_bundle(bundle, "A.cs", "class A {}\n")
+        flush_bundle(bundle)
+        discard_bundle(bundle)
+        self.assertEqual(os.listdir(os.path.dirname(self.file_path)), [])
+
+class BundleLayoutTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        with open(os.path.join(self.project, "Synthetic.DAL", "QueryObjects", "EmptyQueryObject.cs"), 'w') as f:
+            f.write(EMPTY_QUERY_OBJECT)
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def generate(self, output_dir, *arguments):
+        with redirect_stdout(io.StringIO()):
+            run(parse_args(["--project", self.project, "-o", output_dir, *arguments]))
+        return os.path.join(self.project, output_dir)
+
+    def test_entity_bundles(self):
+        separate = self.generate("Separate", "--all")
+        bundled = self.generate("Bundled", "--all", "--bundle", "entity")
+        # Entities without include directives get no bundle, like they get no files without bundling
+        self.assertEqual(list_files(bundled), ["Entity0Entity/RelationsConfig.cs", "Entity1Entity/RelationsConfig.cs"])
+        with open(os.path.join(bundled, "Entity0Entity", "RelationsConfig.cs")) as f:
+            bundle = f.read()
+        self.assertEqual(bundle.count(".RelationsConfig.Entity0Entity\n"), 1)
+        self.assertEqual(bundle.count(".RelationsConfig.Entity0Entity.Interfaces\n"),
+                         len([path for path in list_files(separate) if path.startswith("Entity0Entity/Interfaces/")]))
+        self.assertNotIn("\nusing ", bundle)
+
+    def test_single_bundle(self):
+        bundled = self.generate("Bundled", "--all", "--bundle", "single")
+        self.assertEqual(list_files(bundled), ["RelationsConfig.cs"])
+        with open(os.path.join(bundled, "RelationsConfig.cs")) as f:
+            bundle = f.read()
+        self.assertIn("public class Entity0EntityRelationsConfig", bundle)
+        self.assertIn("public class Entity1EntityRelationsConfig", bundle)
+        self.assertNotIn("EmptyEntity", bundle)
+
+    def test_empty_single_bundle_is_not_written(self):
+        bundled = self.generate("Bundled", "--bundle", "single", "--classname", "EmptyQueryObject")
+        self.assertEqual(list_files(bundled), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processing.complete_paths import complete_paths
+from processing.create_state_dictionary import create_state_dictionary
+from processing.create_next_states_dictionary import create_next_states_dictionary
+from processing.state_graph import build_state_graph
+from processing.collect_relevant_states import collect_relevant_states
+from processing.process_transitions import interface_methods, process_transitions
+from processing.compact_interfaces import compact_interfaces
+
+def build_interfaces(paths):
+    completed_paths = complete_paths({"Entity": "UserEntity", "paths": paths, "collections": []})
+    state_dictionary = create_state_dictionary(completed_paths, 'InitialState')
+    graph = build_state_graph(create_next_states_dictionary(state_dictionary, 'InitialState'))
+    methods = interface_methods(graph)
+    interfaces = {}
+    process_transitions(graph, collect_relevant_states(graph), interfaces, methods)
+    return graph, interfaces, methods
+
+def inherited_methods(name, interfaces, bases):
+    members = set(interfaces[name])
+    for base in bases.get(name, []):
+        members |= inherited_methods(base, interfaces, bases)
+    return members
+
+class CompactInterfacesTest(unittest.TestCase):
+    def setUp(self):
+        self.graph, self.interfaces, self.methods = build_interfaces(["GroupUsers.Group", "GroupUsers.User", "SentInvitations"])
+
+    def test_every_interface_keeps_its_methods(self):
+        original = {name: set(members) for name, members in self.interfaces.items()}
+        interfaces, bases, shared = compact_interfaces(self.graph, self.interfaces, self.methods)
+        for name, members in original.items():
+            self.assertEqual(inherited_methods(name, interfaces, bases), members, name)
+
+    def test_methods_are_declared_once(self):
+        interfaces, _, shared = compact_interfaces(self.graph, self.interfaces, self.methods)
+        declared = [member for members in interfaces.values() for member in members]
+        self.assertEqual(len(declared), len(set(declared)))
+        self.assertTrue(shared)
+        self.assertTrue(shared <= set(interfaces))
+
+    def test_bases_exist(self):
+        interfaces, bases, _ = compact_interfaces(self.graph, self.interfaces, self.methods)
+        for name, names in bases.items():
+            self.assertIn(name, interfaces)
+            for base in names:
+                self.assertIn(base, interfaces)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processing.complete_paths import complete_paths
+from processing.create_state_dictionary import create_state_dictionary
+from processing.create_next_states_dictionary import create_next_states_dictionary
+
+def next_states_of(paths):
+    completed_paths = complete_paths({"Entity": "UserEntity", "paths": paths, "collections": []})
+    state_dictionary = create_state_dictionary(completed_paths, 'InitialState')
+    next_states_dictionary = create_next_states_dictionary(state_dictionary, 'InitialState')
+    return {transition["current_state"]: transition["next_states"] for transition in next_states_dictionary["transitions"]}
+
+class CreateNextStatesDictionaryTest(unittest.TestCase):
+    def test_top_level_and_nested_paths(self):
+        self.assertEqual(next_states_of(["GroupUsers.Group", "GroupUsers.User", "SentInvitations"]), {
+            "UserEntityInitialState": ["IncludeGroupUsers", "IncludeSentInvitations"],
+            "IncludeGroupUsers": ["IncludeSentInvitations", "ThenGuIncludeGroup", "ThenGuIncludeUser"],
+            "IncludeSentInvitations": ["IncludeGroupUsers"],
+            "ThenGuIncludeGroup": ["IncludeSentInvitations", "ThenGuIncludeUser"],
+            "ThenGuIncludeUser": ["IncludeSentInvitations", "ThenGuIncludeGroup"]
+        })
+
+    def test_deep_paths_continue_their_branch(self):
+        next_states = next_states_of(["GroupUsers.Group.GroupUsers.User", "SentInvitations"])
+        self.assertEqual(next_states["ThenGuGIncludeGroupUsers"], ["IncludeSentInvitations", "ThenGuGGuIncludeUser"])
+        self.assertEqual(next_states["ThenGuGGuIncludeUser"], ["IncludeSentInvitations"])
+
+    def test_colliding_state_names_are_listed_once(self):
+        # 'members' has no capitals, so GroupUsers.members.User and GroupUsers.User are both ThenGuIncludeUser
+        next_states = next_states_of(["GroupUsers.User", "GroupUsers.members.User"])
+        self.assertEqual(next_states["ThenGuIncludemembers"], ["ThenGuIncludeUser"])
+
+    def test_missing_transitions(self):
+        with self.assertRaises(KeyError):
+            create_next_states_dictionary({"initial_entity": "UserEntity"}, 'InitialState')
+
+if __name__ == "__main__":
+    unittest.main()
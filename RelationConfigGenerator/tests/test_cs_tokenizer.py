@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cs_tokenizer import extract_declarations
+from utils.source_scanner import scan_content
+
+QUERY_OBJECT = '''
+public class UserQueryObject : QueryObject<UserEntity>
+{
+    public override ICollection<Func<UserEntity, object>> IncludeDirectives { get; } = new List<Func<UserEntity, object>>
+    {
+        entity => entity.GroupUsers.Select(groupUser => groupUser.Group),
+        // entity => entity.Commented,
+        entity => entity.SentInvitations
+    };
+}
+'''
+
+class ExtractDeclarationsTest(unittest.TestCase):
+    def class_names(self, content):
+        return [name for name, _, _ in extract_declarations(content)["classes"]]
+
+    def test_skips_comments(self):
+        content = "// class LineComment : Base {}\n/* class BlockComment : Base {} */\nclass Real : Base {}\n"
+        self.assertEqual(self.class_names(content), ["Real"])
+
+    def test_skips_strings(self):
+        content = 'var a = "class Regular : Base {}";\nvar b = @"class ""Verbatim"" : Base {}";\nvar c = $"class {x} : Base";\nclass Real : Base {}\n'
+        self.assertEqual(self.class_names(content), ["Real"])
+
+    def test_skips_if_false_blocks(self):
+        content = "#if false\nclass Inactive : Base {}\n#if DEBUG\nclass Nested : Base {}\n#endif\n#endif\nclass Real : Base {}\n"
+        self.assertEqual(self.class_names(content), ["Real"])
+
+    def test_keeps_other_conditional_blocks(self):
+        content = "#if DEBUG\nclass Debug : Base {}\n#endif\n"
+        self.assertEqual(self.class_names(content), ["Debug"])
+
+    def test_records(self):
+        content = "public record Person(string Name) : Entity, IPerson;\npublic record struct Point(int X, int Y);\n"
+        self.assertEqual(extract_declarations(content)["classes"], [["Person", ["Entity", "IPerson"], 0], ["Point", [], 0]])
+
+    def test_generics(self):
+        content = "public class Repository<TEntity, TKey> : RepositoryBase<TEntity>, IRepository<TEntity> where TEntity : class { }\n"
+        self.assertEqual(extract_declarations(content)["classes"], [["Repository", ["RepositoryBase", "IRepository"], 2]])
+
+    def test_include_directives(self):
+        declarations = extract_declarations(QUERY_OBJECT)
+        self.assertEqual(declarations["classes"], [["UserQueryObject", ["QueryObject"], 0]])
+        self.assertEqual(declarations["include_directives"],
+                         [["UserEntity", "entity=>entity.GroupUsers.Select(groupUser=>groupUser.Group),entity=>entity.SentInvitations"]])
+
+    def test_scan_content_cleans_include_directives(self):
+        facts = scan_content(QUERY_OBJECT)
+        self.assertEqual(facts["include_directives"], [["UserEntity", ["GroupUsers.Group", "SentInvitations"], ["GroupUsers"]]])
+
+if __name__ == "__main__":
+    unittest.main()
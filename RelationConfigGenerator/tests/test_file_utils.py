@@ -0,0 +1,84 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_utils import parse_ignore_pattern, match_path, is_ignored, matches_any, find_all_cs_files
+
+def rules(*patterns, base=''):
+    return [parse_ignore_pattern(pattern, base) for pattern in patterns]
+
+class MatchPathTest(unittest.TestCase):
+    def test_star_stays_in_its_segment(self):
+        self.assertTrue(match_path("Generated/User.cs", "Generated/*.cs"))
+        self.assertFalse(match_path("Generated/Nested/User.cs", "Generated/*.cs"))
+        self.assertFalse(match_path("a/b", "a*b"))
+
+    def test_double_star(self):
+        self.assertTrue(match_path("Generated/User.cs", "Generated/**/*.cs"))
+        self.assertTrue(match_path("Generated/Nested/Deep/User.cs", "Generated/**/*.cs"))
+        self.assertTrue(match_path("Generated/User.cs", "Generated/**"))
+        self.assertFalse(match_path("Generated", "Generated/**"))
+
+    def test_question_mark_and_classes(self):
+        self.assertTrue(match_path("File1.cs", "File?.cs"))
+        self.assertFalse(match_path("a/b", "a?b"))
+        self.assertTrue(match_path("FileB.cs", "File[AB].cs"))
+
+class IsIgnoredTest(unittest.TestCase):
+    def test_unanchored_pattern_matches_names_at_any_depth(self):
+        self.assertTrue(is_ignored("src/Models/User.g.cs", False, rules("*.g.cs")))
+        self.assertFalse(is_ignored("src/Models/User.cs", False, rules("*.g.cs")))
+
+    def test_anchored_pattern_matches_relative_to_its_base(self):
+        self.assertTrue(is_ignored("Generated/User.cs", False, rules("/Generated/*.cs")))
+        self.assertFalse(is_ignored("src/Generated/User.cs", False, rules("/Generated/*.cs")))
+        self.assertTrue(is_ignored("src/Generated/User.cs", False, rules("Generated/*.cs", base="src")))
+        self.assertFalse(is_ignored("other/Generated/User.cs", False, rules("Generated/*.cs", base="src")))
+
+    def test_directory_only_pattern(self):
+        self.assertTrue(is_ignored("build", True, rules("build/")))
+        self.assertFalse(is_ignored("build", False, rules("build/")))
+
+    def test_last_matching_rule_wins(self):
+        self.assertFalse(is_ignored("Keep.g.cs", False, rules("*.g.cs", "!Keep.g.cs")))
+        self.assertTrue(is_ignored("Keep.g.cs", False, rules("!Keep.g.cs", "*.g.cs")))
+
+    def test_blank_lines_and_comments(self):
+        self.assertIsNone(parse_ignore_pattern("   "))
+        self.assertIsNone(parse_ignore_pattern("# comment"))
+
+    def test_matches_any(self):
+        self.assertTrue(matches_any("src/Models/User.cs", ["User.cs"]))
+        self.assertTrue(matches_any("src/Models/User.cs", ["src/*/User.cs"]))
+        self.assertFalse(matches_any("src/Models/User.cs", ["src/*.cs"]))
+
+class FindAllCsFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='includy-test-')
+        for path in ["App/User.cs", "App/User.g.cs", "App/Keep.g.cs", "bin/Debug/Build.cs", "Generated/Config.cs", "Notes.txt"]:
+            os.makedirs(os.path.join(self.root, os.path.dirname(path)), exist_ok=True)
+            open(os.path.join(self.root, path), 'w').close()
+        with open(os.path.join(self.root, ".gitignore"), 'w') as f:
+            f.write("*.g.cs\n!Keep.g.cs\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def found(self, **kwargs):
+        return sorted(os.path.relpath(path, self.root).replace(os.sep, '/') for path in find_all_cs_files(self.root, **kwargs))
+
+    def test_applies_gitignore_and_default_exclusions(self):
+        self.assertEqual(self.found(), ["App/Keep.g.cs", "App/User.cs", "Generated/Config.cs"])
+
+    def test_without_gitignore(self):
+        self.assertEqual(self.found(use_gitignore=False), ["App/Keep.g.cs", "App/User.cs", "App/User.g.cs", "Generated/Config.cs"])
+
+    def test_skips_output_directories(self):
+        self.assertEqual(self.found(skip=[os.path.join(self.root, "Generated")]), ["App/Keep.g.cs", "App/User.cs"])
+
+if __name__ == "__main__":
+    unittest.main()
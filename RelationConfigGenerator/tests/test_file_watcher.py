@@ -0,0 +1,78 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import includy
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from utils import file_watcher
+
+class PollingWatchTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        self.query_object = os.path.join(self.project, "Synthetic.DAL", "QueryObjects", "Entity0QueryObject.cs")
+        self.generated = os.path.join(self.project, "IncludeConfig", "Entity0Entity", "RelationsConfig.cs")
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def watch(self, edit):
+        """Run --watch with inotify unavailable, apply edit during the first wait and stop at the second."""
+        waits = []
+
+        def wait_for_changes(watcher):
+            waits.append(watcher)
+            if len(waits) > 1:
+                raise KeyboardInterrupt
+            watcher["poll_interval"] = 0.01
+            edit()
+            return file_watcher.wait_for_changes(watcher)
+
+        output = io.StringIO()
+        with mock.patch.object(file_watcher, 'load_inotify', return_value=None), \
+                mock.patch.object(includy, 'wait_for_changes', wait_for_changes), redirect_stdout(output):
+            status = includy.run(parse_args(["--project", self.project, "--all", "--watch", "--debounce", "0.05"]))
+        self.assertEqual(status, 0)
+        self.assertIsNone(waits[0]["fd"])
+        return output.getvalue()
+
+    def test_polling_picks_up_a_change_and_regenerates(self):
+        sources = []
+
+        def edit():
+            with open(self.generated) as f:
+                sources.append(f.read())
+            with open(self.query_object, 'r+') as f:
+                content = f.read().replace("entity => entity.NavAB.Select(x0 => x0.NavBA),\n", "")
+                f.seek(0)
+                f.write(content)
+                f.truncate()
+
+        output = self.watch(edit)
+        self.assertIn("by polling", output)
+        self.assertIn("Regenerated Entity0Entity.", output)
+        self.assertNotIn("Entity1Entity", output.split("press Ctrl+C to stop.")[1])
+        with open(self.generated) as f:
+            sources.append(f.read())
+        self.assertIn('string path = "NavAB.NavBA"', sources[0])
+        self.assertNotIn('string path = "NavAB.NavBA"', sources[1])
+
+    def test_failed_rebuild_keeps_watching(self):
+        def edit():
+            with open(self.query_object, 'wb') as f:
+                f.write(b"class Broken \xff\xfe {}")
+
+        with mock.patch.object(includy, 'regenerate', side_effect=OSError("cannot read Entity0QueryObject.cs")):
+            output = self.watch(edit)
+        self.assertIn("Regeneration failed, keeping the previous outputs: cannot read Entity0QueryObject.cs", output)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run, generate
+
+def read_files(directory):
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not name.startswith('.'):
+                file_path = os.path.join(root, name)
+                with open(file_path, encoding='utf-8') as f:
+                    files[os.path.relpath(file_path, directory).replace(os.sep, '/')] = f.read()
+    return files
+
+class GenerateTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        self.query_object = os.path.join(self.project, "Synthetic.DAL", "QueryObjects", "Entity0QueryObject.cs")
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def test_equals_the_written_files(self):
+        for arguments, options in [([], {}), (["--bundle", "single"], {'bundle': 'single'}),
+                                   (["--include-store", "hashset", "--compact-interfaces"], {'include_store': 'hashset', 'compact_interfaces': True})]:
+            with self.subTest(arguments=arguments):
+                generated = generate(self.project, {'all': True, **options})
+                self.assertFalse(os.path.exists(os.path.join(self.project, "IncludeConfig")))
+                with redirect_stdout(io.StringIO()):
+                    run(parse_args(["--project", self.project, "--all", *arguments]))
+                self.assertEqual(generated, read_files(os.path.join(self.project, "IncludeConfig")))
+                shutil.rmtree(os.path.join(self.project, "IncludeConfig"))
+
+    def test_warm_state_only_regenerates_changed_entities(self):
+        state = {}
+        first = generate(self.project, {'all': True}, state)
+        sources = {entity: data["sources"] for entity, data in state["entities"].items()}
+        with open(self.query_object, 'r+', encoding='utf-8') as f:
+            content = f.read().replace("entity => entity.NavAB.Select(x0 => x0.NavBA),\n", "")
+            f.seek(0)
+            f.write(content)
+            f.truncate()
+        second = generate(self.project, {'all': True}, state)
+        self.assertIs(state["entities"]["Entity1Entity"]["sources"], sources["Entity1Entity"])
+        self.assertIsNot(state["entities"]["Entity0Entity"]["sources"], sources["Entity0Entity"])
+        self.assertNotEqual(first["Entity0Entity/RelationsConfig.cs"], second["Entity0Entity/RelationsConfig.cs"])
+        self.assertEqual(first["Entity1Entity/RelationsConfig.cs"], second["Entity1Entity/RelationsConfig.cs"])
+
+    def test_changed_option_regenerates_every_entity(self):
+        state = {}
+        generate(self.project, {'all': True}, state)
+        sources = {entity: data["sources"] for entity, data in state["entities"].items()}
+        generate(self.project, {'all': True, 'include_store': 'hashset'}, state)
+        for entity, data in state["entities"].items():
+            self.assertIsNot(data["sources"], sources[entity])
+
+    def test_invalid_options(self):
+        for options in [{'no_such_option': True}, {'watch': True}, {'jobs': 'x'}, {'jobs': True}, {'all': 'no'},
+                        {'include_store': 'array'}, {'bundle': 'project'}, {'include': '*.cs'}, {'output_dir': None},
+                        {'all': True, 'classname': 'Entity0QueryObject'}]:
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    generate(self.project, options)
+
+if __name__ == "__main__":
+    unittest.main()
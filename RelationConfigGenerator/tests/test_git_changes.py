@@ -0,0 +1,85 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run
+from utils import stats
+from utils.git_changes import current_revision, find_changed_files
+
+def git(*arguments, cwd):
+    subprocess.run(['git', '-c', 'user.name=includy', '-c', 'user.email=includy@example.com', *arguments], cwd=cwd, check=True, capture_output=True)
+
+@unittest.skipIf(shutil.which('git') is None, "git is not installed")
+class FindChangedFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.repository = os.path.realpath(tempfile.mkdtemp(prefix='includy-test-'))
+        self.project = os.path.join(self.repository, "Project")
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        with open(os.path.join(self.repository, "Outside.cs"), 'w') as f:
+            f.write("class Outside {}\n")
+        git('init', '-q', cwd=self.repository)
+        git('add', '.', cwd=self.repository)
+        git('commit', '-q', '-m', 'initial', cwd=self.repository)
+        self.revision = current_revision(self.project)
+        self.query_object = os.path.join(self.project, "Synthetic.DAL", "QueryObjects", "Entity0QueryObject.cs")
+
+    def tearDown(self):
+        shutil.rmtree(self.repository)
+
+    def run_incremental(self, *arguments):
+        stats.reset()
+        with redirect_stdout(io.StringIO()) as output:
+            run(parse_args(["--project", self.project, "--all", "--cache-dir", os.path.join(self.repository, "cache"), *arguments]))
+        return output.getvalue()
+
+    def test_reports_modified_and_untracked_files_below_the_project(self):
+        with open(self.query_object, 'a') as f:
+            f.write("// changed\n")
+        with open(os.path.join(self.project, "New.cs"), 'w') as f:
+            f.write("class New {}\n")
+        with open(os.path.join(self.repository, "Outside.cs"), 'a') as f:
+            f.write("// changed\n")
+        self.assertEqual(find_changed_files(self.project, self.revision), {self.query_object, os.path.join(self.project, "New.cs")})
+
+    def test_reports_deleted_files(self):
+        os.remove(self.query_object)
+        self.assertEqual(find_changed_files(self.project, self.revision), {self.query_object})
+
+    def test_unknown_revision(self):
+        self.assertIsNone(find_changed_files(self.project, "no-such-revision"))
+
+    def test_not_a_repository(self):
+        directory = tempfile.mkdtemp(prefix='includy-test-')
+        try:
+            self.assertIsNone(current_revision(directory))
+            self.assertIsNone(find_changed_files(directory, "HEAD"))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_incremental_run_only_counts_walked_source_files(self):
+        self.run_incremental("--since", "HEAD")
+        with open(self.query_object, 'a') as f:
+            f.write("// changed\n")
+        with open(os.path.join(self.project, "Notes.txt"), 'w') as f:
+            f.write("notes\n")
+        # The outputs of the first run are untracked, but not inputs
+        self.run_incremental("--since", "HEAD")
+        self.assertEqual(stats.counters["files_changed"], 1)
+        self.assertEqual(stats.counters["cache_misses"], 1)
+
+    def test_unknown_revision_falls_back_to_the_parse_cache(self):
+        output = self.run_incremental("--since", "no-such-revision")
+        self.assertIn("Changed files unknown", output)
+        self.assertTrue(os.path.isfile(os.path.join(self.project, "IncludeConfig", "Entity0Entity", "RelationsConfig.cs")))
+
+if __name__ == "__main__":
+    unittest.main()
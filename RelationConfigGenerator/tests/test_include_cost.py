@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run
+from processing.include_cost import classify_navigations, analyze_include_cost, find_violations
+from utils.entity_properties import extract_properties, navigation_target
+
+PROPERTIES = {
+    "UserEntity": {"Profile": "ProfileEntity?", "GroupUsers": "ICollection<GroupUserEntity>"},
+    "GroupUserEntity": {"Group": "Models.GroupEntity"},
+    "GroupEntity": {"Members": "List<UserEntity>"}
+}
+
+DIRECTIVES = {"Entity": "UserEntity", "paths": ["Profile", "GroupUsers.Group.Members", "Tags.Name", "Settings"], "collections": ["Tags"]}
+
+SOURCE = '''namespace Synthetic.DAL.Entities
+{
+    public class Entity0Entity
+    {
+        [ForeignKey("NavAAId")]
+        public virtual ICollection<Entity1Entity> NavAA { get; set; } = new List<Entity1Entity>();
+        public Entity1Entity? NavAB { get; set; }
+        public int Count() => NavAA.Count;
+    }
+
+    public class Entity1Entity
+    {
+        public List<Entity0Entity> NavBA { get; set; }
+        public Entity0Entity NavBB => null;
+    }
+}
+'''
+
+# Makes NavBA of the synthetic project a collection, so the paths through it load two nested collections
+LEVEL0_NODE_ENTITY = '''namespace Synthetic.DAL.Entities
+{
+    public record Level0NodeEntity
+    {
+        public required Guid Id { get; init; }
+        public required List<Level1NodeEntity> NavBA { get; init; }
+        public required Level1NodeEntity NavBB { get; init; }
+    }
+}
+'''
+
+class ClassifyNavigationsTest(unittest.TestCase):
+    def test_reference_and_collection_navigations(self):
+        self.assertEqual(classify_navigations(DIRECTIVES, lambda type_name: PROPERTIES.get(type_name, {})), {
+            "GroupUsers": "collection",
+            "Profile": "reference",
+            "Settings": "unknown",
+            "Tags": "collection",
+            "GroupUsers.Group": "reference",
+            "Tags.Name": "unknown",
+            "GroupUsers.Group.Members": "collection"
+        })
+
+    def test_declared_type_wins_over_select(self):
+        directives = dict(DIRECTIVES, collections=["Profile"])
+        self.assertEqual(classify_navigations(directives, lambda type_name: PROPERTIES.get(type_name, {}))["Profile"], "reference")
+
+    def test_navigation_target(self):
+        self.assertEqual(navigation_target("ICollection<Models.GroupUserEntity>"), ("GroupUserEntity", True))
+        self.assertEqual(navigation_target("GroupUserEntity[]?"), ("GroupUserEntity", True))
+        self.assertEqual(navigation_target("CategoryEntity?"), ("CategoryEntity", False))
+        self.assertEqual(navigation_target("Lazy<CategoryEntity>"), ("Lazy", False))
+
+    def test_extract_properties(self):
+        self.assertEqual(extract_properties(SOURCE), {
+            "Entity0Entity": {"NavAA": "ICollection<Entity1Entity>", "NavAB": "Entity1Entity?"},
+            "Entity1Entity": {"NavBA": "List<Entity0Entity>", "NavBB": "Entity0Entity"}
+        })
+
+class IncludeCostTest(unittest.TestCase):
+    def setUp(self):
+        self.report = analyze_include_cost(DIRECTIVES, lambda type_name: PROPERTIES.get(type_name, {}), collection_size=10)
+
+    def test_fan_out_depth_and_cartesian_factor_of_paths(self):
+        self.assertEqual([(path["path"], path["fan_out_depth"], path["cartesian_factor"]) for path in self.report["paths"]],
+                         [("Profile", 0, 1), ("GroupUsers.Group.Members", 2, 100), ("Tags.Name", 1, 10), ("Settings", 0, 1)])
+        self.assertEqual(self.report["paths"][1]["collections"], ["GroupUsers", "GroupUsers.Group.Members"])
+        self.assertEqual(self.report["paths"][2]["unknown"], ["Tags.Name"])
+
+    def test_collections_side_by_side_multiply(self):
+        self.assertEqual(self.report["cartesian_factor"], 1000)
+
+    def test_violations(self):
+        self.assertEqual(find_violations([self.report]), [])
+        self.assertEqual(find_violations([self.report], max_fan_out_depth=2, max_cartesian_factor=1000), [])
+        self.assertEqual(find_violations([self.report], max_fan_out_depth=1),
+                         ["UserEntity GroupUsers.Group.Members: fan-out depth 2 exceeds 1"])
+        self.assertEqual(find_violations([self.report], max_cartesian_factor=100),
+                         ["UserEntity: cartesian factor 1000 of all includes exceeds 100"])
+        self.assertEqual(len(find_violations([self.report], max_cartesian_factor=10)), 2)
+
+class AnalyzeTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        with open(os.path.join(self.project, "Synthetic.DAL", "Entities", "Level0NodeEntity.cs"), 'w') as f:
+            f.write(LEVEL0_NODE_ENTITY)
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def analyze(self, *arguments):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = run(parse_args(["--project", self.project, "--all", "--analyze", "json", *arguments]))
+        # The report follows the notes of the directive collection
+        return status, json.loads(output.getvalue()[output.getvalue().index("{"):])
+
+    def test_report(self):
+        status, report = self.analyze()
+        self.assertEqual(status, 0)
+        self.assertEqual(report["paths"][0], {"entity": "Entity0Entity", "path": "NavAA.NavBA", "fan_out_depth": 2, "cartesian_factor": 100,
+                                              "collections": ["NavAA", "NavAA.NavBA"], "unknown": []})
+        self.assertEqual(report["paths"][-1], {"entity": "Entity1Entity", "path": "NavAB.NavBB", "fan_out_depth": 1, "cartesian_factor": 10,
+                                               "collections": ["NavAB"], "unknown": []})
+        self.assertEqual(report["entities"], [{"entity": "Entity0Entity", "cartesian_factor": 10000}, {"entity": "Entity1Entity", "cartesian_factor": 10000}])
+        self.assertFalse(os.path.exists(os.path.join(self.project, "IncludeConfig")))
+
+    def test_fan_out_depth_threshold(self):
+        self.assertEqual(self.analyze("--max-fan-out-depth", "2")[0], 0)
+        status, report = self.analyze("--max-fan-out-depth", "1")
+        self.assertEqual(status, 1)
+        self.assertEqual(report["violations"], [f"{entity} {path}: fan-out depth 2 exceeds 1"
+                                                for entity in ("Entity0Entity", "Entity1Entity") for path in ("NavAA.NavBA", "NavAB.NavBA")])
+
+    def test_cartesian_factor_threshold(self):
+        self.assertEqual(self.analyze("--max-cartesian-factor", "10000")[0], 0)
+        status, report = self.analyze("--max-cartesian-factor", "9999")
+        self.assertEqual(status, 1)
+        self.assertEqual(report["violations"], [f"{entity}: cartesian factor 10000 of all includes exceeds 9999" for entity in ("Entity0Entity", "Entity1Entity")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import io
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+from functools import partial
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run, build_include_graph
+from processing.include_fingerprint import declared_include_paths, assign_include_indexes
+from processing.process_include_configuration import process_include_configuration
+from output.write_files import FINGERPRINT_WORD_BITS, include_fingerprint_code, write_to_memory
+from output.manifest import load_manifest
+
+def generate_class(paths, include_paths=None, include_fingerprint=True):
+    sources = {}
+    graph = build_include_graph({"Entity": "UserEntity", "paths": paths, "collections": []}, 'InitialState')
+    process_include_configuration(graph, "Out", "RelationsConfig", write=partial(write_to_memory, sources), include_fingerprint=include_fingerprint,
+                                  include_paths=include_paths)
+    return sources["Out/UserEntity/RelationsConfig.cs"]
+
+def added_indexes(source):
+    return dict(re.findall(r'\(string path = "([^"]*)"\) \{\s*AddInclude\(path, (\d+)\);', source))
+
+class AssignIncludeIndexesTest(unittest.TestCase):
+    def test_declared_order_with_intermediate_paths(self):
+        self.assertEqual(declared_include_paths(["SentInvitations", "GroupUsers.Group.GroupUsers", "GroupUsers.User", ""]),
+                         ["SentInvitations", "GroupUsers", "GroupUsers.Group", "GroupUsers.Group.GroupUsers", "GroupUsers.User"])
+
+    def test_new_paths_are_appended(self):
+        previous = assign_include_indexes(["GroupUsers", "SentInvitations"])
+        self.assertEqual(assign_include_indexes(["ReceivedInvitations", "GroupUsers", "SentInvitations"], previous),
+                         ["GroupUsers", "SentInvitations", "ReceivedInvitations"])
+
+    def test_removed_paths_keep_their_index(self):
+        previous = ["GroupUsers", "SentInvitations", "ReceivedInvitations"]
+        self.assertEqual(assign_include_indexes(["ReceivedInvitations"], previous), previous)
+
+class GeneratedFingerprintTest(unittest.TestCase):
+    def test_off_by_default(self):
+        source = generate_class(["SentInvitations", "GroupUsers.User"], include_fingerprint=False)
+        self.assertNotIn("IncludeFingerprint", source)
+        self.assertNotIn("IncludePaths", source)
+        self.assertIn("protected void AddInclude(string include)\n", source)
+        self.assertIn("AddInclude(path);", source)
+
+    def test_methods_pass_the_index_of_their_path(self):
+        source = generate_class(["SentInvitations", "GroupUsers.User"])
+        self.assertEqual(added_indexes(source), {"SentInvitations": "0", "GroupUsers": "1", "GroupUsers.User": "2"})
+
+    def test_indexes_survive_a_new_directive(self):
+        paths = ["SentInvitations", "GroupUsers.User"]
+        before = added_indexes(generate_class(paths))
+        include_paths = assign_include_indexes(declared_include_paths(["Alpha"] + paths), declared_include_paths(paths))
+        after = added_indexes(generate_class(["Alpha"] + paths, include_paths))
+        self.assertEqual(after, dict(before, Alpha="3"))
+
+    def test_single_word(self):
+        code = include_fingerprint_code([f"Path{index}" for index in range(FINGERPRINT_WORD_BITS)])
+        self.assertIn("public virtual ulong IncludeFingerprint", code)
+        self.assertNotIn("ulong[]", code)
+
+    def test_multiple_words(self):
+        code = include_fingerprint_code([f"Path{index}" for index in range(FINGERPRINT_WORD_BITS + 1)])
+        self.assertIn("new ulong[2]", code)
+        self.assertIn("public virtual ulong[] IncludeFingerprint", code)
+        self.assertIn("public static IEqualityComparer<ulong[]> IncludeFingerprintComparer", code)
+        self.assertIn("GetIncludePaths(ulong[] fingerprint)", code)
+
+class IncludeFingerprintOptionTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        self.out_dir = os.path.join(self.project, "IncludeConfig")
+        self.query_object = os.path.join(self.project, "Synthetic.DAL", "QueryObjects", "Entity0QueryObject.cs")
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def generate(self, *arguments):
+        with redirect_stdout(io.StringIO()):
+            run(parse_args(["--project", self.project, "--all", *arguments]))
+        with open(os.path.join(self.out_dir, "Entity0Entity", "RelationsConfig.cs"), encoding='utf-8') as f:
+            return f.read()
+
+    def test_without_the_option_no_indexes_are_recorded(self):
+        source = self.generate()
+        self.assertNotIn("IncludeFingerprint", source)
+        self.assertNotIn("include_paths", load_manifest(self.out_dir))
+
+    def test_indexes_are_kept_in_the_manifest(self):
+        before = added_indexes(self.generate("--include-fingerprint"))
+        self.assertEqual(load_manifest(self.out_dir)["include_paths"]["Entity0Entity"],
+                         ["NavAA", "NavAB", "NavAA.NavBA", "NavAA.NavBB", "NavAB.NavBA", "NavAB.NavBB"])
+        with open(self.query_object, 'r+', encoding='utf-8') as f:
+            content = f.read().replace("entity => entity.NavAA,\n", "").replace("entity => entity.NavAA.Select(x0 => x0.NavBA),\n", "")
+            f.seek(0)
+            f.write(content)
+            f.truncate()
+        after = added_indexes(self.generate("--include-fingerprint"))
+        self.assertNotIn("NavAA.NavBA", after)
+        self.assertEqual(after, {path: index for path, index in before.items() if path != "NavAA.NavBA"})
+
+if __name__ == "__main__":
+    unittest.main()
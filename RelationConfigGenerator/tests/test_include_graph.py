@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from includy import build_include_graph
+from processing.include_graph import encode_graph, decode_graph, save_include_graph, load_include_graph
+
+DIRECTIVES = {"Entity": "UserEntity", "paths": ["SentInvitations", "GroupUsers.Group", "GroupUsers.User"], "collections": ["GroupUsers"]}
+
+class IncludeGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = build_include_graph(DIRECTIVES, 'InitialState')
+        self.directory = tempfile.mkdtemp(prefix='includy-test-')
+        self.file_path = os.path.join(self.directory, "graph.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_document(self, document):
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+
+    def test_round_trip(self):
+        self.assertEqual(decode_graph(encode_graph(self.graph), 'InitialState'), self.graph)
+
+    def test_keeps_the_declared_order(self):
+        self.assertEqual(decode_graph(encode_graph(self.graph))["include_paths"],
+                         ["SentInvitations", "GroupUsers", "GroupUsers.Group", "GroupUsers.User"])
+
+    def test_graph_without_order_keeps_the_transition_order(self):
+        encoded = encode_graph(self.graph)
+        del encoded["order"]
+        self.assertEqual(decode_graph(encoded)["include_paths"], ["GroupUsers", "SentInvitations", "GroupUsers.Group", "GroupUsers.User"])
+
+    def test_save_and_load(self):
+        empty = build_include_graph({"Entity": "LimitEntity", "paths": [''], "collections": []}, 'InitialState')
+        save_include_graph(self.file_path, [self.graph, empty], 'InitialState')
+        self.assertEqual(load_include_graph(self.file_path, 'InitialState'), [self.graph, empty])
+        self.assertEqual(os.listdir(self.directory), ["graph.json"])
+
+    def test_rejects_another_initial_state_name(self):
+        save_include_graph(self.file_path, [self.graph], 'InitialState')
+        with self.assertRaises(ValueError):
+            load_include_graph(self.file_path, 'Start')
+
+    def test_rejects_a_graph_not_starting_with_its_initial_state(self):
+        encoded = encode_graph(self.graph)
+        encoded["states"][0] = "UserEntityStart"
+        with self.assertRaises(ValueError):
+            decode_graph(encoded, 'InitialState')
+
+    def test_rejects_indices_out_of_range(self):
+        for key, value in (("next", [[-1]] + [[]] * 4), ("collections", [None, 7, None, None, None]), ("order", [True])):
+            encoded = dict(encode_graph(self.graph), **{key: value})
+            with self.assertRaises(ValueError, msg=key):
+                decode_graph(encoded)
+
+    def test_rejects_malformed_graphs(self):
+        encoded = encode_graph(self.graph)
+        del encoded["states"]
+        with self.assertRaises(ValueError):
+            decode_graph(encoded)
+        with self.assertRaises(ValueError):
+            decode_graph(dict(encode_graph(self.graph), collections=[None]))
+
+    def test_rejects_other_files(self):
+        for document in ([], {"format": "other"}, {"format": "includy-graph", "version": 99, "initial_state_name": "InitialState", "graphs": []},
+                         {"format": "includy-graph", "version": 1, "graphs": []}):
+            self.write_document(document)
+            with self.assertRaises(ValueError, msg=document):
+                load_include_graph(self.file_path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run
+
+UP_TO_DATE = "Generated files are up to date."
+
+class CheckTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 12, "entities": 2, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        self.out_dir = os.path.join(self.project, "IncludeConfig")
+        self.run_includy()
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def run_includy(self, *arguments):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = run(parse_args(["--project", self.project, "--all", *arguments]))
+        self.assertIn(status, (0, None))
+        return output.getvalue()
+
+    def test_reports_up_to_date(self):
+        self.assertIn(UP_TO_DATE, self.run_includy("--check"))
+
+    def test_changed_input_is_stale(self):
+        query_object = os.path.join(self.project, "Synthetic.DAL", "QueryObjects", "Entity0QueryObject.cs")
+        with open(query_object, 'a', encoding='utf-8') as f:
+            f.write("// changed\n")
+        self.assertNotIn(UP_TO_DATE, self.run_includy("--check"))
+        self.assertIn(UP_TO_DATE, self.run_includy("--check"))
+
+    def test_changed_option_is_stale(self):
+        self.assertNotIn(UP_TO_DATE, self.run_includy("--check", "--include-store", "hashset"))
+        self.assertIn(UP_TO_DATE, self.run_includy("--check", "--include-store", "hashset"))
+        self.assertNotIn(UP_TO_DATE, self.run_includy("--check"))
+
+    def test_deleted_output_is_stale(self):
+        generated = os.path.join(self.out_dir, "Entity0Entity", "RelationsConfig.cs")
+        os.remove(generated)
+        self.assertNotIn(UP_TO_DATE, self.run_includy("--check"))
+        self.assertTrue(os.path.isfile(generated))
+
+    def test_stale_outputs_are_removed(self):
+        self.run_includy("--bundle", "single")
+        self.assertEqual(sorted(name for name in os.listdir(self.out_dir) if not name.startswith('.')), ["RelationsConfig.cs"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_project import generate_synthetic_project
+from config.args_parser import parse_args
+from includy import run
+
+def read_files(directory):
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            file_path = os.path.join(root, name)
+            with open(file_path, encoding='utf-8') as f:
+                files[os.path.relpath(file_path, directory).replace(os.sep, '/')] = f.read()
+    return files
+
+class ParallelGenerationTest(unittest.TestCase):
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix='includy-test-')
+        generate_synthetic_project(self.project, {"files": 20, "entities": 4, "path_depth": 2, "fan_out": 2, "filler_lines": 5})
+        self.out_dir = os.path.join(self.project, "IncludeConfig")
+
+    def tearDown(self):
+        shutil.rmtree(self.project)
+
+    def generate(self, *arguments):
+        """Generate into the same output directory every time, since the namespaces derive from it."""
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+        with redirect_stdout(io.StringIO()):
+            run(parse_args(["--project", self.project, "--all", *arguments]))
+        return read_files(self.out_dir)
+
+    def test_parallel_output_equals_serial_output(self):
+        for arguments in [[], ["--bundle", "single"], ["--split-query-hints", "--compact-interfaces"]]:
+            with self.subTest(arguments=arguments):
+                serial = self.generate("-j", "1", *arguments)
+                self.assertGreater(len(serial), 1)
+                self.assertEqual(self.generate("-j", "2", *arguments), serial)
+
+if __name__ == "__main__":
+    unittest.main()
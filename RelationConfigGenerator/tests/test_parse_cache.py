@@ -0,0 +1,71 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import parse_cache
+from utils.parse_cache import content_hash, load_parse_cache, save_parse_cache, lookup_cached_facts, store_cached_facts
+
+FACTS = {"classes": [["User", ["Entity"], 0]], "include_directives": []}
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='includy-test-')
+        self.file_path = os.path.join(self.directory, "User.cs")
+        self.write(b"class User : Entity {}")
+        self.entries = {}
+        stat = os.stat(self.file_path)
+        store_cached_facts(self.entries, self.file_path, FACTS, {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": content_hash(b"class User : Entity {}")})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data, mtime_ns=None):
+        with open(self.file_path, 'wb') as f:
+            f.write(data)
+        if mtime_ns is not None:
+            os.utime(self.file_path, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_file_hits(self):
+        self.assertEqual(lookup_cached_facts(self.entries, self.file_path), FACTS)
+
+    def test_modified_file_misses(self):
+        # Same size, so only the modification time and the content hash tell the change
+        self.write(b"class Team : Entity {}", os.stat(self.file_path).st_mtime_ns + 10 ** 9)
+        self.assertIsNone(lookup_cached_facts(self.entries, self.file_path))
+
+    def test_touched_file_hits_by_content(self):
+        mtime_ns = os.stat(self.file_path).st_mtime_ns + 10 ** 9
+        self.write(b"class User : Entity {}", mtime_ns)
+        self.assertEqual(lookup_cached_facts(self.entries, self.file_path), FACTS)
+        self.assertEqual(self.entries[os.path.abspath(self.file_path)]["mtime"], mtime_ns)
+
+    def test_removed_file_misses(self):
+        os.remove(self.file_path)
+        self.assertIsNone(lookup_cached_facts(self.entries, self.file_path))
+
+    def test_saved_cache_round_trip(self):
+        save_parse_cache(self.directory, self.entries)
+        self.assertEqual(load_parse_cache(self.directory), self.entries)
+
+    def test_changed_parser_fingerprint_invalidates_the_cache(self):
+        save_parse_cache(self.directory, self.entries)
+        with mock.patch.object(parse_cache, 'parser_fingerprint', return_value='another parser'):
+            self.assertEqual(load_parse_cache(self.directory), {})
+
+    def test_parser_fingerprint_covers_the_include_directive_cleaning(self):
+        original = parse_cache.parser_fingerprint()
+        parse_cache.parser_fingerprint.cache_clear()
+        try:
+            with mock.patch.object(parse_cache.inspect, 'getsource', return_value='def clean_code_block(code): return code'):
+                self.assertNotEqual(parse_cache.parser_fingerprint(), original)
+        finally:
+            parse_cache.parser_fingerprint.cache_clear()
+        self.assertEqual(parse_cache.parser_fingerprint(), original)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,64 +1,64 @@
-import re
-import os
 from collections import deque
+from utils import stats
 
-def find_classes_implementing_interface(files, interface_name):
+def build_class_index(file_facts):
     """
-    Find classes implementing a specific interface.
+    Build a project-wide class index from the facts extracted from every file.
 
     Args:
-        files (list): A list of file paths to search in.
-        interface_name (str): The name of the interface to search for.
+        file_facts (dict): A dictionary mapping file paths to the facts returned by scan_file.
 
     Returns:
-        dict: A dictionary where keys are class names and values are file paths.
+        dict: A dictionary where keys are class names and values are dictionaries with the keys
+              'bases' (list of base type names), 'file' (str) and 'arity' (int, number of generic parameters).
     """
-    classes = {}
-    class_pattern = re.compile(r'(?:public\s+|protected\s+|private\s+)?(?:abstract\s+)?class\s+(\w+)(?:<.*?>)?\s*:\s*.*\b' + re.escape(interface_name) + r'\b')
-    for file_path in files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            matches = class_pattern.findall(content)
-            for match in matches:
-                classes[match] = file_path
-    return classes
+    class_index = {}
+    for file_path, facts in file_facts.items():
+        for name, bases, arity in facts["classes"]:
+            entry = class_index.setdefault(name, {"bases": [], "file": file_path, "arity": arity})
+            entry["file"] = file_path
+            for base in bases:
+                if base not in entry["bases"]:
+                    entry["bases"].append(base)
+    stats.increment("classes_indexed", len(class_index))
+    return class_index
 
-def find_child_classes(root_dir, parent_class):
+def find_classes_implementing_interface(class_index, interface_name, files=None):
     """
-    Find child classes of a specific parent class.
+    Find classes implementing a specific interface.
 
     Args:
-        root_dir (str): The root directory to search in.
-        parent_class (str): The name of the parent class.
+        class_index (dict): The class index created by build_class_index.
+        interface_name (str): The name of the interface to search for.
+        files (iterable, optional): Restrict the search to classes declared in these files.
 
     Returns:
-        dict: A dictionary where keys are child class names and values are file paths.
+        dict: A dictionary where keys are class names and values are file paths.
     """
-    child_classes = {}
-    class_pattern = re.compile(r'class\s+(\w+)(?:<.*?>)?\s*:\s*.*\b' + re.escape(parent_class) + r'\b')
-    for subdir, _, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith(".cs"):
-                file_path = os.path.join(subdir, file)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    matches = class_pattern.findall(content)
-                    for match in matches:
-                        if match != parent_class:
-                            child_classes[match] = file_path
-    return child_classes
+    allowed_files = set(files) if files is not None else None
+    classes = {}
+    for cls, entry in class_index.items():
+        if interface_name in entry["bases"] and (allowed_files is None or entry["file"] in allowed_files):
+            classes[cls] = entry["file"]
+    return classes
 
-def find_all_child_classes(root_dir, parent_class):
+def find_all_child_classes(class_index, parent_class):
     """
     Find all child classes of a specific parent class, including nested children.
 
     Args:
-        root_dir (str): The root directory to search in.
+        class_index (dict): The class index created by build_class_index.
         parent_class (str): The name of the parent class.
 
     Returns:
         dict: A dictionary where keys are child class names and values are file paths.
     """
+    children_by_base = {}
+    for cls, entry in class_index.items():
+        for base in entry["bases"]:
+            if base != cls:
+                children_by_base.setdefault(base, []).append(cls)
+
     all_child_classes = {}
     queue = deque([parent_class])
     visited = set()
@@ -67,9 +67,8 @@ def find_all_child_classes(root_dir, parent_class):
         if current_class in visited:
             continue
         visited.add(current_class)
-        child_classes = find_child_classes(root_dir, current_class)
-        for child_class, file_path in child_classes.items():
+        for child_class in children_by_base.get(current_class, []):
             if child_class not in all_child_classes:
-                all_child_classes[child_class] = file_path
+                all_child_classes[child_class] = class_index[child_class]["file"]
                 queue.append(child_class)
-    return all_child_classes
\ No newline at end of file
+    return all_child_classes
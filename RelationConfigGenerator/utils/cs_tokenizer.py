@@ -0,0 +1,245 @@
+import re
+
+# Bump whenever the extracted declarations change for the same source
+TOKENIZER_VERSION = 1
+
+# Text the scanner has to step over as a whole, so nothing inside it is mistaken for code, and the keywords
+# that start a declaration. Everything else is skipped inside the regex engine.
+scan_pattern = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>\$*""".*?"""|(?:\$@|@\$|@)"(?:""|[^"])*"|\$?"(?:\\.|[^"\\\n])*"|'(?:\\[^'\n]+|[^'\\\n])')
+  | (?P<directive>^[ \t]*\#[^\n]*)
+  | (?P<keyword>(?<![@.\w])(?:class|record|IncludeDirectives)\b)
+''', re.VERBOSE | re.MULTILINE | re.DOTALL)
+
+# A single token of a declaration; whitespace, comments and preprocessor lines are returned as trivia
+token_pattern = re.compile(r'''
+    (?P<trivia>\s+|//[^\n]*|/\*.*?(?:\*/|\Z)|^[ \t]*\#[^\n]*)
+  | (?P<string>\$*""".*?"""|(?:\$@|@\$|@)"(?:""|[^"])*"|\$?"(?:\\.|[^"\\\n])*"|'(?:\\[^'\n]+|[^'\\\n])')
+  | (?P<identifier>@?[A-Za-z_]\w*)
+  | (?P<number>\d[\w.]*)
+  | (?P<operator>=>|\?\?|\?\.)
+  | (?P<punctuation>[^\s\w])
+''', re.VERBOSE | re.MULTILINE | re.DOTALL)
+
+# The declared type of an IncludeDirectives property, matched right before the property name
+include_directives_type_pattern = re.compile(r'ICollection\s*<\s*Func\s*<\s*(\w+)\s*,\s*object\s*>\s*>\s*$')
+
+conditional_pattern = re.compile(r'^[ \t]*#[ \t]*(if|elif|else|endif)\b[ \t]*([^\n]*)', re.MULTILINE)
+
+def tokens(content, pos):
+    """
+    Stream the tokens of a source text from a position, skipping whitespace, comments and preprocessor lines.
+
+    Args:
+        content (str): The source text.
+        pos (int): The position to start at.
+
+    Yields:
+        tuple: The kind ('string', 'identifier', 'number', 'operator' or 'punctuation'), the text and the end
+               position of every token.
+    """
+    length = len(content)
+    while pos < length:
+        match = token_pattern.match(content, pos)
+        if match is None:
+            return
+        pos = match.end()
+        if match.lastgroup != 'trivia':
+            yield match.lastgroup, match.group(), pos
+
+def skip_inactive_block(content, pos):
+    """
+    Find the end of a '#if false' block.
+
+    Nested conditionals are skipped as a whole; the block ends at the matching '#else', '#elif' or '#endif'.
+
+    Args:
+        content (str): The source text.
+        pos (int): The position after the '#if false' line.
+
+    Returns:
+        int: The position after the line that ends the inactive block.
+    """
+    depth = 0
+    for match in conditional_pattern.finditer(content, pos):
+        directive = match.group(1)
+        if directive == 'if':
+            depth += 1
+        elif directive == 'endif':
+            if depth == 0:
+                return match.end()
+            depth -= 1
+        elif depth == 0:
+            return match.end()
+    return len(content)
+
+def parse_class_header(stream):
+    """
+    Parse a class or record declaration after its keyword.
+
+    Args:
+        stream (iterator): The token stream positioned after 'class' or 'record'.
+
+    Returns:
+        tuple: The class name, the list of base type names, the generic arity and the end position of the header,
+               or None if the keyword does not start a declaration (for example a 'class' constraint).
+    """
+    kind, text, end = next(stream, (None, None, None))
+    if text in ('class', 'struct'):
+        # 'record class' and 'record struct'
+        kind, text, end = next(stream, (None, None, None))
+    if kind != 'identifier' or text == 'where':
+        return None
+    name = text.lstrip('@')
+
+    arity = 0
+    kind, text, end = next(stream, (None, None, None))
+    if text == '<':
+        arity = 1
+        depth = 1
+        for kind, text, end in stream:
+            if text == '<':
+                depth += 1
+            elif text == '>':
+                depth -= 1
+                if depth == 0:
+                    break
+            elif text == ',' and depth == 1:
+                arity += 1
+        kind, text, end = next(stream, (None, None, None))
+
+    if text == '(':
+        # Primary constructor parameters
+        depth = 1
+        for kind, text, end in stream:
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+        kind, text, end = next(stream, (None, None, None))
+
+    bases = []
+    if text in ('{', ';', 'where'):
+        return name, bases, arity, end
+    if text != ':':
+        # A contextual 'record' used as an identifier, as in 'var record in records'
+        return None
+
+    # The base list ends at the body, a constraint clause or the end of a positional record
+    current_base = None
+    depth = 0
+    for kind, text, end in stream:
+        if text in ('<', '(', '['):
+            depth += 1
+        elif text in ('>', ')', ']'):
+            depth -= 1
+        elif depth > 0:
+            continue
+        elif text in ('{', ';') or text == 'where':
+            break
+        elif text == ',':
+            if current_base:
+                bases.append(current_base)
+            current_base = None
+        elif kind == 'identifier':
+            # The last identifier of a qualified name is the type name
+            current_base = text.lstrip('@')
+    if current_base:
+        bases.append(current_base)
+    return name, bases, arity, end
+
+def parse_include_directives(stream):
+    """
+    Parse the initializer of an IncludeDirectives property after the property name.
+
+    The property must be initialized with a collection initializer, either as '{ get; } = new List<...> { ... };'
+    or as '=> new List<...> { ... };'.
+
+    Args:
+        stream (iterator): The token stream positioned after 'IncludeDirectives'.
+
+    Returns:
+        tuple: The text of the initializer body without whitespace and comments and the end position,
+               or None if the property has no collection initializer.
+    """
+    kind, text, end = next(stream, (None, None, None))
+    if text == '{':
+        # Accessor list
+        for kind, text, end in stream:
+            if text == '}':
+                break
+        kind, text, end = next(stream, (None, None, None))
+        if text != '=':
+            return None
+    elif text != '=>':
+        return None
+
+    # Skip the creation expression up to the collection initializer
+    depth = 0
+    for kind, text, end in stream:
+        if text in ('(', '<', '['):
+            depth += 1
+        elif text in (')', '>', ']'):
+            depth -= 1
+        elif depth == 0 and text == ';':
+            return None
+        elif depth == 0 and text == '{':
+            break
+    else:
+        return None
+
+    body = []
+    depth = 0
+    for kind, text, end in stream:
+        if text == '{':
+            depth += 1
+        elif text == '}':
+            if depth == 0:
+                return ''.join(body), end
+            depth -= 1
+        body.append(text)
+    return None
+
+def extract_declarations(content):
+    """
+    Extract all class declarations and IncludeDirectives of a C# source text in a single linear pass.
+
+    Comments, strings and '#if false' blocks are skipped, so declarations inside them are not reported.
+
+    Args:
+        content (str): The source text.
+
+    Returns:
+        dict: A dictionary with the keys 'classes', a list of [class name, base type names, generic arity] entries,
+              and 'include_directives', a list of [entity type, initializer body] entries.
+    """
+    classes = []
+    include_directives = []
+    pos = 0
+    while True:
+        match = scan_pattern.search(content, pos)
+        if match is None:
+            break
+        pos = match.end()
+        group = match.lastgroup
+        if group == 'directive':
+            conditional = conditional_pattern.match(match.group())
+            if conditional and conditional.group(1) == 'if' and conditional.group(2).split('//')[0].strip() == 'false':
+                pos = skip_inactive_block(content, pos)
+        elif group == 'keyword':
+            keyword = match.group()
+            if keyword == 'IncludeDirectives':
+                declared_type = include_directives_type_pattern.search(content, max(0, match.start() - 200), match.start())
+                declaration = parse_include_directives(tokens(content, pos)) if declared_type else None
+                if declaration:
+                    include_directives.append([declared_type.group(1), declaration[0]])
+                    pos = declaration[1]
+            else:
+                declaration = parse_class_header(tokens(content, pos))
+                if declaration:
+                    classes.append(list(declaration[:3]))
+                    pos = declaration[3]
+    return {"classes": classes, "include_directives": include_directives}
@@ -0,0 +1,118 @@
+import re
+from utils.cs_tokenizer import tokens
+
+# Keywords that start a type declaration with a body
+TYPE_KEYWORDS = {'class', 'record', 'struct', 'interface'}
+
+# Modifiers that may precede the type of a property
+MODIFIERS = {'public', 'private', 'protected', 'internal', 'static', 'virtual', 'override', 'abstract', 'sealed',
+             'new', 'required', 'readonly', 'unsafe', 'extern'}
+
+# Generic types whose navigations load many rows
+COLLECTION_TYPES = {'ICollection', 'IList', 'List', 'IEnumerable', 'HashSet', 'ISet', 'IReadOnlyCollection',
+                    'IReadOnlyList', 'Collection', 'ObservableCollection'}
+
+generic_type_pattern = re.compile(r'^(?:[\w.]+\.)?(\w+)<(.+)>$')
+
+def property_declaration(member):
+    """
+    Recognize a property declaration from the tokens of a member up to its accessor list or expression body.
+
+    Args:
+        member (list): The texts of the tokens of the member, without attributes.
+
+    Returns:
+        tuple: The property name and its type, or None if the member is not a property.
+    """
+    if '(' in member or '=' in member or len(member) < 2 or not re.match(r'^@?[A-Za-z_]\w*$', member[-1]):
+        return None
+    type_tokens = member[:-1]
+    while type_tokens and type_tokens[0] in MODIFIERS:
+        type_tokens = type_tokens[1:]
+    if not type_tokens:
+        return None
+    return member[-1].lstrip('@'), ''.join(type_tokens)
+
+def extract_properties(content):
+    """
+    Extract the properties of every type declared in a C# source text.
+
+    Args:
+        content (str): The source text.
+
+    Returns:
+        dict: A dictionary mapping type names to dictionaries mapping their property names to the declared types,
+              for example {'TransactionEntity': {'Category': 'CategoryEntity?', ...}}.
+    """
+    types = {}
+    # The type declarations enclosing the current position, with the brace depth of their bodies
+    scopes = []
+    pending_type = None
+    member = []
+    attribute_depth = 0
+    previous = None
+    depth = 0
+    stream = tokens(content, 0)
+    for kind, text, end in stream:
+        if attribute_depth:
+            attribute_depth += (text == '[') - (text == ']')
+        elif text == '[' and not member:
+            # An attribute list before a member
+            attribute_depth = 1
+        elif text == '{':
+            depth += 1
+            if pending_type is not None:
+                scopes.append((pending_type, depth))
+                types.setdefault(pending_type, {})
+                pending_type = None
+            elif scopes and scopes[-1][1] == depth - 1:
+                declaration = property_declaration(member)
+                if declaration:
+                    types[scopes[-1][0]][declaration[0]] = declaration[1]
+            member = []
+        elif text == '}':
+            if scopes and scopes[-1][1] == depth:
+                scopes.pop()
+            depth -= 1
+            member = []
+        elif text == ';':
+            pending_type = None
+            member = []
+        elif text == '=>' and scopes and scopes[-1][1] == depth:
+            declaration = property_declaration(member)
+            if declaration:
+                types[scopes[-1][0]][declaration[0]] = declaration[1]
+            member = ['=']
+        elif text in TYPE_KEYWORDS and previous not in ('.', ':', ',', 'record'):
+            # Not a 'class' or 'struct' constraint and not the second keyword of 'record class'
+            kind, text, end = next(stream, (None, None, None))
+            if text in ('class', 'struct'):
+                kind, text, end = next(stream, (None, None, None))
+            if kind == 'identifier':
+                pending_type = text.lstrip('@')
+            member = []
+        elif pending_type is None:
+            member.append(text)
+        previous = text
+    return types
+
+def navigation_target(declared_type):
+    """
+    Classify the declared type of a navigation property.
+
+    Args:
+        declared_type (str): The type of the property, for example 'ICollection<TransactionGroupUserEntity>' or
+                             'CategoryEntity?'.
+
+    Returns:
+        tuple: The name of the entity the navigation leads to and whether the navigation is a collection.
+    """
+    declared_type = declared_type.rstrip('?')
+    if declared_type.endswith('[]'):
+        return declared_type[:-2].rstrip('?').rsplit('.', 1)[-1], True
+    generic = generic_type_pattern.match(declared_type)
+    if generic:
+        if generic.group(1) in COLLECTION_TYPES:
+            return generic.group(2).rstrip('?').rsplit('.', 1)[-1], True
+        return generic.group(1), False
+    return declared_type.rsplit('.', 1)[-1], False
@@ -1,18 +1,217 @@
 import os
+from fnmatch import fnmatchcase
+from utils import stats
 
-def find_all_cs_files(root_dir):
+# Build output, tool and dependency directories that never contain project sources
+DEFAULT_EXCLUDED_DIRECTORIES = {'bin', 'obj', '.git', '.vs', '.idea', 'node_modules', 'packages', 'TestResults'}
+
+GITIGNORE_FILE_NAME = '.gitignore'
+
+def parse_ignore_pattern(pattern, base=''):
+    """
+    Parse a single .gitignore or --exclude pattern into a rule.
+
+    Args:
+        pattern (str): The pattern, for example 'build/', '/Generated/*.cs' or '!keep.cs'.
+        base (str): The directory the pattern is relative to, as a '/'-separated path relative to the project.
+
+    Returns:
+        tuple: The base directory, the glob, whether the rule negates an earlier match, whether it only matches
+               directories and whether it is anchored to the base directory, or None for blank lines and comments.
+    """
+    pattern = pattern.rstrip()
+    if not pattern or pattern.startswith('#'):
+        return None
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    directory_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    # A pattern with a slash before its last character matches a path relative to the base, otherwise a name at any depth
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    if not pattern:
+        return None
+    return base, pattern, negate, directory_only, anchored
+
+def load_gitignore(directory, base):
+    """
+    Load the rules of the .gitignore file of a directory.
+
+    Args:
+        directory (str): The directory to load the .gitignore file from.
+        base (str): The directory relative to the project, as a '/'-separated path.
+
+    Returns:
+        list: The rules of the file, see parse_ignore_pattern. Empty if the directory has no .gitignore file.
+    """
+    try:
+        with open(os.path.join(directory, GITIGNORE_FILE_NAME), 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    return [rule for rule in (parse_ignore_pattern(line, base) for line in lines) if rule]
+
+def match_segments(segments, globs):
+    """
+    Match the segments of a path against the segments of a glob.
+
+    Args:
+        segments (list): The names along the path.
+        globs (list): The segments of the glob. '**' matches any number of names, a trailing '**' at least one.
+
+    Returns:
+        bool: True if the path matches.
+    """
+    if not globs:
+        return not segments
+    if globs[0] == '**':
+        if len(globs) == 1:
+            return bool(segments)
+        return any(match_segments(segments[index:], globs[1:]) for index in range(len(segments) + 1))
+    return bool(segments) and fnmatchcase(segments[0], globs[0]) and match_segments(segments[1:], globs[1:])
+
+def match_path(relative_path, pattern):
+    """
+    Match a '/'-separated path against a glob the way .gitignore does, one segment at a time.
+
+    Unlike fnmatch, '*', '?' and character classes never match a '/'.
+
+    Args:
+        relative_path (str): The path, '/'-separated.
+        pattern (str): The glob, '/'-separated.
+
+    Returns:
+        bool: True if the path matches.
+    """
+    return match_segments(relative_path.split('/'), pattern.split('/'))
+
+def is_ignored(relative_path, is_directory, rules):
+    """
+    Decide whether a path is ignored by a list of rules. The last matching rule wins.
+
+    Args:
+        relative_path (str): The path relative to the project, '/'-separated.
+        is_directory (bool): Whether the path is a directory.
+        rules (list): The rules to apply, see parse_ignore_pattern.
+
+    Returns:
+        bool: True if the path is ignored.
+    """
+    ignored = False
+    name = relative_path.rsplit('/', 1)[-1]
+    for base, pattern, negate, directory_only, anchored in rules:
+        if directory_only and not is_directory:
+            continue
+        if anchored:
+            if base:
+                if not relative_path.startswith(base + '/'):
+                    continue
+                subject = relative_path[len(base) + 1:]
+            else:
+                subject = relative_path
+        else:
+            if base and not relative_path.startswith(base + '/'):
+                continue
+            subject = name
+        if match_path(subject, pattern):
+            ignored = not negate
+    return ignored
+
+def matches_any(relative_path, patterns):
+    """
+    Check whether a path matches one of a list of globs.
+
+    Globs without a slash match the name of the file or directory, globs with a slash its path relative to the project.
+
+    Args:
+        relative_path (str): The path relative to the project, '/'-separated.
+        patterns (list): The globs to match.
+
+    Returns:
+        bool: True if any glob matches.
+    """
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(match_path(relative_path, pattern) if '/' in pattern else fnmatchcase(name, pattern) for pattern in patterns)
+
+def find_all_cs_files(root_dir, include=None, exclude=None, use_gitignore=True, directories=None, skip=None):
     """
     Find all .cs files in the given directory.
 
+    The walk never enters the directories in DEFAULT_EXCLUDED_DIRECTORIES, directories ignored by a .gitignore
+    file of the project, directories matching an exclude glob or the skipped paths.
+
     Args:
         root_dir (str): The root directory to search in.
+        include (list, optional): Globs of the files to keep; all .cs files are kept if empty.
+        exclude (list, optional): Globs of the files and directories to skip.
+        use_gitignore (bool): Whether to honor the .gitignore files of the project.
+        directories (list, optional): A list that receives every directory the walk entered.
+        skip (iterable, optional): Paths of directories and files below root_dir to leave out, for example the
+                                   generated output.
 
     Returns:
         list: A list of paths to .cs files.
     """
+    include = include or []
+    skip = {os.path.normcase(os.path.abspath(path)) for path in skip or []}
+    exclude = [rule for rule in (parse_ignore_pattern(pattern) for pattern in exclude or []) if rule]
     cs_files = []
-    for subdir, _, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith(".cs"):
-                cs_files.append(os.path.join(subdir, file))
-    return cs_files
\ No newline at end of file
+    # Every pending directory carries its path relative to the project and the ignore rules in effect for it
+    pending = [(root_dir, '', [])]
+    while pending:
+        directory, relative_dir, rules = pending.pop()
+        stats.increment("directories_walked")
+        if directories is not None:
+            directories.append(directory)
+        if use_gitignore:
+            rules = rules + load_gitignore(directory, relative_dir)
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if skip and os.path.normcase(os.path.abspath(entry.path)) in skip:
+                stats.increment("directories_pruned" if entry.is_dir(follow_symlinks=False) else "files_skipped")
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if (entry.name in DEFAULT_EXCLUDED_DIRECTORIES or is_ignored(relative_path, True, rules)
+                        or is_ignored(relative_path, True, exclude)):
+                    stats.increment("directories_pruned")
+                    continue
+                subdirectories.append((entry.path, relative_path, rules))
+            elif entry.name.endswith(".cs"):
+                if is_ignored(relative_path, False, rules) or is_ignored(relative_path, False, exclude):
+                    continue
+                if include and not matches_any(relative_path, include):
+                    continue
+                cs_files.append(entry.path)
+        pending.extend(reversed(subdirectories))
+    stats.increment("files_walked", len(cs_files))
+    return cs_files
+
+def find_files_in_directories(files, root_dir, name_part):
+    """
+    Select the files below directories whose name contains a given part, without walking the tree again.
+
+    Args:
+        files (list): The file paths found in root_dir.
+        root_dir (str): The directory the files were found in; its own name is considered as well.
+        name_part (str): The part a directory name has to contain, for example 'DAL'.
+
+    Returns:
+        list: The selected file paths.
+    """
+    root_dir = os.path.normpath(root_dir)
+    if name_part in os.path.basename(os.path.abspath(root_dir)):
+        return list(files)
+    selected = []
+    for file_path in files:
+        directories = os.path.relpath(os.path.dirname(file_path), root_dir).split(os.sep)
+        if any(name_part in directory for directory in directories if directory != os.curdir):
+            selected.append(file_path)
+    return selected
@@ -0,0 +1,250 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify event masks, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+def load_inotify():
+    """
+    Load the inotify functions of the C library.
+
+    Returns:
+        ctypes.CDLL: The C library, or None if inotify is not available on this platform.
+    """
+    library = ctypes.util.find_library('c')
+    try:
+        libc = ctypes.CDLL(library or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+def open_watcher(walk, ignored_dir=None, debounce=0.3, poll_interval=1.0, polling=False):
+    """
+    Start watching the .cs files of a project.
+
+    inotify is used where available; elsewhere, or when the inotify watch limit is reached, the project is polled.
+
+    Args:
+        walk (callable): A function returning the .cs files of the project and the directories to watch.
+        ignored_dir (str, optional): A directory whose changes are ignored, usually the output directory.
+        debounce (float): The seconds without further changes after which a burst of changes is reported.
+        poll_interval (float): The seconds between two polls of the project.
+        polling (bool): Whether to poll even if inotify is available.
+
+    Returns:
+        dict: The watcher state passed to wait_for_changes, update_watches and close_watcher.
+    """
+    files, directories = walk()
+    watcher = {
+        "walk": walk,
+        "ignored_prefix": os.path.join(os.path.abspath(ignored_dir), '') if ignored_dir else None,
+        "debounce": debounce,
+        "poll_interval": poll_interval,
+        "fd": None,
+        "watches": {},
+        "snapshot": None
+    }
+
+    libc = None if polling else load_inotify()
+    if libc is not None:
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd >= 0:
+            watcher["libc"] = libc
+            watcher["fd"] = fd
+            if not update_watches(watcher, directories):
+                close_watcher(watcher)
+
+    if watcher["fd"] is None:
+        watcher["snapshot"] = snapshot_files(watcher, files)
+    return watcher
+
+def update_watches(watcher, directories):
+    """
+    Watch directories that appeared since the watcher was opened.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+        directories (list): All directories of the project that should be watched.
+
+    Returns:
+        bool: False if the inotify watch limit was reached and the watcher has to fall back to polling.
+    """
+    if watcher["fd"] is None:
+        return True
+    watched = set(watcher["watches"].values())
+    for directory in directories:
+        directory = os.path.abspath(directory)
+        if directory in watched or is_ignored_path(watcher, directory):
+            continue
+        descriptor = watcher["libc"].inotify_add_watch(watcher["fd"], os.fsencode(directory), WATCH_MASK)
+        if descriptor < 0:
+            if ctypes.get_errno() == errno.ENOSPC:
+                return False
+            # The directory vanished in the meantime
+            continue
+        watcher["watches"][descriptor] = directory
+    return True
+
+def close_watcher(watcher):
+    """
+    Stop watching and fall back to polling if wait_for_changes is called again.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+
+    Returns:
+        None
+    """
+    if watcher["fd"] is not None:
+        os.close(watcher["fd"])
+        watcher["fd"] = None
+        watcher["watches"] = {}
+
+def is_ignored_path(watcher, path):
+    """
+    Check whether a path lies in the ignored directory of a watcher.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+        path (str): An absolute path.
+
+    Returns:
+        bool: True if changes of the path are ignored.
+    """
+    prefix = watcher["ignored_prefix"]
+    return prefix is not None and os.path.join(path, '').startswith(prefix)
+
+def snapshot_files(watcher, files):
+    """
+    Record the modification time and size of every watched file.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+        files (list): The .cs files of the project.
+
+    Returns:
+        dict: A dictionary mapping absolute file paths to (mtime, size) pairs.
+    """
+    snapshot = {}
+    for file_path in files:
+        file_path = os.path.abspath(file_path)
+        if is_ignored_path(watcher, file_path):
+            continue
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def read_events(watcher, timeout):
+    """
+    Read the pending inotify events.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+        timeout (float): The seconds to wait for the first event, None to wait indefinitely.
+
+    Returns:
+        set: The absolute paths of the changed .cs files and directories, empty if the timeout expired.
+    """
+    readable, _, _ = select.select([watcher["fd"]], [], [], timeout)
+    if not readable:
+        return set()
+
+    data = os.read(watcher["fd"], 64 * 1024)
+    changed = set()
+    offset = 0
+    while offset < len(data):
+        descriptor, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+        name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+        offset += EVENT_HEADER.size + length
+
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost, report the whole project as changed
+            changed.add(os.path.abspath(os.sep))
+            continue
+        if mask & IN_IGNORED:
+            watcher["watches"].pop(descriptor, None)
+            continue
+        directory = watcher["watches"].get(descriptor)
+        if directory is None:
+            continue
+        path = os.path.join(directory, os.fsdecode(name)) if name else directory
+        if is_ignored_path(watcher, path):
+            continue
+        if mask & IN_ISDIR or mask & IN_DELETE_SELF or path.endswith('.cs'):
+            changed.add(path)
+    return changed
+
+def poll_changes(watcher):
+    """
+    Compare the project against the last snapshot.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+
+    Returns:
+        set: The absolute paths of the added, removed and modified files.
+    """
+    files, _ = watcher["walk"]()
+    snapshot = snapshot_files(watcher, files)
+    previous = watcher["snapshot"]
+    watcher["snapshot"] = snapshot
+    return {path for path in snapshot.keys() | previous.keys() if snapshot.get(path) != previous.get(path)}
+
+def wait_for_changes(watcher):
+    """
+    Block until .cs files of the project change and return the whole burst of changes.
+
+    After the first change, further changes are collected until the project has been quiet for the debounce
+    interval, so saving many files at once triggers a single rebuild.
+
+    Args:
+        watcher (dict): The watcher state returned by open_watcher.
+
+    Returns:
+        set: The absolute paths of the changed files. Directory paths stand for changes below them.
+    """
+    if watcher["fd"] is not None:
+        changed = set()
+        while not changed:
+            changed = read_events(watcher, None)
+        while True:
+            events = read_events(watcher, watcher["debounce"])
+            if not events:
+                return changed
+            changed |= events
+
+    if watcher["snapshot"] is None:
+        watcher["snapshot"] = snapshot_files(watcher, watcher["walk"]()[0])
+    changed = set()
+    while not changed:
+        time.sleep(watcher["poll_interval"])
+        changed = poll_changes(watcher)
+    while True:
+        time.sleep(watcher["debounce"])
+        changes = poll_changes(watcher)
+        if not changes:
+            return changed
+        changed |= changes
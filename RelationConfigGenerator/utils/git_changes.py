@@ -0,0 +1,58 @@
+import os
+import subprocess
+
+def run_git(arguments, cwd):
+    """
+    Run a git command.
+
+    Args:
+        arguments (list): The arguments after 'git'.
+        cwd (str): The directory to run the command in.
+
+    Returns:
+        str: The standard output of the command, or None if git is missing or the command failed.
+    """
+    try:
+        completed = subprocess.run(['git', *arguments], cwd=cwd, capture_output=True, text=True, encoding='utf-8')
+    except OSError:
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout
+
+def current_revision(project_dir):
+    """
+    Resolve the commit checked out in the repository of a project.
+
+    Args:
+        project_dir (str): A directory inside the repository.
+
+    Returns:
+        str: The full hash of HEAD, or None if the directory is not in a git repository or has no commits.
+    """
+    output = run_git(['rev-parse', '--verify', '--quiet', 'HEAD'], project_dir)
+    return output.strip() if output else None
+
+def find_changed_files(project_dir, since):
+    """
+    Ask git which files below a project directory differ from a revision.
+
+    Modified, added and deleted tracked files are compared against the working tree, so uncommitted changes count
+    as well. Untracked files that are not ignored are always reported as changed.
+
+    Args:
+        project_dir (str): The project directory inside a git repository.
+        since (str): The revision to compare against, for example 'HEAD~3' or a commit hash.
+
+    Returns:
+        set: The absolute paths of the changed files, or None if git cannot answer, for example because the
+             directory is not in a repository or the revision is unknown.
+    """
+    # --relative limits both commands to the project and reports paths relative to it
+    tracked = run_git(['diff', '--name-only', '--no-renames', '--relative', '-z', since, '--'], project_dir)
+    untracked = run_git(['ls-files', '--others', '--exclude-standard', '-z', '--', '.'], project_dir)
+    if tracked is None or untracked is None:
+        return None
+
+    root = os.path.abspath(project_dir)
+    return {os.path.join(root, os.path.normpath(path)) for path in (tracked + untracked).split('\0') if path}
@@ -1,30 +1,5 @@
 import re
 
-def find_include_directives(file_path):
-    """
-    Find include directives in a given file.
-
-    Args:
-        file_path (str): The path to the file to search in.
-
-    Returns:
-        list: A list of tuples containing file path, entity type, and cleaned code.
-    """
-    include_directives = []
-    pattern = re.compile(r'public\s*(?:virtual|override)\s*ICollection\s*<\s*Func\s*<\s*(\w+)\s*,\s*object\s*>\s*>\s*IncludeDirectives\s*{\s*get\s*;\s*}\s*=\s*new\s*List\s*<\s*Func\s*<\s*\w+\s*,\s*object\s*>\s*>\s*{([^}]*)\s*};', re.MULTILINE | re.DOTALL)
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        matches = pattern.findall(content)
-        if matches:
-            for match in matches:
-                entity_type = match[0]
-                code_block = match[1]
-                cleaned_code = clean_code_block(code_block)
-                include_directives.append((file_path, entity_type, cleaned_code))
-
-    return include_directives
-
 def clean_code_block(code_block):
     """
     Clean a code block by removing unnecessary characters.
@@ -41,4 +16,35 @@ def clean_code_block(code_block):
     cleaned_code = re.sub(r'[(){}<>]', '', cleaned_code)
     cleaned_code = re.sub(r';', '', cleaned_code)
     cleaned_code = re.sub(r'!', '', cleaned_code)
-    return cleaned_code.split(',')
\ No newline at end of file
+    return cleaned_code.split(',')
+
+def find_collection_paths(code_block):
+    """
+    Find the include paths that end in a collection navigation.
+
+    A navigation is known to be a collection when the include directives project it with Select, as in
+    'entity => entity.TransactionGroupUsers.Select(tgu => tgu.GroupUser)'. Collections included as a leaf, as in
+    'entity => entity.GroupUsers', are not recognized from the code alone; with --split-query-hints the generator
+    adds them from the property types of the entities.
+
+    Args:
+        code_block (str): The code block of the include directives.
+
+    Returns:
+        list: The collection paths in the cleaned path notation, for example 'TransactionGroupUsers'.
+    """
+    code = re.sub(r'\s+', '', code_block)
+    code = re.sub(r'entity=>entity\.', '', code)
+    # Mark every navigation followed by a projection
+    code = re.sub(r'\.Select\(\w*=>\w*\.', '*.', code)
+    code = re.sub(r'[(){}<>;!]', '', code)
+
+    collection_paths = []
+    for directive in code.split(','):
+        segments = directive.split('.')
+        for index, segment in enumerate(segments):
+            if segment.endswith('*'):
+                path = '.'.join(s.rstrip('*') for s in segments[:index + 1])
+                if path not in collection_paths:
+                    collection_paths.append(path)
+    return collection_paths
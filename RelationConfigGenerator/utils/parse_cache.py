@@ -0,0 +1,180 @@
+import os
+import json
+import inspect
+import hashlib
+from functools import lru_cache
+from utils import cs_tokenizer, include_directives
+
+# Bump whenever the shape of the extracted facts changes
+CACHE_VERSION = 2
+CACHE_FILE_NAME = 'includy-parse-cache.json'
+REVISION_FILE_NAME = 'includy-revision.json'
+
+@lru_cache(maxsize=None)
+def parser_fingerprint():
+    """
+    Compute a fingerprint of the extraction logic.
+
+    Cached facts are only valid for the cache and tokenizer versions, the exact patterns they were extracted with
+    and the code cleaning the include directives, so any change to them invalidates the whole cache.
+
+    Returns:
+        str: A hex digest identifying the current extraction logic.
+    """
+    digest = hashlib.sha1()
+    digest.update(f"{CACHE_VERSION}.{cs_tokenizer.TOKENIZER_VERSION}".encode('utf-8'))
+    for pattern in (cs_tokenizer.scan_pattern, cs_tokenizer.token_pattern, cs_tokenizer.include_directives_type_pattern):
+        digest.update(pattern.pattern.encode('utf-8'))
+    # The include directives are cleaned by a chain of substitutions, hashing the module covers all of them
+    digest.update(inspect.getsource(include_directives).encode('utf-8'))
+    return digest.hexdigest()
+
+def content_hash(data):
+    """
+    Hash the raw content of a source file.
+
+    Args:
+        data (bytes): The content of the file.
+
+    Returns:
+        str: A hex digest of the content.
+    """
+    return hashlib.sha1(data).hexdigest()
+
+def load_parse_cache(cache_dir):
+    """
+    Load the parse cache from the cache directory.
+
+    A missing, unreadable or outdated cache yields an empty cache.
+
+    Args:
+        cache_dir (str): The directory holding the cache file.
+
+    Returns:
+        dict: A dictionary mapping absolute file paths to cache entries with the keys 'mtime', 'size', 'hash' and 'facts'.
+    """
+    cache_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict) or cache.get("parser") != parser_fingerprint():
+        return {}
+    return cache.get("files", {})
+
+def save_parse_cache(cache_dir, entries):
+    """
+    Save the parse cache to the cache directory.
+
+    The cache is written to a temporary file first and then moved into place, so an interrupted run never
+    leaves a truncated cache behind.
+
+    Args:
+        cache_dir (str): The directory holding the cache file.
+        entries (dict): A dictionary mapping absolute file paths to cache entries.
+
+    Returns:
+        None
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"parser": parser_fingerprint(), "files": entries}, f, separators=(',', ':'))
+    os.replace(temp_path, cache_path)
+
+def lookup_cached_facts(entries, file_path):
+    """
+    Look up the cached facts of a file.
+
+    An entry whose modification time and size still match is trusted without reading the file. Otherwise the
+    content hash decides, so a file that was touched but not modified is not parsed again.
+
+    Args:
+        entries (dict): The cache entries returned by load_parse_cache.
+        file_path (str): The path to the file.
+
+    Returns:
+        dict: The cached facts, or None if the file has to be parsed or no longer exists.
+    """
+    key = os.path.abspath(file_path)
+    entry = entries.get(key)
+    if entry is None:
+        return None
+
+    try:
+        stat = os.stat(file_path)
+        if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["facts"]
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        # Removed since the walk, parsing it again reports the error
+        return None
+    if entry["hash"] != content_hash(data):
+        return None
+
+    entry["mtime"] = stat.st_mtime_ns
+    entry["size"] = stat.st_size
+    return entry["facts"]
+
+def store_cached_facts(entries, file_path, facts, fingerprint):
+    """
+    Store the facts of a freshly parsed file in the cache.
+
+    Args:
+        entries (dict): The cache entries returned by load_parse_cache.
+        file_path (str): The path to the file.
+        facts (dict): The facts extracted from the file.
+        fingerprint (dict): The 'mtime', 'size' and 'hash' of the file as it was parsed.
+
+    Returns:
+        None
+    """
+    entries[os.path.abspath(file_path)] = dict(fingerprint, facts=facts)
+
+def load_cache_revision(cache_dir):
+    """
+    Load the git state the parse cache was last brought up to date with.
+
+    Args:
+        cache_dir (str): The directory holding the cache file.
+
+    Returns:
+        dict: A dictionary with the keys 'revision', the commit checked out at the time, and 'dirty', the absolute
+              paths of the files that differed from it, or None if no state was recorded.
+    """
+    try:
+        with open(os.path.join(cache_dir, REVISION_FILE_NAME), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(state, dict) or state.get("parser") != parser_fingerprint() or not state.get("revision"):
+        return None
+    return state
+
+def save_cache_revision(cache_dir, revision, dirty_files):
+    """
+    Record the git state the parse cache is up to date with.
+
+    Files that differed from the revision are recorded as well: a later run has to parse them again even if they
+    are reverted to the revision, because the cache still holds the facts of their modified content.
+
+    Args:
+        cache_dir (str): The directory holding the cache file.
+        revision (str): The commit checked out during the run.
+        dirty_files (set): The absolute paths of the files that differed from the revision.
+
+    Returns:
+        None
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    revision_path = os.path.join(cache_dir, REVISION_FILE_NAME)
+    temp_path = f"{revision_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"parser": parser_fingerprint(), "revision": revision, "dirty": sorted(dirty_files)}, f)
+    os.replace(temp_path, revision_path)
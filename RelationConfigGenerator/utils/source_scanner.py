@@ -0,0 +1,170 @@
+import os
+import mmap
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from utils import stats
+from utils.cs_tokenizer import extract_declarations
+from utils.include_directives import clean_code_block, find_collection_paths
+from utils.parse_cache import content_hash, load_parse_cache, save_parse_cache, lookup_cached_facts, store_cached_facts
+
+# Files at least this large are memory-mapped, so rejecting them by the prefilter never copies their content
+MMAP_THRESHOLD = 256 * 1024
+
+# Literals of which every relevant file contains at least one; files without them cannot produce any fact
+CLASS_MARKER = b'class'
+RECORD_MARKER = b'record'
+
+def empty_facts():
+    """
+    Create the facts of a file that declares nothing relevant.
+
+    Returns:
+        dict: A dictionary with empty 'classes' and 'include_directives' lists.
+    """
+    return {"classes": [], "include_directives": []}
+
+def scan_content(content):
+    """
+    Extract every fact the generator needs from the content of a source file in a single tokenizer pass.
+
+    Args:
+        content (str): The content of the source file.
+
+    Returns:
+        dict: A dictionary with the keys 'classes', a list of [class name, base type names, generic arity] entries,
+              and 'include_directives', a list of [entity type, cleaned code, collection paths] entries.
+    """
+    declarations = extract_declarations(content)
+    facts = {
+        "classes": declarations["classes"],
+        "include_directives": [
+            [entity_type, clean_code_block(code_block), find_collection_paths(code_block)]
+            for entity_type, code_block in declarations["include_directives"]
+        ]
+    }
+    stats.increment("declarations_extracted", len(facts["classes"]) + len(facts["include_directives"]))
+    return facts
+
+def scan_data(data):
+    """
+    Extract the facts from the raw content of a source file, tokenizing only files that pass the prefilter.
+
+    Args:
+        data (bytes or mmap.mmap): The raw content of the source file.
+
+    Returns:
+        dict: The facts of the file, see scan_content.
+    """
+    if data.find(CLASS_MARKER) == -1 and data.find(RECORD_MARKER) == -1:
+        stats.increment("files_prefiltered")
+        return empty_facts()
+    # Files that are not valid UTF-8 are still scanned, their invalid bytes cannot be part of a declaration
+    return scan_content(bytes(data).decode('utf-8', errors='replace'))
+
+def scan_file(file_path):
+    """
+    Read a source file once and extract every fact the generator needs from it.
+
+    Large files are memory-mapped instead of read, so the prefilter can reject them without copying.
+
+    Args:
+        file_path (str): The path to the file to scan.
+
+    Returns:
+        dict: The facts of the file, see scan_content.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        stats.increment("files_scanned")
+        stats.increment("bytes_read", size)
+        if size < MMAP_THRESHOLD:
+            return scan_data(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return scan_data(view)
+
+def scan_file_with_fingerprint(file_path):
+    """
+    Scan a source file and fingerprint the exact content that was parsed.
+
+    Args:
+        file_path (str): The path to the file to scan.
+
+    Returns:
+        tuple: The facts of the file and a dictionary with its 'mtime', 'size' and 'hash'.
+    """
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    stats.increment("files_scanned")
+    stats.increment("bytes_read", len(data))
+    fingerprint = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": content_hash(data)}
+    return scan_data(data), fingerprint
+
+def map_files(function, files, jobs):
+    """
+    Apply a function to every file, optionally spreading the work across a process pool.
+
+    Args:
+        function (callable): A picklable function taking a file path.
+        files (list): A list of file paths.
+        jobs (int): The number of worker processes. 1 runs in the current process, 0 uses one worker per CPU.
+
+    Returns:
+        list: The results in the order of files.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1 or len(files) < 2:
+        return [function(file_path) for file_path in files]
+
+    # Hand out several chunks per worker so that uneven file sizes still balance out
+    chunksize = max(1, len(files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = []
+        for result, counters, stages in executor.map(partial(stats.run_with_counters, function), files, chunksize=chunksize):
+            stats.merge_counters(counters, stages)
+            results.append(result)
+        return results
+
+def scan_files(files, jobs=1, cache_dir=None, changed_files=None):
+    """
+    Scan source files, reusing the persistent parse cache when a cache directory is given.
+
+    Args:
+        files (list): A list of file paths to scan.
+        jobs (int): The number of worker processes, see map_files.
+        cache_dir (str, optional): The directory of the persistent parse cache.
+        changed_files (set, optional): The absolute paths of the files changed since the cache was last updated.
+            When given, the cached facts of all other files are trusted without looking at the files.
+
+    Returns:
+        dict: A dictionary mapping each file path to the facts returned by scan_content, in the order of files.
+    """
+    if cache_dir is None:
+        return dict(zip(files, map_files(scan_file, files, jobs)))
+
+    entries = load_parse_cache(cache_dir)
+    file_facts = {}
+    stale_files = []
+    for file_path in files:
+        key = os.path.abspath(file_path)
+        if changed_files is not None and key not in changed_files and key in entries:
+            facts = entries[key]["facts"]
+        else:
+            facts = lookup_cached_facts(entries, file_path)
+        if facts is None:
+            stale_files.append(file_path)
+        file_facts[file_path] = facts
+    stats.increment("cache_hits", len(files) - len(stale_files))
+    stats.increment("cache_misses", len(stale_files))
+
+    for file_path, (facts, fingerprint) in zip(stale_files, map_files(scan_file_with_fingerprint, stale_files, jobs)):
+        file_facts[file_path] = facts
+        store_cached_facts(entries, file_path, facts, fingerprint)
+
+    # Drop entries of files that no longer exist or are no longer scanned
+    scanned = {os.path.abspath(file_path) for file_path in files}
+    save_parse_cache(cache_dir, {path: entry for path, entry in entries.items() if path in scanned})
+    return file_facts
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Counters and stage timings of the current run, collected by every module of the generator
+counters = {}
+stages = {}
+
+# Counters are also increased by the threads writing generated files
+counters_lock = threading.Lock()
+
+def increment(name, amount=1):
+    """
+    Increase a counter.
+
+    Args:
+        name (str): The name of the counter.
+        amount (int): The amount to add.
+
+    Returns:
+        None
+    """
+    with counters_lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def merge_counters(other, other_stages=None):
+    """
+    Add counters and stage timings collected elsewhere, for example in a worker process.
+
+    Args:
+        other (dict): A dictionary mapping counter names to amounts.
+        other_stages (dict, optional): A dictionary mapping stage names to (wall, cpu) tuples. The times of the
+                                       workers add up, like the times of a stage entered several times.
+
+    Returns:
+        None
+    """
+    for name, amount in other.items():
+        increment(name, amount)
+    for name, (other_wall, other_cpu) in (other_stages or {}).items():
+        wall, cpu = stages.get(name, (0.0, 0.0))
+        stages[name] = (wall + other_wall, cpu + other_cpu)
+
+def cpu_time():
+    """
+    Measure the CPU time of the current process and of its finished child processes.
+
+    Worker processes are counted once they have exited, which the process pools of the generator wait for before
+    their stage ends.
+
+    Returns:
+        float: The CPU time in seconds.
+    """
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+@contextmanager
+def stage(name):
+    """
+    Measure the wall and CPU time of a block and add it to a stage. The CPU time includes worker processes, see
+    cpu_time.
+
+    Args:
+        name (str): The name of the stage.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = cpu_time()
+    try:
+        yield
+    finally:
+        wall, cpu = stages.get(name, (0.0, 0.0))
+        stages[name] = (wall + time.perf_counter() - wall_start, cpu + cpu_time() - cpu_start)
+
+def reset():
+    """
+    Clear all counters and stage timings.
+
+    Returns:
+        None
+    """
+    counters.clear()
+    stages.clear()
+
+def run_with_counters(function, *arguments):
+    """
+    Run a function with fresh counters and stage timings and return what it collected.
+
+    Used in worker processes, whose counters and stage timings would otherwise never reach the main process.
+
+    Args:
+        function (callable): The function to run.
+        *arguments: The arguments to pass to the function.
+
+    Returns:
+        tuple: The result of the function, a dictionary of the counters and a dictionary of the stage timings it
+               collected. Pass both dictionaries to merge_counters.
+    """
+    reset()
+    result = function(*arguments)
+    return result, dict(counters), dict(stages)
+
+def format_report(output_format='text'):
+    """
+    Format the collected counters and stage timings.
+
+    Args:
+        output_format (str): 'text' for a human-readable report or 'json'.
+
+    Returns:
+        str: The formatted report.
+    """
+    if output_format == 'json':
+        return json.dumps({
+            "counters": dict(sorted(counters.items())),
+            "stages": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in stages.items()}
+        }, indent=2)
+
+    lines = ["Stages:"]
+    name_width = max((len(name) for name in list(stages) + list(counters)), default=0)
+    for name, (wall, cpu) in stages.items():
+        lines.append(f"  {name:<{name_width}}  wall {wall * 1000:9.1f} ms  cpu {cpu * 1000:9.1f} ms")
+    lines.append("Counters:")
+    for name, amount in sorted(counters.items()):
+        lines.append(f"  {name:<{name_width}}  {amount}")
+    return "\n".join(lines)